@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Any
 
 from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
@@ -14,17 +15,33 @@ from google.adk.sessions import InMemorySessionService
 from huxbot.agent.instruction import InstructionBuilder
 from huxbot.bus.queue import MessageBus
 from huxbot.config.schema import HuxBotConfig
-from huxbot.tools.filesystem import read_file, write_file, edit_file, list_dir
-from huxbot.tools.shell import exec_command
-from huxbot.tools.web import web_search, web_fetch
+from huxbot.tools.artifacts import make_artifact_store, make_read_artifact
+from huxbot.tools.breaker import ToolExecutor, make_tool_status
+from huxbot.tools.codesearch import make_search_workspace
+from huxbot.tools.memo import ToolMemo
+from huxbot.tools.filesystem import (
+    read_file,
+    write_file,
+    edit_file,
+    multi_edit,
+    apply_patch,
+    list_dir,
+)
+from huxbot.tools.shell import make_shell_tools
+from huxbot.tools.web import make_web_search, make_web_fetch
 from huxbot.tools.message import make_send_message
 
 
 def build_agent_and_runner(
     config: HuxBotConfig,
     bus: MessageBus,
+    model: BaseLlm | None = None,
 ) -> tuple[LlmAgent, Runner, InMemorySessionService]:
-    """Create and return ``(agent, runner, session_service)``."""
+    """Create and return ``(agent, runner, session_service)``.
+
+    *model* overrides the LiteLLM model from the config (e.g. a stub for
+    load tests).
+    """
     workspace = Path(config.agent.workspace).expanduser().resolve()
 
     # Resolve skill directories
@@ -49,20 +66,40 @@ def build_agent_and_runner(
             os.environ[env_var] = config.provider.api_key
 
     # Model
-    model = LiteLlm(model=config.agent.model)
+    if model is None:
+        model = LiteLlm(model=config.agent.model)
+
+    # Tools.  Each runs under its deadline and circuit breaker (innermost),
+    # and oversized outputs go to an artifact file, with a preview and an
+    # id the model can page through with read_artifact.  Repeated reads
+    # within a session are answered from the memo, which sits outside the
+    # spilling and so holds previews rather than full outputs; anything
+    # that may change files invalidates it.
+    executor = ToolExecutor(config.tools)
+    memo = ToolMemo(config.tools.memo_ttl, config.tools.memo_max_entries)
+    artifacts = make_artifact_store(workspace, config.tools)
+
+    def guard(tool: Any) -> Any:
+        return artifacts.spilling(executor.wrap(tool))
 
-    # Tools
     send_message = make_send_message(bus)
     tools: list[Any] = [
-        read_file,
-        write_file,
-        edit_file,
-        list_dir,
-        exec_command,
-        web_search,
-        web_fetch,
-        send_message,
+        memo.cached(guard(read_file), path_arg="path"),
+        memo.invalidating(guard(write_file), path_arg="path"),
+        memo.invalidating(guard(edit_file), path_arg="path"),
+        memo.invalidating(guard(multi_edit)),
+        memo.invalidating(guard(apply_patch)),
+        # Only the listed directory's own stat is checked, so deeper trees
+        # are not memoized.
+        memo.cached(guard(list_dir), path_arg="path", cacheable=lambda a: a["depth"] <= 1),
+        guard(make_search_workspace(workspace, config.tools)),
+        # Shell commands, persistent shells and background jobs can change
+        # anything; a job's writes show up by the time its status is checked.
+        *[memo.invalidating(guard(tool)) for tool in make_shell_tools(config.tools, bus)],
+        guard(make_web_search(config.tools)),
+        memo.cached(guard(make_web_fetch(config.tools))),
     ]
+    tools += [make_read_artifact(artifacts), send_message, make_tool_status(executor)]
 
     # Hardware tools (optional)
     if config.hardware.enabled:
@@ -70,7 +107,7 @@ def build_agent_and_runner(
         from huxbot.tools.hardware import make_hardware_tools
 
         board = make_board(config.hardware)
-        tools.extend(make_hardware_tools(board))
+        tools.extend(executor.wrap(tool) for tool in make_hardware_tools(board))
 
     # Agent
     agent = LlmAgent(
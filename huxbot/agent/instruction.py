@@ -6,12 +6,14 @@ from pathlib import Path
 
 from huxbot.agent.memory import MemoryStore
 from huxbot.agent.skills import SkillsLoader
+from huxbot.utils.aio import run_io
 
 
 class InstructionBuilder:
     """Build the system-prompt string from workspace files, memory, and skills.
 
     Returns a *callable* suitable for ADK's ``LlmAgent(instruction=...)``.
+    The files are read on the I/O thread pool, off the event loop.
     """
 
     def __init__(self, workspace: Path, skills_dirs: list[Path] | None = None) -> None:
@@ -55,6 +57,6 @@ class InstructionBuilder:
 
         return "\n\n".join(parts)
 
-    def __call__(self, _ctx=None) -> str:
-        """ADK InstructionProvider interface (sync callable)."""
-        return self.build()
+    async def __call__(self, _ctx=None) -> str:
+        """ADK InstructionProvider interface (async callable)."""
+        return await run_io(self.build)
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import mimetypes
+from pathlib import Path
 from typing import Any
 
 from google.adk.runners import Runner
@@ -12,6 +14,8 @@ from google.genai import types
 
 from huxbot.bus.events import InboundMessage, OutboundMessage
 from huxbot.bus.queue import MessageBus
+from huxbot.channels.media import is_image
+from huxbot.utils.aio import run_io
 
 logger = logging.getLogger(__name__)
 
@@ -75,10 +79,7 @@ class MessageProcessor:
             )
 
         # Build user content
-        user_content = types.Content(
-            role="user",
-            parts=[types.Part(text=msg.content)],
-        )
+        user_content = types.Content(role="user", parts=await self._user_parts(msg))
 
         # Collect all text parts from the agent's response events
         parts: list[str] = []
@@ -94,6 +95,19 @@ class MessageProcessor:
 
         return "".join(parts) if parts else None
 
+    @staticmethod
+    async def _user_parts(msg: InboundMessage) -> list[types.Part]:
+        """Text plus attachments: images inline, other files referenced by path."""
+        text = msg.content
+        images: list[types.Part] = []
+        for path in msg.media:
+            if is_image(path):
+                mime = mimetypes.guess_type(path)[0] or "image/jpeg"
+                data = await run_io(Path(path).read_bytes)
+                images.append(types.Part.from_bytes(data=data, mime_type=mime))
+            text += f"\n[Attachment saved to {path}]"
+        return [types.Part(text=text), *images]
+
     async def process_single(self, text: str, session_id: str = "cli:default") -> str | None:
         """Process a single text message (for CLI / direct use)."""
         msg = InboundMessage(
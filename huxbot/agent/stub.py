@@ -0,0 +1,35 @@
+"""Stub LLM for load tests – echoes the user's message without any API call."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+
+class StubLlm(BaseLlm):
+    """Reply ``echo: <last user text>`` after an optional simulated *latency*."""
+
+    model: str = "stub"
+    latency: float = 0.0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        text = ""
+        for content in reversed(llm_request.contents or []):
+            if content.role == "user" and content.parts:
+                text = "".join(p.text or "" for p in content.parts)
+                break
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=f"echo: {text}")]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=0, candidates_token_count=0, total_token_count=0
+            ),
+        )
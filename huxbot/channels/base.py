@@ -2,26 +2,53 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import re
 from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 from huxbot.bus.events import InboundMessage, OutboundMessage
 from huxbot.bus.queue import MessageBus
+from huxbot.channels.media import MediaStore
 from huxbot.config.schema import ChannelConfig
 
 logger = logging.getLogger(__name__)
 
 
+class DeliveryError(Exception):
+    """Raised by :meth:`BaseChannel.send` when a message could not be delivered.
+
+    *retryable* is False for failures that will not go away by retrying
+    (unknown recipient, bot blocked, malformed message).  Other exceptions
+    escaping ``send`` are treated as transient.
+    """
+
+    def __init__(self, message: str, *, retryable: bool = True) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+
+
 class BaseChannel(ABC):
     """Abstract base class for chat channel implementations."""
 
     name: str = "base"
 
-    def __init__(self, config: ChannelConfig, bus: MessageBus) -> None:
+    def __init__(
+        self, config: ChannelConfig, bus: MessageBus, media: MediaStore | None = None
+    ) -> None:
         self.config = config
         self.bus = bus
+        self.media = media
         self._running = False
+        self._ready = asyncio.Event()
+        # False: start() only sets up sending and leaves inbound alone (used
+        # to replay dead letters next to a running gateway).
+        self.receive = True
+        # Inbound messages filtered out before reaching the bus, by reason.
+        self.dropped: Counter[str] = Counter()
 
     @abstractmethod
     async def start(self) -> None:
@@ -33,7 +60,19 @@ class BaseChannel(ABC):
 
     @abstractmethod
     async def send(self, msg: OutboundMessage) -> None:
-        """Send an outbound message through this channel."""
+        """Send an outbound message through this channel.
+
+        Must raise (preferably :class:`DeliveryError`) when the message was
+        not delivered, so the manager can retry or dead-letter it.
+        """
+
+    def undelivered(self) -> list[OutboundMessage]:
+        """Messages ``send`` accepted but has not delivered; called after :meth:`stop`.
+
+        The manager parks them as dead letters.  Channels that buffer
+        outgoing messages override this.
+        """
+        return []
 
     def _check_access(self, sender_ids: set[str]) -> bool:
         """Return True if any of *sender_ids* is in the allow list.
@@ -47,30 +86,69 @@ class BaseChannel(ABC):
             return True
         return bool(sender_ids & set(allow_list))
 
+    def _addressed(
+        self, content: str, *, is_direct: bool, mentioned: bool, reply_to_bot: bool
+    ) -> str | None:
+        """Apply the addressing rules; return the content to publish or None.
+
+        Direct messages always pass.  In group chats ``group_messages``
+        decides: everything, only messages that address the bot (mention,
+        reply to one of its messages, or the configured ``prefix``), or
+        nothing.  A leading prefix is stripped either way; it must be
+        followed by a space, punctuation or the end, so ``!hux`` does not
+        match ``!huxley``.
+        """
+        prefix = self.config.prefix
+        prefixed = bool(prefix) and re.match(re.escape(prefix) + r"(?!\w)", content) is not None
+        if prefixed:
+            content = content[len(prefix):].lstrip()
+        if is_direct:
+            return content
+        mode = self.config.group_messages
+        if mode == "all" or (mode == "addressed" and (mentioned or reply_to_bot or prefixed)):
+            return content
+        return None
+
     async def _forward_to_bus(
         self,
         *,
         sender_ids: set[str],
         chat_id: str,
         content: str,
-        media: list[str] | None = None,
+        media: list[str] | Callable[[], Awaitable[list[str]]] | None = None,
         metadata: dict[str, Any] | None = None,
+        is_direct: bool = True,
+        mentioned: bool = False,
+        reply_to_bot: bool = False,
     ) -> None:
-        """Validate access and publish an inbound message to the bus.
+        """Validate access and addressing, then publish an inbound message.
 
         *sender_ids* is the full set of identifiers for the sender
         (numeric id, username, etc.).  The first element is used as the
-        canonical ``sender_id`` on the event.
+        canonical ``sender_id`` on the event.  *media* may be a callable
+        that downloads the attachments, so that nothing is fetched for a
+        message that is filtered out.
         """
         if not self._check_access(sender_ids):
             logger.warning("Access denied for %s on %s", sender_ids, self.name)
+            self.dropped["denied"] += 1
             return
 
+        text = self._addressed(
+            content, is_direct=is_direct, mentioned=mentioned, reply_to_bot=reply_to_bot
+        )
+        if text is None:
+            self.dropped["not_addressed"] += 1
+            return
+
+        if callable(media):
+            media = await media()
+
         msg = InboundMessage(
             channel=self.name,
             sender_id=next(iter(sender_ids)),
             chat_id=str(chat_id),
-            content=content,
+            content=text,
             media=media or [],
             metadata=metadata or {},
         )
@@ -79,3 +157,11 @@ class BaseChannel(ABC):
     @property
     def is_running(self) -> bool:
         return self._running
+
+    async def wait_ready(self, timeout: float | None = None) -> bool:
+        """Wait until the channel can send. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
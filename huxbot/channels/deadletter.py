@@ -0,0 +1,118 @@
+"""Dead-letter store for outbound messages that could not be delivered."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from huxbot.bus.events import OutboundMessage
+from huxbot.utils.helpers import atomic_write, ensure_dir
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: only the in-process lock applies
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeadLetter:
+    """An outbound message parked after exhausting its delivery attempts."""
+
+    id: str
+    message: OutboundMessage
+    error: str
+    attempts: int
+    failed_at: str
+
+
+class DeadLetterStore:
+    """Append-only JSON-lines file of dead letters, rewritten on removal.
+
+    Appends and rewrites hold a lock (a ``flock`` on a ``.lock`` file next
+    to the store, so a replay in another process is covered too); without
+    it a letter parked during a rewrite could be lost.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path.expanduser()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            ensure_dir(self.path.parent)
+            with open(self.path.with_name(self.path.name + ".lock"), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    def park(self, msg: OutboundMessage, error: str, attempts: int) -> DeadLetter:
+        letter = DeadLetter(
+            id=uuid.uuid4().hex[:8],
+            message=msg,
+            error=error,
+            attempts=attempts,
+            failed_at=datetime.now().isoformat(timespec="seconds"),
+        )
+        with self._locked(), self.path.open("a") as f:
+            f.write(json.dumps(self._to_dict(letter)) + "\n")
+        return letter
+
+    def entries(self) -> list[DeadLetter]:
+        if not self.path.is_file():
+            return []
+        letters: list[DeadLetter] = []
+        for line in self.path.read_text().splitlines():
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                letters.append(
+                    DeadLetter(
+                        id=data["id"],
+                        message=OutboundMessage.model_validate(data["message"]),
+                        error=data.get("error", ""),
+                        attempts=data.get("attempts", 0),
+                        failed_at=data.get("failed_at", ""),
+                    )
+                )
+            except (ValueError, KeyError) as exc:
+                logger.warning("Skipping malformed dead letter: %s", exc)
+        return letters
+
+    def remove(self, ids: set[str]) -> int:
+        """Drop the letters in *ids*; returns how many were removed."""
+        with self._locked():
+            if not self.path.is_file():
+                return 0
+            lines = self.path.read_text().splitlines(keepends=True)
+            kept = [line for line in lines if self._line_id(line) not in ids]
+            if len(kept) != len(lines):
+                atomic_write(self.path, "".join(kept))
+            return len(lines) - len(kept)
+
+    @staticmethod
+    def _line_id(line: str) -> str | None:
+        try:
+            return json.loads(line)["id"]
+        except (ValueError, KeyError, TypeError):
+            return None  # blank or malformed: kept as is
+
+    @staticmethod
+    def _to_dict(letter: DeadLetter) -> dict:
+        return {
+            "id": letter.id,
+            "message": letter.message.model_dump(mode="json"),
+            "error": letter.error,
+            "attempts": letter.attempts,
+            "failed_at": letter.failed_at,
+        }
@@ -5,19 +5,49 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import random
+import zlib
 from typing import Any
 
 import aiohttp
 
 from huxbot.bus.events import OutboundMessage
 from huxbot.bus.queue import MessageBus
-from huxbot.channels.base import BaseChannel
+from huxbot.channels.base import BaseChannel, DeliveryError
+from huxbot.channels.media import MediaStore
+from huxbot.channels.ratelimit import DiscordRateLimiter
 from huxbot.config.schema import ChannelConfig
+from huxbot.utils.helpers import backoff_delay
+from huxbot.utils.http import get_session
 
 logger = logging.getLogger(__name__)
 
 DISCORD_API = "https://discord.com/api/v10"
-GATEWAY_URL = "wss://gateway.discord.gg/?v=10&encoding=json"
+GATEWAY_URL = "wss://gateway.discord.gg"
+GATEWAY_QUERY = "?v=10&encoding=json"
+
+# zlib-stream frames end with a sync flush marker.
+_ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+# Largest gateway payload accepted, compressed or inflated.  Real ones are
+# far smaller (a GUILD_CREATE for a big guild is a few hundred KB).
+_MAX_PAYLOAD = 8 * 1024 * 1024
+# Close codes after which reconnecting cannot succeed (bad token, intents...).
+_FATAL_CLOSE_CODES = {4004, 4010, 4011, 4012, 4013, 4014}
+# Close codes that invalidate the session; reconnect with a fresh IDENTIFY.
+_SESSION_CLOSE_CODES = {4007, 4009}
+# Closing with a non-1000/1001 code keeps the session resumable.
+_RESUMABLE_CLOSE = 4000
+
+_CREATE_MESSAGE = ("POST", "/channels/{channel_id}/messages")
+_MAX_SEND_ATTEMPTS = 3
+
+
+async def _rate_limit_body(resp: aiohttp.ClientResponse) -> Any:
+    """The JSON body of a 429, or None when it has none (e.g. a proxy's HTML page)."""
+    try:
+        return await resp.json(content_type=None)
+    except ValueError:
+        return None  # the ticket falls back to the Retry-After headers
 
 
 class DiscordChannel(BaseChannel):
@@ -25,12 +55,23 @@ class DiscordChannel(BaseChannel):
 
     name = "discord"
 
-    def __init__(self, config: ChannelConfig, bus: MessageBus) -> None:
-        super().__init__(config, bus)
+    def __init__(
+        self, config: ChannelConfig, bus: MessageBus, media: MediaStore | None = None
+    ) -> None:
+        super().__init__(config, bus, media)
         self._ws: aiohttp.ClientWebSocketResponse | None = None
         self._session: aiohttp.ClientSession | None = None
         self._seq: int | None = None
         self._heartbeat_task: asyncio.Task | None = None
+        self._heartbeat_acked = True
+        self._session_id: str | None = None
+        self._resume_url: str | None = None
+        self._bot_id = ""
+        self._compress = bool(self.config.extra.get("compress", False))
+        self._inflator: Any = None
+        self._buffer = bytearray()
+        self._attempt = 0
+        self._limiter = DiscordRateLimiter()
 
     async def start(self) -> None:
         if not self.config.token:
@@ -38,46 +79,111 @@ class DiscordChannel(BaseChannel):
             return
 
         self._running = True
-        self._session = aiohttp.ClientSession()
+        self._session = get_session()
+        if not self.receive:
+            self._ready.set()  # sends go over REST; no gateway connection needed
+            return
 
         while self._running:
             try:
-                logger.info("Connecting to Discord gateway...")
-                self._ws = await self._session.ws_connect(GATEWAY_URL)
+                mode = "resume" if self._session_id else "identify"
+                logger.info("Connecting to Discord gateway (%s)...", mode)
+                self._ws = await self._session.ws_connect(self._gateway_url(), max_msg_size=_MAX_PAYLOAD)
+                self._inflator = zlib.decompressobj() if self._compress else None
+                self._buffer.clear()
                 await self._gateway_loop()
             except asyncio.CancelledError:
                 break
             except Exception as exc:
                 logger.warning("Discord gateway error: %s", exc)
-                if self._running:
-                    await asyncio.sleep(5)
+            finally:
+                if self._heartbeat_task:
+                    self._heartbeat_task.cancel()
+
+            code = await self._close_ws()
+            if code in _FATAL_CLOSE_CODES:
+                logger.error("Discord gateway closed with fatal code %s, not reconnecting", code)
+                self._running = False
+                break
+            if code in _SESSION_CLOSE_CODES:
+                self._reset_session()
+            if self._running:
+                delay = backoff_delay(self._attempt)
+                self._attempt += 1
+                logger.info("Reconnecting to Discord gateway in %.1fs", delay)
+                await asyncio.sleep(delay)
 
     async def stop(self) -> None:
         self._running = False
+        self._ready.clear()
         if self._heartbeat_task:
             self._heartbeat_task.cancel()
         if self._ws:
             await self._ws.close()
-        if self._session:
-            await self._session.close()
 
     async def send(self, msg: OutboundMessage) -> None:
         if not self._session:
-            return
+            raise DeliveryError("Discord channel not started")
         url = f"{DISCORD_API}/channels/{msg.recipient}/messages"
         headers = {"Authorization": f"Bot {self.config.token}"}
         payload: dict[str, Any] = {"content": msg.text}
-        try:
-            async with self._session.post(url, headers=headers, json=payload) as resp:
-                if resp.status == 429:
-                    data = await resp.json()
-                    await asyncio.sleep(float(data.get("retry_after", 1.0)))
-                    async with self._session.post(url, headers=headers, json=payload) as retry:
-                        retry.raise_for_status()
-                else:
+        for _ in range(_MAX_SEND_ATTEMPTS):
+            async with self._limiter.acquire(_CREATE_MESSAGE, major=msg.recipient) as ticket:
+                async with self._session.post(url, headers=headers, json=payload) as resp:
+                    body = await _rate_limit_body(resp) if resp.status == 429 else None
+                    if await ticket.update(resp.status, resp.headers, body):
+                        continue
+                    if 400 <= resp.status < 500:
+                        # Unknown channel, missing access, bad payload: retrying won't help.
+                        raise DeliveryError(
+                            f"Discord rejected message: HTTP {resp.status}", retryable=False
+                        )
                     resp.raise_for_status()
-        except Exception as exc:
-            logger.error("Error sending Discord message: %s", exc)
+                    return
+        raise DeliveryError(f"Discord channel {msg.recipient} still rate limited")
+
+    def _gateway_url(self) -> str:
+        base = (self._session_id and self._resume_url) or GATEWAY_URL
+        url = base.rstrip("/") + "/" + GATEWAY_QUERY
+        if self._compress:
+            url += "&compress=zlib-stream"
+        return url
+
+    def _reset_session(self) -> None:
+        self._session_id = None
+        self._resume_url = None
+        self._seq = None
+
+    async def _close_ws(self) -> int | None:
+        """Close the socket (keeping the session resumable) and return its close code."""
+        ws, self._ws = self._ws, None
+        if ws is None:
+            return None
+        if not ws.closed:
+            await ws.close(code=_RESUMABLE_CLOSE)
+        return ws.close_code
+
+    def _decode(self, raw_msg: aiohttp.WSMessage) -> dict[str, Any] | None:
+        """Decode a gateway frame, inflating zlib-stream payloads."""
+        if raw_msg.type == aiohttp.WSMsgType.BINARY:
+            if self._inflator is None:
+                return None
+            self._buffer.extend(raw_msg.data)
+            if len(self._buffer) > _MAX_PAYLOAD:
+                raise ValueError("gateway payload too large")
+            if not self._buffer.endswith(_ZLIB_SUFFIX):
+                return None
+            text = self._inflator.decompress(self._buffer, _MAX_PAYLOAD)
+            if self._inflator.unconsumed_tail:
+                # The stream cannot be resynchronised; reconnect and resume.
+                raise ValueError("gateway payload too large")
+            self._buffer.clear()
+        else:
+            text = raw_msg.data
+        try:
+            return json.loads(text)
+        except (json.JSONDecodeError, TypeError):
+            return None
 
     async def _gateway_loop(self) -> None:
         if not self._ws:
@@ -85,9 +191,8 @@ class DiscordChannel(BaseChannel):
         async for raw_msg in self._ws:
             if raw_msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
                 break
-            try:
-                data = json.loads(raw_msg.data)
-            except (json.JSONDecodeError, TypeError):
+            data = self._decode(raw_msg)
+            if data is None:
                 continue
 
             op = data.get("op")
@@ -101,12 +206,34 @@ class DiscordChannel(BaseChannel):
             if op == 10:
                 interval = payload.get("heartbeat_interval", 45000) / 1000
                 await self._start_heartbeat(interval)
-                await self._identify()
+                if self._session_id:
+                    await self._resume()
+                else:
+                    await self._identify()
+            elif op == 11:
+                self._heartbeat_acked = True
+            elif op == 1:
+                await self._send_heartbeat()
             elif op == 0 and event_type == "READY":
+                self._session_id = payload.get("session_id")
+                self._resume_url = payload.get("resume_gateway_url")
+                self._bot_id = str((payload.get("user") or {}).get("id", ""))
+                self._attempt = 0
+                self._ready.set()
                 logger.info("Discord gateway READY")
+            elif op == 0 and event_type == "RESUMED":
+                self._attempt = 0
+                logger.info("Discord gateway session resumed")
             elif op == 0 and event_type == "MESSAGE_CREATE":
                 await self._on_message(payload)
-            elif op in (7, 9):
+            elif op == 7:
+                logger.info("Discord gateway requested reconnect")
+                break
+            elif op == 9:
+                # d is true when the session may still be resumed.
+                if not payload:
+                    self._reset_session()
+                    await asyncio.sleep(random.uniform(1, 5))
                 break
 
     async def _identify(self) -> None:
@@ -121,13 +248,38 @@ class DiscordChannel(BaseChannel):
             },
         })
 
+    async def _resume(self) -> None:
+        if not self._ws:
+            return
+        await self._ws.send_json({
+            "op": 6,
+            "d": {
+                "token": self.config.token,
+                "session_id": self._session_id,
+                "seq": self._seq,
+            },
+        })
+
+    async def _send_heartbeat(self) -> None:
+        if self._ws and not self._ws.closed:
+            await self._ws.send_json({"op": 1, "d": self._seq})
+
     async def _start_heartbeat(self, interval: float) -> None:
         if self._heartbeat_task:
             self._heartbeat_task.cancel()
+        self._heartbeat_acked = True
 
         async def _loop() -> None:
-            while self._running and self._ws:
-                await self._ws.send_json({"op": 1, "d": self._seq})
+            # Discord asks for a random offset before the first beat.
+            await asyncio.sleep(interval * random.random())
+            while self._running and self._ws and not self._ws.closed:
+                if not self._heartbeat_acked:
+                    # Zombie connection: no ACK since the last beat.
+                    logger.warning("Discord heartbeat not acknowledged, reconnecting")
+                    await self._ws.close(code=_RESUMABLE_CLOSE)
+                    return
+                self._heartbeat_acked = False
+                await self._send_heartbeat()
                 await asyncio.sleep(interval)
 
         self._heartbeat_task = asyncio.create_task(_loop())
@@ -138,12 +290,43 @@ class DiscordChannel(BaseChannel):
             return
         sender_id = str(author.get("id", ""))
         channel_id = str(payload.get("channel_id", ""))
-        content = payload.get("content") or "[empty]"
+        attachments = payload.get("attachments") or []
+        content = payload.get("content") or ("[attachment]" if attachments else "[empty]")
         if not sender_id or not channel_id:
             return
+        mentioned = any(
+            str(m.get("id")) == self._bot_id for m in payload.get("mentions") or []
+        )
+        if mentioned:
+            for token in (f"<@{self._bot_id}>", f"<@!{self._bot_id}>"):
+                content = content.replace(token, "")
+            content = content.strip() or "[empty]"
+        replied_to = (payload.get("referenced_message") or {}).get("author") or {}
         await self._forward_to_bus(
             sender_ids={sender_id},
             chat_id=channel_id,
             content=content,
+            media=lambda: self._download_attachments(attachments),
             metadata={"message_id": str(payload.get("id", ""))},
+            is_direct="guild_id" not in payload,
+            mentioned=mentioned,
+            reply_to_bot=bool(self._bot_id) and str(replied_to.get("id")) == self._bot_id,
         )
+
+    async def _download_attachments(self, attachments: list[dict[str, Any]]) -> list[str]:
+        if not self.media:
+            return []
+        paths: list[str] = []
+        for att in attachments:
+            url = att.get("url")
+            if not url:
+                continue
+            path = await self.media.download(
+                url,
+                channel=self.name,
+                filename=att.get("filename", "attachment"),
+                size_hint=att.get("size"),
+            )
+            if path:
+                paths.append(path)
+        return paths
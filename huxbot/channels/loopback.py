@@ -0,0 +1,69 @@
+"""Loopback channel – an in-process chat platform for load testing."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict, deque
+
+from huxbot.bus.events import OutboundMessage
+from huxbot.bus.queue import MessageBus
+from huxbot.channels.base import BaseChannel
+from huxbot.channels.media import MediaStore
+from huxbot.config.schema import ChannelConfig
+
+
+class LoopbackChannel(BaseChannel):
+    """Channel whose "users" live in the same process.
+
+    :meth:`request` publishes an inbound message through the normal
+    ``_forward_to_bus`` path and waits for the reply the outbound router
+    delivers back to :meth:`send`, so the whole bus → processor → router
+    pipeline is exercised.
+    """
+
+    name = "loopback"
+
+    def __init__(
+        self, config: ChannelConfig, bus: MessageBus, media: MediaStore | None = None
+    ) -> None:
+        super().__init__(config, bus, media)
+        self._waiters: dict[str, deque[asyncio.Future[OutboundMessage]]] = defaultdict(deque)
+        self._stopped = asyncio.Event()
+        self.delivered = 0
+
+    async def start(self) -> None:
+        self._running = True
+        self._stopped.clear()
+        self._ready.set()
+        await self._stopped.wait()
+
+    async def stop(self) -> None:
+        self._running = False
+        self._ready.clear()
+        self._stopped.set()
+        for waiters in self._waiters.values():
+            for fut in waiters:
+                fut.cancel()
+        self._waiters.clear()
+
+    async def send(self, msg: OutboundMessage) -> None:
+        self.delivered += 1
+        waiters = self._waiters.get(msg.recipient)
+        while waiters:
+            fut = waiters.popleft()
+            if not fut.done():
+                fut.set_result(msg)
+                return
+
+    async def request(
+        self, chat_id: str, text: str, *, timeout: float | None = None
+    ) -> OutboundMessage:
+        """Send *text* as user *chat_id* and wait for the agent's reply."""
+        fut: asyncio.Future[OutboundMessage] = asyncio.get_running_loop().create_future()
+        self._waiters[chat_id].append(fut)
+        await self._forward_to_bus(sender_ids={chat_id}, chat_id=chat_id, content=text)
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            if not fut.done():
+                fut.cancel()
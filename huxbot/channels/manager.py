@@ -4,11 +4,18 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections import deque
+from pathlib import Path
 from typing import Any
 
+from huxbot.bus.events import OutboundMessage
 from huxbot.bus.queue import MessageBus
-from huxbot.channels.base import BaseChannel
+from huxbot.channels.base import BaseChannel, DeliveryError
+from huxbot.channels.deadletter import DeadLetter, DeadLetterStore
+from huxbot.channels.media import MediaStore
 from huxbot.config.schema import ChannelConfig, HuxBotConfig
+from huxbot.utils.aio import run_io
+from huxbot.utils.helpers import backoff_delay
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +25,17 @@ _CHANNEL_REGISTRY: list[tuple[str, str, str]] = [
     ("telegram", "huxbot.channels.telegram", "TelegramChannel"),
     ("discord", "huxbot.channels.discord", "DiscordChannel"),
     ("whatsapp", "huxbot.channels.whatsapp", "WhatsAppChannel"),
+    ("loopback", "huxbot.channels.loopback", "LoopbackChannel"),
 ]
 
 
 def _load_channel(
-    name: str, module: str, cls_name: str, cfg: ChannelConfig, bus: MessageBus
+    name: str,
+    module: str,
+    cls_name: str,
+    cfg: ChannelConfig,
+    bus: MessageBus,
+    media: MediaStore | None = None,
 ) -> BaseChannel | None:
     """Try to import and instantiate a single channel.  Returns *None* on failure."""
     try:
@@ -30,25 +43,42 @@ def _load_channel(
 
         mod = importlib.import_module(module)
         cls = getattr(mod, cls_name)
-        return cls(cfg, bus)
+        return cls(cfg, bus, media)
     except (ImportError, AttributeError) as exc:
         logger.warning("Could not load %s channel: %s", name, exc)
         return None
 
 
 class ChannelManager:
-    """Owns channel lifecycles and fans outbound messages to the right channel."""
+    """Owns channel lifecycles and fans outbound messages to the right channel.
+
+    Outbound messages are delivered through one lane per (channel,
+    recipient): order is preserved per conversation, while a recipient
+    whose sends are being retried doesn't hold up anyone else.  Messages
+    that fail permanently or exhaust ``delivery.max_attempts`` are parked
+    in the dead-letter store.
+    """
 
     def __init__(self, config: HuxBotConfig, bus: MessageBus) -> None:
         self.bus = bus
+        self.delivery = config.delivery
+        self.dead_letters = DeadLetterStore(Path(config.delivery.dead_letter_file))
         self._channels: dict[str, BaseChannel] = {}
+        self._router: asyncio.Task | None = None
+        self._routing = False
         self._tasks: list[asyncio.Task] = []
+        self._lanes: dict[tuple[str, str], deque[OutboundMessage]] = {}
+        self._lane_tasks: set[asyncio.Task] = set()
+        self.stats = {"delivered": 0, "retried": 0, "dead_lettered": 0}
+
+        workspace = Path(config.agent.workspace).expanduser().resolve()
+        self.media = MediaStore(workspace / config.media.dir, config.media)
 
         for name, module, cls_name in _CHANNEL_REGISTRY:
             cfg: ChannelConfig = getattr(config.channels, name)
             if not cfg.enabled:
                 continue
-            ch = _load_channel(name, module, cls_name, cfg, bus)
+            ch = _load_channel(name, module, cls_name, cfg, bus, self.media)
             if ch is not None:
                 self._channels[name] = ch
                 logger.info("Registered %s channel", name)
@@ -59,14 +89,25 @@ class ChannelManager:
     def enabled_channels(self) -> list[str]:
         return list(self._channels)
 
-    async def start_all(self) -> None:
-        """Launch every registered channel and the outbound router."""
+    def get_channel(self, name: str) -> BaseChannel | None:
+        return self._channels.get(name)
+
+    async def start_all(self, *, receive: bool = True) -> None:
+        """Launch every registered channel and the outbound router.
+
+        With ``receive=False`` channels only set up sending (see
+        :attr:`BaseChannel.receive`).
+        """
         if not self._channels:
             logger.warning("No channels registered — nothing to start")
             return
 
+        for ch in self._channels.values():
+            ch.receive = receive
+        self._routing = True
+        self._router = asyncio.create_task(self._route_outbound(), name="outbound-router")
         self._tasks = [
-            asyncio.create_task(self._route_outbound(), name="outbound-router"),
+            self._router,
             *(
                 asyncio.create_task(ch.start(), name=f"channel-{name}")
                 for name, ch in self._channels.items()
@@ -75,7 +116,35 @@ class ChannelManager:
         await asyncio.gather(*self._tasks, return_exceptions=True)
 
     async def stop_all(self) -> None:
-        """Cancel running tasks, then gracefully stop each channel."""
+        """Stop routing, drain pending sends, then stop each channel.
+
+        Lanes get ``delivery.drain_timeout`` seconds to finish; whatever is
+        still undelivered after that (including messages buffered inside a
+        channel) is parked in the dead-letter store rather than dropped.
+        """
+        if self._router:
+            # The flag as well: wait_for() can swallow a cancel that lands
+            # just as the bus reports activity.
+            self._routing = False
+            self._router.cancel()
+            await asyncio.gather(self._router, return_exceptions=True)
+            self._router = None
+        while self.bus.outbound_size:
+            self._dispatch(await self.bus.consume_outbound())
+
+        lanes = list(self._lanes.values())
+        if self._lane_tasks:
+            _, pending = await asyncio.wait(
+                set(self._lane_tasks), timeout=self.delivery.drain_timeout
+            )
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        # A lane only drops a message once it is delivered or parked.
+        leftover = [msg for lane in lanes for msg in lane]
+        self._lane_tasks.clear()
+        self._lanes.clear()
+
         for t in self._tasks:
             t.cancel()
         await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -86,26 +155,101 @@ class ChannelManager:
                 await ch.stop()
             except Exception as exc:
                 logger.error("Error stopping %s: %s", name, exc)
+            leftover += ch.undelivered()
+
+        for msg in leftover:
+            letter = await run_io(self.dead_letters.park, msg, "undelivered at shutdown", 0)
+            self.stats["dead_lettered"] += 1
+            logger.warning("Parked undelivered message as dead letter %s", letter.id)
 
     def get_status(self) -> dict[str, Any]:
         return {
-            name: {"running": ch.is_running} for name, ch in self._channels.items()
+            name: {"running": ch.is_running, "dropped": dict(ch.dropped)}
+            for name, ch in self._channels.items()
         }
 
+    async def replay(self, letters: list[DeadLetter], ready_timeout: float = 30.0) -> int:
+        """Re-deliver dead *letters* (channels must be started); returns successes.
+
+        Delivered letters are removed from the store; failures stay parked.
+        """
+        delivered: set[str] = set()
+        for letter in letters:
+            ch = self._channels.get(letter.message.channel)
+            if ch is None:
+                logger.warning("Cannot replay %s: %s channel not enabled",
+                               letter.id, letter.message.channel)
+                continue
+            if not await ch.wait_ready(ready_timeout):
+                logger.warning("Cannot replay %s: %s channel not ready",
+                               letter.id, letter.message.channel)
+                continue
+            if await self._deliver(ch, letter.message, park=False):
+                delivered.add(letter.id)
+        await run_io(self.dead_letters.remove, delivered)
+        return len(delivered)
+
     # -- internals ---------------------------------------------------------------
 
     async def _route_outbound(self) -> None:
-        """Wait for outbound messages and deliver them to the matching channel."""
-        while True:
+        """Wait for outbound messages and hand them to per-recipient lanes."""
+        while self._routing:
             if not await self.bus.wait_for_activity(timeout=2.0):
                 continue
             while self.bus.outbound_size:
-                msg = await self.bus.consume_outbound()
+                self._dispatch(await self.bus.consume_outbound())
+
+    def _dispatch(self, msg: OutboundMessage) -> None:
+        key = (msg.channel, msg.recipient)
+        lane = self._lanes.get(key)
+        if lane is not None:
+            lane.append(msg)
+            return
+        lane = self._lanes[key] = deque([msg])
+        task = asyncio.create_task(self._run_lane(key, lane), name=f"deliver-{key[0]}")
+        self._lane_tasks.add(task)
+        task.add_done_callback(self._lane_tasks.discard)
+
+    async def _run_lane(self, key: tuple[str, str], lane: deque[OutboundMessage]) -> None:
+        try:
+            while lane:
+                msg = lane[0]
                 ch = self._channels.get(msg.channel)
                 if ch is None:
                     logger.warning("No channel registered for %r", msg.channel)
+                else:
+                    await self._deliver(ch, msg)
+                lane.popleft()
+        finally:
+            # No await between the last popleft and here, so nothing can
+            # have been appended to this lane in the meantime.
+            self._lanes.pop(key, None)
+
+    async def _deliver(self, ch: BaseChannel, msg: OutboundMessage, *, park: bool = True) -> bool:
+        """Send *msg* with retries. Returns True once delivered."""
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                await ch.send(msg)
+                self.stats["delivered"] += 1
+                return True
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                retryable = not isinstance(exc, DeliveryError) or exc.retryable
+                if retryable and attempts < self.delivery.max_attempts:
+                    delay = backoff_delay(
+                        attempts - 1, self.delivery.backoff_base, self.delivery.backoff_max
+                    )
+                    logger.warning("Delivery to %s failed (%s), retrying in %.1fs",
+                                   msg.channel, exc, delay)
+                    self.stats["retried"] += 1
+                    await asyncio.sleep(delay)
                     continue
-                try:
-                    await ch.send(msg)
-                except Exception as exc:
-                    logger.error("Failed to deliver to %s: %s", msg.channel, exc)
+                logger.error("Giving up on %s after %d attempt(s): %s", msg, attempts, exc)
+                if park:
+                    letter = await run_io(self.dead_letters.park, msg, str(exc), attempts)
+                    self.stats["dead_lettered"] += 1
+                    logger.error("Parked message as dead letter %s", letter.id)
+                return False
@@ -0,0 +1,245 @@
+"""Inbound media ingestion – stream attachments to the workspace.
+
+Attachments are written to disk chunk by chunk (from the I/O thread pool,
+in writes of up to ``FLUSH_SIZE``) and abandoned as soon as they exceed the
+configured size cap, so a large upload never sits in RAM.
+Images are then downscaled/recompressed (when Pillow is installed) so they
+are cheap to hand to a multimodal model.  The store is pruned oldest-first
+beyond ``media.retention_bytes`` and ``media.retention_days``.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+import aiohttp
+
+from huxbot.config.schema import MediaConfig
+from huxbot.utils.aio import run_io
+from huxbot.utils.helpers import ensure_dir, safe_filename
+from huxbot.utils.http import get_session
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Received chunks are buffered up to this size per write on the I/O pool.
+FLUSH_SIZE = 1024 * 1024
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+# Telegram file URLs embed the bot token: .../file/bot<token>/...
+_BOT_TOKEN = re.compile(r"bot\d+:[\w-]+")
+
+
+def redact(text: str) -> str:
+    """*text* with any bot token replaced, for logging."""
+    return _BOT_TOKEN.sub("bot<redacted>", text)
+
+
+class MediaTooLarge(Exception):
+    """Raised when an attachment exceeds the configured size cap."""
+
+
+def is_image(path: str | Path) -> bool:
+    return Path(path).suffix.lower() in IMAGE_SUFFIXES
+
+
+class MediaStore:
+    """Save inbound attachments under ``<workspace>/<media.dir>/<channel>/``."""
+
+    def __init__(self, root: Path, config: MediaConfig) -> None:
+        self.root = root
+        self.config = config
+
+    def _dest(self, channel: str, filename: str) -> Path:
+        name = safe_filename(filename) or "file"
+        return ensure_dir(self.root / channel) / f"{uuid.uuid4().hex[:12]}-{name}"
+
+    async def download(
+        self,
+        url: str,
+        *,
+        channel: str,
+        filename: str,
+        size_hint: int | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> str | None:
+        """Stream *url* to disk and return the saved path, or None if skipped."""
+        if not self.config.enabled:
+            return None
+        if size_hint and size_hint > self.config.max_bytes:
+            logger.info("Skipping %s: %d bytes exceeds media cap", filename, size_hint)
+            return None
+        dest = await run_io(self._dest, channel, filename)
+        try:
+            async with get_session().get(
+                url, headers=headers, timeout=aiohttp.ClientTimeout(total=120)
+            ) as resp:
+                resp.raise_for_status()
+                if resp.content_length and resp.content_length > self.config.max_bytes:
+                    raise MediaTooLarge(resp.content_length)
+                async with _PartialFile(dest, self.config.max_bytes) as f:
+                    async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                        await f.write(chunk)
+        except MediaTooLarge:
+            logger.info("Skipping %s: exceeds media cap", filename)
+            return None
+        except Exception as exc:
+            logger.warning("Failed to download attachment %s: %s", filename, redact(str(exc)))
+            return None
+        return await self._postprocess(dest)
+
+    async def copy(self, src: Path, *, channel: str) -> str | None:
+        """Copy a file already on disk (e.g. saved by a bridge) into the store."""
+        if not self.config.enabled:
+            return None
+        dest = await run_io(self._copy, src, channel)
+        return await self._postprocess(dest) if dest else None
+
+    def _copy(self, src: Path, channel: str) -> Path | None:
+        if not src.is_file():
+            return None
+        if src.stat().st_size > self.config.max_bytes:
+            logger.info("Skipping %s: exceeds media cap", src)
+            return None
+        dest = self._dest(channel, src.name)
+        shutil.copyfile(src, dest)
+        return dest
+
+    async def _postprocess(self, path: Path) -> str | None:
+        if is_image(path):
+            shrunk = await run_io(
+                _shrink_image,
+                path,
+                self.config.image_max_side,
+                self.config.image_quality,
+                self.config.image_max_pixels,
+            )
+            if shrunk is None:
+                return None
+            path = shrunk
+        await run_io(self.prune)
+        return str(path)
+
+    def prune(self) -> None:
+        """Delete the oldest files beyond the retention size and age limits."""
+        max_bytes, max_days = self.config.retention_bytes, self.config.retention_days
+        if max_bytes <= 0 and max_days <= 0:
+            return
+        files = []
+        total = 0
+        for p in self.root.glob("*/*"):
+            if p.name.endswith(".part"):
+                continue  # a download in progress
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        files.sort()
+        cutoff = time.time() - max_days * 86400 if max_days > 0 else 0
+        for mtime, size, p in files:
+            if mtime >= cutoff and (max_bytes <= 0 or total <= max_bytes):
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+
+class _PartialFile:
+    """Write to ``<dest>.part`` and rename into place only on success.
+
+    File operations run on the I/O pool; chunks are buffered so that a
+    download costs one thread hop per ``FLUSH_SIZE`` bytes, not per chunk.
+    """
+
+    def __init__(self, dest: Path, limit: int) -> None:
+        self.dest = dest
+        self.tmp = dest.with_name(dest.name + ".part")
+        self.limit = limit
+        self.size = 0
+        self._buf = bytearray()
+
+    async def __aenter__(self) -> _PartialFile:
+        self._fh = await run_io(self.tmp.open, "wb")
+        return self
+
+    async def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.limit:
+            raise MediaTooLarge(self.size)
+        self._buf += chunk
+        if len(self._buf) >= FLUSH_SIZE:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        data, self._buf = bytes(self._buf), bytearray()
+        await run_io(self._fh.write, data)
+
+    async def __aexit__(self, exc_type, *_exc) -> None:
+        ok = False
+        try:
+            if exc_type is None:
+                await self._flush()
+                ok = True
+        finally:
+            await run_io(self._finish, ok)
+
+    def _finish(self, ok: bool) -> None:
+        self._fh.close()
+        if ok:
+            self.tmp.replace(self.dest)
+        else:
+            self.tmp.unlink(missing_ok=True)
+
+
+def _shrink_image(path: Path, max_side: int, quality: int, max_pixels: int) -> Path | None:
+    """Downscale *path* to fit *max_side* and recompress; returns the final path.
+
+    Leaves the file untouched when Pillow is unavailable or the image
+    cannot be decoded.  An image over *max_pixels* is deleted without being
+    decoded and ``None`` returned.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return path
+
+    try:
+        with Image.open(path) as img:
+            # For JPEGs, draft() decodes at a reduced scale straight away,
+            # keeping peak memory close to the target size.  Other formats
+            # decode at full size, so anything too big is refused unread.
+            img.draft("RGB", (max_side, max_side))
+            width, height = img.size
+            if width * height > max_pixels:
+                out = None
+            elif max(img.size) <= max_side and img.format == "JPEG":
+                return path
+            else:
+                img.thumbnail((max_side, max_side))
+                has_alpha = img.mode in ("RGBA", "LA") or (
+                    img.mode == "P" and "transparency" in img.info
+                )
+                if has_alpha:
+                    out = path.with_suffix(".png")
+                    img.save(out, "PNG", optimize=True)
+                else:
+                    out = path.with_suffix(".jpg")
+                    img.convert("RGB").save(out, "JPEG", quality=quality, optimize=True)
+    except Exception as exc:
+        logger.warning("Could not process image %s: %s", path, exc)
+        return path
+
+    if out is None:
+        logger.info("Dropping image %s: %dx%d pixels is over the limit", path, width, height)
+        path.unlink(missing_ok=True)
+        return None
+    if out != path:
+        path.unlink(missing_ok=True)
+    return out
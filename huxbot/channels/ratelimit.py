@@ -0,0 +1,174 @@
+"""Discord REST rate limiting – per-route buckets plus the global limit.
+
+Discord groups routes into buckets identified by the ``X-RateLimit-Bucket``
+header; a bucket is further split by its *major parameter* (the channel id
+for message routes).  Requests that share a bucket are serialised through a
+FIFO lock and wait for the bucket to reset once ``remaining`` hits zero, so
+a burst is spread out instead of bouncing off 429s.  Unrelated buckets have
+independent locks and never wait on each other, except while the global
+limit is in effect.  Buckets idle for a few minutes are dropped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Bucket:
+    """Mutable state for one (bucket, major parameter) pair."""
+
+    remaining: int = 1
+    reset_at: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_used: float = 0.0
+
+
+# Buckets unused (and reset) for this long are forgotten; checked this often.
+_IDLE_SECONDS = 300.0
+_SWEEP_INTERVAL = 60.0
+
+
+class DiscordRateLimiter:
+    """Track Discord rate-limit buckets and pace requests proactively.
+
+    Usage::
+
+        route = ("POST", "/channels/{channel_id}/messages")
+        async with limiter.acquire(route, major=channel_id) as ticket:
+            async with session.post(...) as resp:
+                if await ticket.update(resp.status, resp.headers, body):
+                    ...  # rate limited – retry
+    """
+
+    def __init__(self) -> None:
+        # route template → bucket hash learned from X-RateLimit-Bucket
+        self._route_buckets: dict[tuple[str, str], str] = {}
+        self._buckets: dict[str, _Bucket] = {}
+        self._global_clear = asyncio.Event()
+        self._global_clear.set()
+        self._next_sweep = time.monotonic() + _SWEEP_INTERVAL
+
+    def _key(self, route: tuple[str, str], major: str) -> str:
+        bucket = self._route_buckets.get(route)
+        if bucket is None:
+            # Unknown until the first response; key by the route itself.
+            bucket = f"{route[0]} {route[1]}"
+        return f"{bucket}:{major}"
+
+    def _bucket(self, key: str) -> _Bucket:
+        b = self._buckets.get(key)
+        if b is None:
+            b = self._buckets[key] = _Bucket()
+        return b
+
+    def _sweep(self, now: float) -> None:
+        self._next_sweep = now + _SWEEP_INTERVAL
+        for key, b in list(self._buckets.items()):
+            if not b.lock.locked() and now - b.last_used > _IDLE_SECONDS and now > b.reset_at:
+                del self._buckets[key]
+
+    @asynccontextmanager
+    async def acquire(self, route: tuple[str, str], major: str = "") -> AsyncIterator[_Ticket]:
+        """Hold the bucket for *route*/*major* for the duration of one request."""
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        while True:
+            bucket = self._bucket(self._key(route, major))
+            await bucket.lock.acquire()
+            # The route's bucket may have been learned (or the idle entry
+            # dropped) while we queued; then queue on the current one.
+            if self._buckets.get(self._key(route, major)) is bucket:
+                break
+            bucket.lock.release()
+        try:
+            await self._global_clear.wait()
+            if bucket.remaining <= 0:
+                delay = bucket.reset_at - time.monotonic()
+                if delay > 0:
+                    logger.debug("Discord bucket exhausted, waiting %.2fs", delay)
+                    await asyncio.sleep(delay)
+                bucket.remaining = 1
+            yield _Ticket(self, route, major, bucket)
+        finally:
+            bucket.last_used = time.monotonic()
+            bucket.lock.release()
+
+    def _learn(
+        self, route: tuple[str, str], major: str, bucket_hash: str, current: _Bucket
+    ) -> _Bucket:
+        """Record *bucket_hash* for *route* and move *current*'s state under it."""
+        if self._route_buckets.get(route) == bucket_hash:
+            return current
+        self._route_buckets[route] = bucket_hash
+        key = f"{bucket_hash}:{major}"
+        # Several routes may share one bucket; keep whichever state exists.
+        return self._buckets.setdefault(key, current)
+
+    async def _hold_global(self, retry_after: float) -> None:
+        if not self._global_clear.is_set():
+            return
+        logger.warning("Discord global rate limit hit, pausing %.2fs", retry_after)
+        self._global_clear.clear()
+        try:
+            await asyncio.sleep(retry_after)
+        finally:
+            self._global_clear.set()
+
+
+class _Ticket:
+    """Handle returned by :meth:`DiscordRateLimiter.acquire` for one request."""
+
+    def __init__(
+        self,
+        limiter: DiscordRateLimiter,
+        route: tuple[str, str],
+        major: str,
+        bucket: _Bucket,
+    ) -> None:
+        self._limiter = limiter
+        self._route = route
+        self._major = major
+        self._bucket = bucket
+
+    async def update(self, status: int, headers: Mapping[str, str], body: Any = None) -> bool:
+        """Apply response *headers* to the bucket.
+
+        Returns True when the request was rate limited and should be
+        retried; the next :meth:`DiscordRateLimiter.acquire` waits out the
+        bucket reset, and a global limit is waited out here.
+        """
+        bucket_hash = headers.get("X-RateLimit-Bucket")
+        if bucket_hash:
+            self._bucket = self._limiter._learn(
+                self._route, self._major, bucket_hash, self._bucket
+            )
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is not None:
+            self._bucket.remaining = int(remaining)
+        if reset_after is not None:
+            self._bucket.reset_at = time.monotonic() + float(reset_after)
+
+        if status != 429:
+            return False
+
+        data = body if isinstance(body, dict) else {}
+        retry_after = float(data.get("retry_after") or headers.get("Retry-After") or 1.0)
+        is_global = bool(data.get("global")) or headers.get("X-RateLimit-Global") == "true"
+        if is_global:
+            await self._limiter._hold_global(retry_after)
+        else:
+            self._bucket.remaining = 0
+            self._bucket.reset_at = time.monotonic() + retry_after
+        return True
@@ -1,21 +1,29 @@
-"""Telegram channel – long-polling via python-telegram-bot."""
+"""Telegram channel – webhook (aiohttp) or long-polling via python-telegram-bot."""
 
 from __future__ import annotations
 
 import asyncio
+import hmac
 import logging
 import re
+import secrets
+from urllib.parse import urlparse
 
-from telegram import Update
+from aiohttp import web
+from telegram import Message, Update
+from telegram.error import BadRequest, Forbidden
 from telegram.ext import Application, MessageHandler, CommandHandler, ContextTypes, filters
 
 from huxbot.bus.events import OutboundMessage
 from huxbot.bus.queue import MessageBus
-from huxbot.channels.base import BaseChannel
+from huxbot.channels.base import BaseChannel, DeliveryError
+from huxbot.channels.media import MediaStore
 from huxbot.config.schema import ChannelConfig
 
 logger = logging.getLogger(__name__)
 
+_SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
 # Regex that splits text into fenced code blocks, inline code, and plain prose.
 _SEGMENT_RE = re.compile(r"(```[\w]*\n?[\s\S]*?```|`[^`]+`)")
 
@@ -74,13 +82,28 @@ def _convert_prose(text: str) -> str:
 
 
 class TelegramChannel(BaseChannel):
-    """Telegram channel using long-polling."""
+    """Telegram channel using a webhook when configured, long-polling otherwise.
+
+    Webhook mode is enabled by setting ``extra.webhook_url`` to the public
+    HTTPS URL Telegram should post to.  A small aiohttp server listens on
+    ``extra.webhook_listen``/``extra.webhook_port`` (default ``0.0.0.0:8443``)
+    at the URL's path, typically behind a TLS-terminating reverse proxy.
+    Requests must carry the ``extra.webhook_secret`` token (generated per
+    run when unset).
+    """
 
     name = "telegram"
 
-    def __init__(self, config: ChannelConfig, bus: MessageBus) -> None:
-        super().__init__(config, bus)
+    def __init__(
+        self, config: ChannelConfig, bus: MessageBus, media: MediaStore | None = None
+    ) -> None:
+        super().__init__(config, bus, media)
         self._app: Application | None = None
+        self._webhook_runner: web.AppRunner | None = None
+        self._webhook_secret = ""
+        self._stopped = asyncio.Event()
+        self._bot_id = 0
+        self._mention: re.Pattern[str] | None = None
 
     async def start(self) -> None:
         if not self.config.token:
@@ -88,46 +111,114 @@ class TelegramChannel(BaseChannel):
             return
 
         self._running = True
-        self._app = Application.builder().token(self.config.token).build()
-
-        self._app.add_handler(
-            MessageHandler(filters.TEXT & ~filters.COMMAND, self._on_message)
+        self._stopped.clear()
+        webhook_url = self.config.extra.get("webhook_url", "")
+
+        builder = Application.builder().token(self.config.token)
+        if webhook_url or not self.receive:
+            # Updates arrive through our own server (or not at all), not
+            # PTB's updater.
+            builder = builder.updater(None)
+        self._app = builder.build()
+
+        inbound = (
+            filters.TEXT
+            | filters.PHOTO
+            | filters.Document.ALL
+            | filters.VOICE
+            | filters.AUDIO
+            | filters.VIDEO
         )
+        self._app.add_handler(MessageHandler(inbound & ~filters.COMMAND, self._on_message))
         self._app.add_handler(CommandHandler("start", self._on_start))
 
         await self._app.initialize()
         await self._app.start()
 
         bot_info = await self._app.bot.get_me()
+        self._bot_id = bot_info.id
+        self._mention = re.compile(rf"@{re.escape(bot_info.username)}\b", re.IGNORECASE)
         logger.info("Telegram bot @%s connected", bot_info.username)
+        self._ready.set()
+
+        # A send-only instance leaves polling / the webhook to the gateway.
+        if self.receive and webhook_url:
+            await self._start_webhook(webhook_url)
+        elif self.receive:
+            await self._app.updater.start_polling(
+                allowed_updates=["message"], drop_pending_updates=True
+            )
 
-        await self._app.updater.start_polling(
-            allowed_updates=["message"], drop_pending_updates=True
-        )
-
-        while self._running:
-            await asyncio.sleep(1)
+        await self._stopped.wait()
 
     async def stop(self) -> None:
         self._running = False
+        self._ready.clear()
+        self._stopped.set()
+        if self._webhook_runner:
+            await self._webhook_runner.cleanup()
+            self._webhook_runner = None
         if self._app:
-            await self._app.updater.stop()
+            if self._app.updater:
+                await self._app.updater.stop()
             await self._app.stop()
             await self._app.shutdown()
             self._app = None
 
+    async def _start_webhook(self, webhook_url: str) -> None:
+        """Serve the webhook endpoint and register it with Telegram."""
+        extra = self.config.extra
+        self._webhook_secret = extra.get("webhook_secret") or secrets.token_urlsafe(32)
+        path = urlparse(webhook_url).path or "/"
+
+        app = web.Application()
+        app.router.add_post(path, self._on_webhook)
+        self._webhook_runner = web.AppRunner(app, access_log=None)
+        await self._webhook_runner.setup()
+        listen = extra.get("webhook_listen", "0.0.0.0")
+        port = int(extra.get("webhook_port", 8443))
+        await web.TCPSite(self._webhook_runner, listen, port).start()
+
+        await self._app.bot.set_webhook(
+            url=webhook_url,
+            allowed_updates=["message"],
+            drop_pending_updates=True,
+            secret_token=self._webhook_secret,
+        )
+        logger.info("Telegram webhook listening on %s:%s%s", listen, port, path)
+
+    async def _on_webhook(self, request: web.Request) -> web.Response:
+        token = request.headers.get(_SECRET_HEADER, "")
+        # Compare bytes: compare_digest rejects non-ASCII str with TypeError.
+        if not hmac.compare_digest(
+            token.encode("utf-8", "surrogateescape"), self._webhook_secret.encode()
+        ):
+            return web.Response(status=403)
+        if not self._app:
+            return web.Response(status=503)
+        try:
+            update = Update.de_json(await request.json(), self._app.bot)
+        except Exception:
+            return web.Response(status=400)
+        await self._app.update_queue.put(update)
+        return web.Response()
+
     async def send(self, msg: OutboundMessage) -> None:
         if not self._app:
-            return
+            raise DeliveryError("Telegram channel not started")
         try:
             chat_id = int(msg.recipient)
-            html = _markdown_to_telegram_html(msg.text)
-            await self._app.bot.send_message(chat_id=chat_id, text=html, parse_mode="HTML")
-        except Exception:
+        except ValueError:
+            raise DeliveryError(f"Invalid Telegram chat id {msg.recipient!r}", retryable=False)
+        try:
             try:
-                await self._app.bot.send_message(chat_id=int(msg.recipient), text=msg.text)
-            except Exception as exc:
-                logger.error("Error sending Telegram message: %s", exc)
+                html = _markdown_to_telegram_html(msg.text)
+                await self._app.bot.send_message(chat_id=chat_id, text=html, parse_mode="HTML")
+            except BadRequest:
+                # Usually HTML Telegram can't parse – fall back to plain text.
+                await self._app.bot.send_message(chat_id=chat_id, text=msg.text)
+        except (BadRequest, Forbidden) as exc:
+            raise DeliveryError(f"Telegram rejected message: {exc}", retryable=False) from exc
 
     async def _on_start(self, update: Update, _ctx: ContextTypes.DEFAULT_TYPE) -> None:
         if update.message and update.effective_user:
@@ -144,15 +235,77 @@ class TelegramChannel(BaseChannel):
         if user.username:
             ids.add(user.username)
 
-        content = update.message.text or "[empty]"
+        attachments = self._attachments(update.message)
+        content = (
+            update.message.text
+            or update.message.caption
+            or ("[attachment]" if attachments else "[empty]")
+        )
 
+        mentioned = bool(self._mention and self._mention.search(content))
+        if mentioned:
+            content = self._mention.sub("", content).strip() or "[empty]"
+        replied_to = update.message.reply_to_message
         await self._forward_to_bus(
             sender_ids=ids,
             chat_id=str(update.message.chat_id),
             content=content,
+            media=lambda: self._download_attachments(attachments),
             metadata={
                 "message_id": update.message.message_id,
                 "username": user.username,
                 "first_name": user.first_name,
             },
+            is_direct=update.message.chat.type == "private",
+            mentioned=mentioned,
+            reply_to_bot=bool(
+                replied_to and replied_to.from_user and replied_to.from_user.id == self._bot_id
+            ),
         )
+
+    def _attachments(self, message: Message) -> list[tuple[str, str, int | None]]:
+        """Return ``(file_id, filename, size)`` for each attachment on *message*."""
+        found: list[tuple[str, str, int | None]] = []
+        if message.photo:
+            # Sizes are ascending; take the smallest one that still covers the
+            # target resolution so we don't download pixels we'd throw away.
+            want = self.media.config.image_max_side if self.media else 0
+            photo = next(
+                (p for p in message.photo if max(p.width, p.height) >= want),
+                message.photo[-1],
+            )
+            found.append((photo.file_id, f"{photo.file_unique_id}.jpg", photo.file_size))
+        for item, ext in (
+            (message.document, ""),
+            (message.voice, ".ogg"),
+            (message.audio, ".mp3"),
+            (message.video, ".mp4"),
+        ):
+            if item is None:
+                continue
+            name = getattr(item, "file_name", None) or f"{item.file_unique_id}{ext}"
+            found.append((item.file_id, name, item.file_size))
+        return found
+
+    async def _download_attachments(
+        self, attachments: list[tuple[str, str, int | None]]
+    ) -> list[str]:
+        if not self.media or not self._app:
+            return []
+        paths: list[str] = []
+        for file_id, filename, size in attachments:
+            if size and size > self.media.config.max_bytes:
+                continue
+            try:
+                tg_file = await self._app.bot.get_file(file_id)
+            except Exception as exc:
+                logger.warning("Could not resolve Telegram file %s: %s", filename, exc)
+                continue
+            if not tg_file.file_path:
+                continue
+            path = await self.media.download(
+                tg_file.file_path, channel=self.name, filename=filename, size_hint=size
+            )
+            if path:
+                paths.append(path)
+        return paths
@@ -5,41 +5,74 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+from collections import deque
+from pathlib import Path
+from typing import Any
 
 import aiohttp
 
 from huxbot.bus.events import OutboundMessage
 from huxbot.bus.queue import MessageBus
-from huxbot.channels.base import BaseChannel
+from huxbot.channels.base import BaseChannel, DeliveryError
+from huxbot.channels.media import MediaStore
 from huxbot.config.schema import ChannelConfig
+from huxbot.utils.helpers import backoff_delay
+from huxbot.utils.http import get_session
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_OUTBOX_SIZE = 100
+# Seconds between WebSocket pings; the socket is dropped if no pong arrives.
+HEARTBEAT_INTERVAL = 20.0
+
 
 class WhatsAppChannel(BaseChannel):
-    """WhatsApp channel via a Node.js bridge (baileys)."""
+    """WhatsApp channel via a Node.js bridge (baileys).
+
+    Bridge ``message`` events may carry a ``media`` list whose entries hold
+    either a ``url`` the bridge serves the file from or a local ``path`` it
+    saved the file to, plus optional ``filename`` and ``size``.
+
+    Replies sent while the bridge is unreachable are held in a bounded
+    outbox (``extra.outbox_size``) and flushed in order once the connection
+    is re-established.  When the outbox is full, ``send`` raises a
+    retryable :class:`DeliveryError` so the manager backs off.  Whatever is
+    still in the outbox at shutdown is handed back via :meth:`undelivered`.
+    """
 
     name = "whatsapp"
 
-    def __init__(self, config: ChannelConfig, bus: MessageBus) -> None:
-        super().__init__(config, bus)
+    def __init__(
+        self, config: ChannelConfig, bus: MessageBus, media: MediaStore | None = None
+    ) -> None:
+        super().__init__(config, bus, media)
         self._ws: aiohttp.ClientWebSocketResponse | None = None
         self._session: aiohttp.ClientSession | None = None
+        self._outbox: deque[OutboundMessage] = deque(
+            maxlen=int(config.extra.get("outbox_size", DEFAULT_OUTBOX_SIZE))
+        )
+        self._send_lock = asyncio.Lock()
 
     async def start(self) -> None:
         bridge_url = self.config.extra.get("bridge_url", "ws://localhost:3001")
 
         self._running = True
-        self._session = aiohttp.ClientSession()
+        self._session = get_session()
+        attempt = 0
 
         while self._running:
             try:
                 logger.info("Connecting to WhatsApp bridge at %s...", bridge_url)
-                self._ws = await self._session.ws_connect(bridge_url)
+                self._ws = await self._session.ws_connect(bridge_url, heartbeat=HEARTBEAT_INTERVAL)
                 logger.info("Connected to WhatsApp bridge")
+                attempt = 0
+                await self._flush_outbox()
+                self._ready.set()
                 async for raw_msg in self._ws:
                     if raw_msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
                         break
+                    if not self.receive:
+                        continue
                     try:
                         await self._handle_bridge_message(raw_msg.data)
                     except Exception as exc:
@@ -48,23 +81,62 @@ class WhatsAppChannel(BaseChannel):
                 break
             except Exception as exc:
                 logger.warning("WhatsApp bridge error: %s", exc)
-                if self._running:
-                    await asyncio.sleep(5)
+
+            self._ws = None
+            self._ready.clear()
+            if self._running:
+                delay = backoff_delay(attempt, cap=30.0)
+                attempt += 1
+                logger.info("Reconnecting to WhatsApp bridge in %.1fs", delay)
+                await asyncio.sleep(delay)
 
     async def stop(self) -> None:
         self._running = False
+        self._ready.clear()
         if self._ws:
             await self._ws.close()
-        if self._session:
-            await self._session.close()
+
+    def undelivered(self) -> list[OutboundMessage]:
+        pending = list(self._outbox)
+        self._outbox.clear()
+        return pending
+
+    @staticmethod
+    def _payload(msg: OutboundMessage) -> dict[str, Any]:
+        return {"type": "send", "to": msg.recipient, "text": msg.text}
 
     async def send(self, msg: OutboundMessage) -> None:
-        if not self._ws:
-            return
-        try:
-            await self._ws.send_json({"type": "send", "to": msg.recipient, "text": msg.text})
-        except Exception as exc:
-            logger.error("Error sending WhatsApp message: %s", exc)
+        async with self._send_lock:
+            # Anything already queued must go first to preserve ordering.
+            if self._outbox or not self._connected:
+                self._enqueue(msg)
+                return
+            try:
+                await self._ws.send_json(self._payload(msg))  # type: ignore[union-attr]
+            except Exception as exc:
+                logger.warning("WhatsApp send failed, buffering: %s", exc)
+                self._enqueue(msg)
+
+    @property
+    def _connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    def _enqueue(self, msg: OutboundMessage) -> None:
+        if len(self._outbox) == self._outbox.maxlen:
+            raise DeliveryError("WhatsApp bridge unavailable and outbox full")
+        self._outbox.append(msg)
+
+    async def _flush_outbox(self) -> None:
+        async with self._send_lock:
+            if self._outbox:
+                logger.info("Flushing %d buffered WhatsApp messages", len(self._outbox))
+            while self._outbox and self._connected:
+                try:
+                    await self._ws.send_json(self._payload(self._outbox[0]))  # type: ignore[union-attr]
+                except Exception as exc:
+                    logger.warning("WhatsApp flush interrupted: %s", exc)
+                    return
+                self._outbox.popleft()
 
     async def _handle_bridge_message(self, raw: str) -> None:
         try:
@@ -74,13 +146,43 @@ class WhatsAppChannel(BaseChannel):
 
         if data.get("type") == "message":
             sender = data.get("sender", "")
-            content = data.get("content", "")
+            media_items = data.get("media") or []
+            content = data.get("content", "") or ("[attachment]" if media_items else "")
             chat_id = sender.split("@")[0] if "@" in sender else sender
+            is_group = bool(data.get("isGroup", False))
+            # The bridge does not report mentions; WhatsApp renders them as
+            # "@<number>" in the text, so match the bot's own number.
+            mention = "@" + str(self.config.extra.get("phone", "")).lstrip("+")
+            mentioned = len(mention) > 1 and mention in content
+            if mentioned:
+                content = content.replace(mention, "").strip() or "[empty]"
             await self._forward_to_bus(
                 sender_ids={chat_id},
                 chat_id=sender,
                 content=content,
-                metadata={"message_id": data.get("id"), "is_group": data.get("isGroup", False)},
+                media=lambda: self._ingest_media(media_items),
+                metadata={"message_id": data.get("id"), "is_group": is_group},
+                is_direct=not is_group,
+                mentioned=mentioned,
             )
         elif data.get("type") == "status":
             logger.info("WhatsApp status: %s", data.get("status"))
+
+    async def _ingest_media(self, items: list[dict[str, Any]]) -> list[str]:
+        if not self.media:
+            return []
+        paths: list[str] = []
+        for item in items:
+            path: str | None = None
+            if item.get("url"):
+                path = await self.media.download(
+                    item["url"],
+                    channel=self.name,
+                    filename=item.get("filename", "attachment"),
+                    size_hint=item.get("size"),
+                )
+            elif item.get("path"):
+                path = await self.media.copy(Path(item["path"]), channel=self.name)
+            if path:
+                paths.append(path)
+        return paths
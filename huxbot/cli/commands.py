@@ -117,6 +117,8 @@ def agent(
     from huxbot.bus.queue import MessageBus
     from huxbot.agent.factory import build_agent_and_runner
     from huxbot.agent.processor import MessageProcessor
+    from huxbot.tools import shell
+    from huxbot.utils import aio, http
 
     config = load_config()
     if not config.provider.api_key:
@@ -124,14 +126,21 @@ def agent(
         console.print("Set it in ~/.huxbot/config.json → provider.api_key")
         raise typer.Exit(1)
 
+    http.configure(config.http)
+    aio.configure(config.io)
     bus = MessageBus()
     _agent, runner, session_service = build_agent_and_runner(config, bus)
     processor = MessageProcessor(runner, session_service, bus)
 
     if message:
         async def _run_once() -> None:
-            resp = await processor.process_single(message, session_id)
-            console.print(f"\n{resp or '(no response)'}")
+            try:
+                resp = await processor.process_single(message, session_id)
+                console.print(f"\n{resp or '(no response)'}")
+            finally:
+                await shell.shutdown()
+                await http.close_sessions()
+                aio.shutdown()
 
         asyncio.run(_run_once())
     else:
@@ -148,6 +157,9 @@ def agent(
                 except (KeyboardInterrupt, EOFError):
                     console.print("\nGoodbye!")
                     break
+            await shell.shutdown()
+            await http.close_sessions()
+            aio.shutdown()
 
         asyncio.run(_run_interactive())
 
@@ -164,12 +176,16 @@ def gateway() -> None:
     from huxbot.agent.factory import build_agent_and_runner
     from huxbot.agent.processor import MessageProcessor
     from huxbot.channels.manager import ChannelManager
+    from huxbot.tools import shell
+    from huxbot.utils import aio, http
 
     config = load_config()
     if not config.provider.api_key:
         console.print("[red]Error: No API key configured.[/red]")
         raise typer.Exit(1)
 
+    http.configure(config.http)
+    aio.configure(config.io)
     bus = MessageBus()
     _agent, runner, session_service = build_agent_and_runner(config, bus)
     processor = MessageProcessor(runner, session_service, bus)
@@ -183,6 +199,8 @@ def gateway() -> None:
     console.print("Starting gateway...")
 
     async def _run() -> None:
+        lag = aio.LoopLagMonitor(config.io.lag_interval, config.io.lag_warn_ms / 1000)
+        lag.start()
         try:
             await asyncio.gather(
                 processor.run(),
@@ -192,11 +210,120 @@ def gateway() -> None:
             console.print("\nShutting down...")
             processor.stop()
             await channels.stop_all()
+        finally:
+            lag.stop()
+            console.print(f"Event loop lag: {lag.summary()}")
+            await shell.shutdown()
+            await http.close_sessions()
+            aio.shutdown()
 
     asyncio.run(_run())
 
 
 
+# ---------------------------------------------------------------------------
+# deadletter
+# ---------------------------------------------------------------------------
+
+@app.command()
+def deadletter(
+    ids: list[str] = typer.Argument(None, help="Only act on these dead-letter ids"),
+    replay: bool = typer.Option(False, "--replay", help="Re-deliver the parked messages"),
+    purge: bool = typer.Option(False, "--purge", help="Delete the parked messages"),
+) -> None:
+    """List, replay or purge outbound messages that could not be delivered."""
+    from huxbot.config import load_config
+    from huxbot.bus.queue import MessageBus
+    from huxbot.channels.deadletter import DeadLetterStore
+    from huxbot.channels.manager import ChannelManager
+    from huxbot.utils import http
+
+    config = load_config()
+    store = DeadLetterStore(Path(config.delivery.dead_letter_file))
+    letters = [letter for letter in store.entries() if not ids or letter.id in ids]
+
+    if not letters:
+        console.print("No dead letters.")
+        return
+
+    if purge:
+        removed = store.remove({letter.id for letter in letters})
+        console.print(f"[green]✓[/green] Purged {removed} dead letter(s)")
+        return
+
+    if not replay:
+        from rich.markup import escape
+
+        for letter in letters:
+            console.print(
+                f"[cyan]{letter.id}[/cyan] {letter.failed_at} {escape(str(letter.message))} "
+                f"[dim]({letter.attempts} attempt(s): {escape(letter.error)})[/dim]"
+            )
+        console.print("\nReplay with [cyan]huxbot deadletter --replay[/cyan]")
+        return
+
+    async def _replay() -> int:
+        http.configure(config.http)
+        manager = ChannelManager(config, MessageBus())
+        # Send side only: polling, webhooks and inbound stay with the gateway.
+        runner = asyncio.create_task(manager.start_all(receive=False))
+        try:
+            return await manager.replay(letters)
+        finally:
+            await manager.stop_all()
+            runner.cancel()
+            await http.close_sessions()
+
+    delivered = asyncio.run(_replay())
+    console.print(f"Replayed {delivered}/{len(letters)} dead letter(s)")
+
+
+# ---------------------------------------------------------------------------
+# loadtest
+# ---------------------------------------------------------------------------
+
+@app.command()
+def loadtest(
+    users: int = typer.Option(10, "--users", "-u", help="Concurrent simulated users"),
+    messages: int = typer.Option(20, "--messages", "-n", help="Messages per user"),
+    think: float = typer.Option(0.0, "--think", help="Mean think time between messages (s)"),
+    latency: float = typer.Option(0.0, "--latency", help="Stub model response time (s)"),
+    timeout: float = typer.Option(30.0, "--timeout", help="Per-reply timeout (s)"),
+) -> None:
+    """Measure gateway throughput with simulated users and a stub model."""
+    from huxbot.config import load_config
+    from huxbot.cli.loadtest import run_loadtest
+
+    config = load_config()
+    console.print(
+        f"Load test: {users} user(s) × {messages} message(s), "
+        f"think {think}s, model latency {latency}s"
+    )
+    report = asyncio.run(
+        run_loadtest(
+            config,
+            users=users,
+            messages=messages,
+            think=think,
+            timeout=timeout,
+            latency=latency,
+        )
+    )
+
+    errors = f" [red]({report.errors} timed out)[/red]" if report.errors else ""
+    console.print(f"\nReplies: {report.completed}/{report.sent}{errors}")
+    console.print(f"Elapsed: {report.elapsed:.2f}s")
+    console.print(f"Throughput: {report.throughput:.1f} msg/s")
+    console.print(f"Event loop lag: {report.loop_lag}")
+    console.print(
+        "Latency: "
+        + "  ".join(
+            f"p{p}={report.percentile(p) * 1000:.1f}ms" for p in (50, 90, 99)
+        )
+        + f"  max={report.percentile(100) * 1000:.1f}ms"
+    )
+
+
 # ---------------------------------------------------------------------------
 # status
 # ---------------------------------------------------------------------------
@@ -0,0 +1,121 @@
+"""End-to-end load generator for the gateway.
+
+Simulated users talk to the :class:`~huxbot.channels.loopback.LoopbackChannel`
+while a :class:`~huxbot.agent.stub.StubLlm` answers, so a run exercises the
+real bus → processor → outbound router path without any platform accounts
+or model API calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+
+from huxbot.config.schema import HuxBotConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadTestReport:
+    users: int
+    sent: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    loop_lag: str = ""
+
+    @property
+    def completed(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile of the reply latencies, in seconds."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+
+async def run_loadtest(
+    config: HuxBotConfig,
+    *,
+    users: int,
+    messages: int,
+    think: float = 0.0,
+    timeout: float = 30.0,
+    latency: float = 0.0,
+) -> LoadTestReport:
+    """Drive *users* concurrent users, each sending *messages* messages.
+
+    *think* is the mean pause between a reply and the user's next message
+    (exponentially distributed); *latency* is the stub model's response time.
+    """
+    from huxbot.agent.factory import build_agent_and_runner
+    from huxbot.agent.processor import MessageProcessor
+    from huxbot.agent.stub import StubLlm
+    from huxbot.bus.queue import MessageBus
+    from huxbot.channels.loopback import LoopbackChannel
+    from huxbot.channels.manager import ChannelManager
+    from huxbot.utils.aio import LoopLagMonitor
+
+    # Only the loopback channel, and no hardware board to open.
+    config = config.model_copy(deep=True)
+    for name in type(config.channels).model_fields:
+        getattr(config.channels, name).enabled = name == "loopback"
+    config.channels.loopback.allow_from = []
+    config.hardware.enabled = False
+
+    bus = MessageBus()
+    _agent, runner, session_service = build_agent_and_runner(
+        config, bus, model=StubLlm(latency=latency)
+    )
+    processor = MessageProcessor(runner, session_service, bus)
+    manager = ChannelManager(config, bus)
+    channel = manager.get_channel("loopback")
+    assert isinstance(channel, LoopbackChannel)
+
+    report = LoadTestReport(users=users)
+    lag = LoopLagMonitor(config.io.lag_interval, config.io.lag_warn_ms / 1000)
+
+    async def _user(n: int) -> None:
+        chat_id = f"user{n}"
+        for i in range(messages):
+            if think > 0 and i:
+                await asyncio.sleep(random.expovariate(1 / think))
+            report.sent += 1
+            started = time.perf_counter()
+            try:
+                await channel.request(chat_id, f"message {i} from {chat_id}", timeout=timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                report.errors += 1
+                continue
+            report.latencies.append(time.perf_counter() - started)
+
+    tasks = [
+        asyncio.create_task(processor.run(), name="loadtest-processor"),
+        asyncio.create_task(manager.start_all(), name="loadtest-channels"),
+    ]
+    try:
+        await channel.wait_ready(timeout)
+        lag.start()
+        started = time.perf_counter()
+        await asyncio.gather(*(_user(n) for n in range(users)))
+        report.elapsed = time.perf_counter() - started
+    finally:
+        lag.stop()
+        report.loop_lag = lag.summary()
+        processor.stop()
+        await manager.stop_all()
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return report
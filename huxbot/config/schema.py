@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -34,8 +34,49 @@ class ToolsConfig(BaseModel):
     """Tool-level settings."""
 
     exec_timeout: int = 30
+    exec_output_limit: int = 256 * 1024  # bytes of output kept per command (head + tail)
+    shell_max_sessions: int = 4  # persistent shells alive at once
+    shell_idle_timeout: int = 600  # seconds before an unused shell is closed
+    jobs_max_running: int = 4  # background jobs at once
+    jobs_timeout: int = 3600  # seconds before a background job is killed; 0 = never
     web_search_api_key: str = ""
-    web_search_engine: str = "google"
+    web_search_engine: str = "google"  # "google", "brave", "searxng" or "fake"
+    web_search_cx: str = ""  # Google Programmable Search engine id
+    web_search_url: str = ""  # SearXNG base URL
+    web_search_cache_ttl: int = 900  # seconds; 0 disables the cache
+    web_fetch_max_bytes: int = 2 * 1024 * 1024  # stop downloading past this
+    web_fetch_max_chars: int = 200_000  # of extracted text; long pages spill to artifacts
+    web_cache_dir: str = "~/.huxbot/cache/web"
+    web_cache_max_bytes: int = 64 * 1024 * 1024  # 0 disables the cache
+    memo_ttl: int = 300  # seconds repeated read_file/list_dir/web_fetch results are reused; 0 = off
+    memo_max_entries: int = 512
+    spill_threshold_tokens: int = 4000  # longer tool outputs are saved as artifacts; 0 = off
+    spill_preview_tokens: int = 600  # of a spilled output shown inline
+    artifacts_dir: str = "artifacts"  # relative to the agent workspace
+    artifacts_max_bytes: int = 64 * 1024 * 1024
+    search_max_files: int = 20000  # files indexed by search_workspace
+    search_max_file_bytes: int = 512 * 1024  # larger files are scanned, not indexed
+    # Deadline in seconds per tool name or glob (most specific wins); others have none.
+    tool_timeouts: dict[str, float] = Field(
+        default_factory=lambda: {
+            "hardware_*": 5.0,
+            "hardware_capture_image": 20.0,
+            "hardware_batch": 0.0,  # scales with the command count; bounded by the board
+            "web_fetch": 20.0,
+            "web_search": 15.0,
+        }
+    )
+    # Tools behind a circuit breaker, by name or glob -> breaker name.  Tools
+    # mapped to the same name share one; tools taking a url get one per host.
+    breakers: dict[str, str] = Field(
+        default_factory=lambda: {
+            "hardware_*": "hardware",
+            "web_fetch": "web_fetch",
+            "web_search": "web_search",
+        }
+    )
+    breaker_failures: int = 3  # consecutive failures that open a breaker
+    breaker_reset: float = 30.0  # seconds before an open breaker lets a trial call through
     allowed_paths: list[str] = Field(default_factory=list)
 
 
@@ -46,15 +87,67 @@ class HardwareConfig(BaseModel):
     transport: str = "serial"  # "serial" or "network"
     port: str = "/dev/ttyUSB0"  # serial port or http://host:port
     baudrate: int = 9600
+    timeout: float = 4.0  # seconds to wait for the board's answer to a command
+    image_timeout: float = 15.0  # for CAPTURE_IMAGE
+    framing: str = "auto"  # serial: "framed" (request ids), "legacy" or "auto" (probe)
+    batch_max: int = 16  # commands per BATCH frame
     extra: dict[str, Any] = Field(default_factory=dict)
 
 
+class HttpConfig(BaseModel):
+    """Connection pooling for the shared HTTP client sessions."""
+
+    limit: int = 30  # total open connections per pool
+    limit_per_host: int = 6
+    dns_cache_ttl: int = 300  # seconds
+    keepalive_timeout: float = 60.0
+    # Per-pool overrides of limit_per_host, e.g. a small board's HTTP server.
+    pool_limit_per_host: dict[str, int] = Field(default_factory=lambda: {"hardware": 2})
+
+
+class IoConfig(BaseModel):
+    """Blocking-I/O thread pool and event-loop lag monitoring."""
+
+    workers: int = 4  # threads for disk access
+    lag_interval: float = 0.5  # seconds between loop lag samples
+    lag_warn_ms: int = 100  # log a warning when the loop stalls longer
+
+
+class MediaConfig(BaseModel):
+    """Inbound attachment handling."""
+
+    enabled: bool = True
+    dir: str = "media"  # relative to the agent workspace
+    max_bytes: int = 20 * 1024 * 1024
+    image_max_side: int = 1568
+    image_quality: int = 85
+    # Images with more pixels than this (after JPEG draft scaling) are
+    # dropped rather than decoded, to bound memory use.
+    image_max_pixels: int = 24_000_000
+    retention_bytes: int = 512 * 1024 * 1024  # oldest files pruned beyond this; 0 = keep all
+    retention_days: int = 30  # files older than this are pruned; 0 = keep
+
+
+class DeliveryConfig(BaseModel):
+    """Outbound delivery retries and dead-letter storage."""
+
+    max_attempts: int = 5
+    backoff_base: float = 1.0  # seconds
+    backoff_max: float = 60.0
+    drain_timeout: float = 10.0  # seconds pending sends get at shutdown before being parked
+    dead_letter_file: str = "~/.huxbot/deadletter.jsonl"
+
+
 class ChannelConfig(BaseModel):
     """Single channel config."""
 
     enabled: bool = False
     token: str = ""
     allow_from: list[str] = Field(default_factory=list)
+    # Group-chat messages that reach the agent: "all", "addressed" (bot
+    # mentioned, replied to or prefixed) or "none" (direct messages only).
+    group_messages: Literal["all", "addressed", "none"] = "all"
+    prefix: str = ""  # e.g. "!hux" – addresses the bot and is stripped
     extra: dict[str, Any] = Field(default_factory=dict)
 
 
@@ -64,6 +157,7 @@ class ChannelsConfig(BaseModel):
     telegram: ChannelConfig = Field(default_factory=ChannelConfig)
     discord: ChannelConfig = Field(default_factory=ChannelConfig)
     whatsapp: ChannelConfig = Field(default_factory=ChannelConfig)
+    loopback: ChannelConfig = Field(default_factory=ChannelConfig)  # load testing
 
 
 class HuxBotConfig(BaseModel):
@@ -74,3 +168,7 @@ class HuxBotConfig(BaseModel):
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
     channels: ChannelsConfig = Field(default_factory=ChannelsConfig)
     hardware: HardwareConfig = Field(default_factory=HardwareConfig)
+    media: MediaConfig = Field(default_factory=MediaConfig)
+    http: HttpConfig = Field(default_factory=HttpConfig)
+    delivery: DeliveryConfig = Field(default_factory=DeliveryConfig)
+    io: IoConfig = Field(default_factory=IoConfig)
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import Any
 
-from huxbot.hardware.board import Board
+from huxbot.hardware.board import BatchResult, Board, BoardError
 from huxbot.hardware.connection import (
     HardwareConnection,
     NetworkConnection,
@@ -12,7 +12,9 @@ from huxbot.hardware.connection import (
 )
 
 __all__ = [
+    "BatchResult",
     "Board",
+    "BoardError",
     "HardwareConnection",
     "NetworkConnection",
     "SerialConnection",
@@ -23,7 +25,14 @@ __all__ = [
 def make_board(config: Any) -> Board:
     """Create a Board from a HardwareConfig instance."""
     if config.transport == "network":
-        connection: HardwareConnection = NetworkConnection(base_url=config.port)
+        connection: HardwareConnection = NetworkConnection(
+            base_url=config.port, timeout=config.timeout
+        )
     else:
-        connection = SerialConnection(port=config.port, baudrate=config.baudrate)
-    return Board(connection)
+        connection = SerialConnection(
+            port=config.port,
+            baudrate=config.baudrate,
+            timeout=config.timeout,
+            framing=config.framing,
+        )
+    return Board(connection, image_timeout=config.image_timeout, batch_max=config.batch_max)
@@ -2,18 +2,63 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from huxbot.hardware.connection import HardwareConnection
 
+logger = logging.getLogger(__name__)
 
-class Board:
-    """High-level interface to an Arduino/ESP32 board."""
 
-    def __init__(self, connection: HardwareConnection) -> None:
+# How firmware without BATCH rejects it, e.g. "ERR:unknown command".
+_UNKNOWN_COMMAND = re.compile(r"unknown|unsupported|not supported", re.IGNORECASE)
+
+
+class BoardError(RuntimeError):
+    """The board answered ``ERR:``; it is reachable, so breakers ignore this."""
+
+    breaker_failure = False
+
+
+@dataclass
+class BatchResult:
+    command: str
+    ok: bool
+    value: str  # the result, or the board's error message
+
+
+def _batch_result(command: str, raw: str) -> BatchResult:
+    if raw.startswith("OK:"):
+        return BatchResult(command, True, raw[3:])
+    if raw.startswith("ERR:"):
+        return BatchResult(command, False, raw[4:])
+    return BatchResult(command, False, f"unexpected board response: {raw}")
+
+
+class Board:
+    """High-level interface to an Arduino/ESP32 board.
+
+    The connection is opened on the first command and reopened after it
+    is lost, so a board plugged in late or reset is picked up again.
+    """
+
+    def __init__(
+        self,
+        connection: HardwareConnection,
+        *,
+        image_timeout: float | None = None,
+        batch_max: int = 16,
+    ) -> None:
         self._conn = connection
         self._connected = False
+        self._connect_lock = asyncio.Lock()
+        self.image_timeout = image_timeout
+        self.batch_max = batch_max
+        self._batching: bool | None = None  # firmware knows BATCH; None until tried
 
     async def connect(self) -> None:
         await self._conn.connect()
@@ -23,23 +68,106 @@ class Board:
         await self._conn.disconnect()
         self._connected = False
 
-    def _ensure_connected(self) -> None:
-        if not self._connected:
-            raise RuntimeError("Board not connected — call connect() first")
-
-    async def _cmd(self, command: str) -> str:
+    async def _ensure_connected(self) -> None:
+        async with self._connect_lock:
+            if not self._connected:
+                await self._conn.disconnect()  # drop what is left of a lost link
+                await self.connect()
+
+    async def _send(self, command: str, timeout: float | None = None) -> str:
+        await self._ensure_connected()
+        try:
+            return await self._conn.send(command, timeout)
+        except ConnectionError:
+            self._connected = False  # reconnect on the next command
+            raise
+
+    async def _cmd(self, command: str, timeout: float | None = None) -> str:
         """Send a command and return the parsed result.
 
         Protocol: ``COMMAND:ARGS`` → ``OK:RESULT`` or ``ERR:MESSAGE``.
         """
-        self._ensure_connected()
-        raw = await self._conn.send(command)
+        raw = await self._send(command, timeout)
         if raw.startswith("OK:"):
             return raw[3:]
         if raw.startswith("ERR:"):
-            raise RuntimeError(f"Board error: {raw[4:]}")
+            raise BoardError(f"Board error: {raw[4:]}")
         raise RuntimeError(f"Unexpected board response: {raw}")
 
+    async def batch(self, commands: list[str]) -> list[BatchResult]:
+        """Run protocol *commands* in order and return a result for each.
+
+        Up to ``batch_max`` commands go to the board as one
+        ``BATCH:CMD1|CMD2|...`` frame, answered ``OK:REPLY1|REPLY2|...``.
+        Firmware that answers ``BATCH`` with an unknown-command error gets
+        the commands pipelined over a framed link and sent one by one
+        otherwise; any other error is raised, since part of the frame may
+        already have run.  A failing command does
+        not stop the ones after it.  The whole call is bounded by one reply
+        deadline per command, plus one for connecting.
+        """
+        commands = [c.strip() for c in commands]
+        for c in commands:
+            if not c or "|" in c or "\n" in c:
+                raise ValueError(f"invalid board command: {c!r}")
+        deadline = self._conn.timeout * (len(commands) + 1)
+        results: list[BatchResult] = []
+        try:
+            async with asyncio.timeout(deadline):
+                for i in range(0, len(commands), self.batch_max):
+                    results += await self._batch(commands[i:i + self.batch_max])
+        except TimeoutError:
+            if not results:
+                raise TimeoutError(
+                    f"board did not finish {len(commands)} commands within {deadline:g}s"
+                ) from None
+            results += [
+                BatchResult(c, False, "no reply: batch deadline passed")
+                for c in commands[len(results):]
+            ]
+        return results
+
+    async def _batch(self, commands: list[str]) -> list[BatchResult]:
+        if self._batching is not False and len(commands) > 1:
+            # The firmware runs them all before answering.
+            raw = await self._send("BATCH:" + "|".join(commands), self._conn.timeout * len(commands))
+            if raw.startswith("OK:"):
+                replies = raw[3:].split("|")
+                self._batching = True
+                if len(replies) != len(commands):
+                    # Which commands ran is unknown; running them again
+                    # could actuate a pin twice.
+                    outcome = f"unknown outcome: board answered {len(replies)} of {len(commands)}"
+                    return [BatchResult(c, False, outcome) for c in commands]
+                return [_batch_result(c, r) for c, r in zip(commands, replies)]
+            error = raw[4:] if raw.startswith("ERR:") else raw
+            if self._batching or not raw.startswith("ERR:") or not _UNKNOWN_COMMAND.search(error):
+                # Part of the frame may have run; don't send it again.
+                raise BoardError(f"Board error: {error}")
+            logger.info("Board firmware does not support BATCH (%s); sending commands singly", raw)
+            self._batching = False
+
+        if getattr(self._conn, "ordered", False):
+            # Sent back to back without waiting for each reply; the
+            # connection keeps them in order.
+            replies = await asyncio.gather(
+                *(self._send(c) for c in commands), return_exceptions=True
+            )
+        else:
+            replies = []
+            for c in commands:
+                try:
+                    replies.append(await self._send(c))
+                except Exception as exc:
+                    replies.append(exc)
+        if all(isinstance(r, BaseException) for r in replies):
+            raise replies[0]  # nothing got through: the board or link is down
+        return [
+            BatchResult(c, False, str(r) or type(r).__name__) if isinstance(r, BaseException)
+            else _batch_result(c, r)
+            for c, r in zip(commands, replies)
+        ]
+
     async def pin_mode(self, pin: int, mode: str) -> str:
         return await self._cmd(f"PIN_MODE:{pin}:{mode.upper()}")
 
@@ -62,7 +190,7 @@ class Board:
 
     async def capture_image(self) -> str:
         """Request a camera frame; returns base64-encoded image data."""
-        return await self._cmd("CAPTURE_IMAGE")
+        return await self._cmd("CAPTURE_IMAGE", self.image_timeout)
 
     async def list_devices(self) -> str:
         return await self._cmd("LIST_DEVICES")
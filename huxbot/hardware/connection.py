@@ -3,28 +3,79 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
+import logging
 from typing import Protocol, runtime_checkable
 
 import aiohttp
 
+from huxbot.utils.http import get_session
+
+logger = logging.getLogger(__name__)
+
 
 @runtime_checkable
 class HardwareConnection(Protocol):
     """Protocol for hardware transport layers."""
 
+    timeout: float  # default per-command reply deadline, seconds
+
     async def connect(self) -> None: ...
     async def disconnect(self) -> None: ...
-    async def send(self, command: str) -> str: ...
+    async def send(self, command: str, timeout: float | None = None) -> str: ...
 
 
-class SerialConnection:
-    """USB serial connection using pyserial-asyncio."""
+_UNFRAMED = -1  # pending key for a reply without a request id
+# Boards that reset when the port opens miss pings sent during boot.
+_PROBE_ATTEMPTS = 3
 
-    def __init__(self, port: str = "/dev/ttyUSB0", baudrate: int = 9600) -> None:
+
+class SerialConnection:
+    """USB serial connection using pyserial-asyncio.
+
+    With framing, each command goes out as ``@<id>:COMMAND`` and the
+    firmware answers ``@<id>:OK:...``; one reader task hands every reply to
+    the caller waiting for that id.  Several commands can then be in
+    flight, and a late reply never reaches the wrong caller.  Plain
+    firmware (bare ``OK:``/``ERR:``) gets one command at a time; after a
+    timeout, the late reply is discarded before the next command is sent.
+
+    *framing* is ``"framed"``, ``"legacy"`` or ``"auto"``: probe with
+    ``@0:PING`` on connect (retrying while the board boots) and use
+    framing if the answer carries the id.
+    """
+
+    def __init__(
+        self,
+        port: str = "/dev/ttyUSB0",
+        baudrate: int = 9600,
+        *,
+        timeout: float = 4.0,
+        framing: str = "auto",
+    ) -> None:
         self.port = port
         self.baudrate = baudrate
+        self.timeout = timeout
+        self.framing = framing
+        self.framed = framing == "framed"
         self._reader: asyncio.StreamReader | None = None
         self._writer: asyncio.StreamWriter | None = None
+        self._read_task: asyncio.Task[None] | None = None
+        self._pending: dict[int, asyncio.Future[str]] = {}
+        self._ids = itertools.count()
+        self._lock = asyncio.Lock()  # unframed: one command at a time
+        # Unframed: replies still owed to timed-out commands, and set when none are.
+        self._owed = 0
+        self._synced = asyncio.Event()
+        self._synced.set()
+
+    @property
+    def ordered(self) -> bool:
+        """Whether concurrent commands are pipelined, reaching the board in order.
+
+        Only framed links pipeline; plain firmware gets one command at a time.
+        """
+        return self.framed
 
     async def connect(self) -> None:
         import serial_asyncio  # type: ignore[import-untyped]
@@ -32,43 +83,166 @@ class SerialConnection:
         self._reader, self._writer = await serial_asyncio.open_serial_connection(
             url=self.port, baudrate=self.baudrate
         )
+        self._read_task = asyncio.create_task(self._read_loop())
+        self._set_owed(0)
+        if self.framing == "auto":
+            self.framed = await self._probe()
+            logger.info(
+                "Board on %s speaks the %s protocol", self.port, "framed" if self.framed else "plain"
+            )
 
     async def disconnect(self) -> None:
+        if self._read_task:
+            self._read_task.cancel()
+            self._read_task = None
         if self._writer:
             self._writer.close()
             self._reader = None
             self._writer = None
-
-    async def send(self, command: str) -> str:
+        self._fail_pending(ConnectionError("serial connection closed"))
+
+    async def _probe(self) -> bool:
+        for attempt in range(_PROBE_ATTEMPTS):
+            framed = self._expect(0)
+            plain = self._expect(_UNFRAMED)
+            try:
+                self._write("@0:PING")
+                done, _ = await asyncio.wait(
+                    {framed, plain}, timeout=self.timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                self._pending.pop(0, None)
+                self._pending.pop(_UNFRAMED, None)
+            if framed in done:
+                return True
+            if plain in done:
+                # That was the answer to the first ping; the others may follow.
+                self._set_owed(attempt)
+                return False
+        logger.warning(
+            "Board on %s did not answer %d pings; assuming the plain protocol",
+            self.port, _PROBE_ATTEMPTS,
+        )
+        self._set_owed(_PROBE_ATTEMPTS)
+        return False
+
+    def _set_owed(self, count: int) -> None:
+        self._owed = count
+        if count:
+            self._synced.clear()
+        else:
+            self._synced.set()
+
+    async def _resync(self) -> None:
+        """Wait for the late replies to timed-out plain commands, then drop them."""
+        try:
+            await asyncio.wait_for(self._synced.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Board never answered %d timed-out command(s)", self._owed)
+            self._set_owed(0)
+
+    def _expect(self, key: int) -> asyncio.Future[str]:
+        fut: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._pending[key] = fut
+        return fut
+
+    def _write(self, line: str) -> None:
+        # One write per line, so concurrent commands never interleave.
+        assert self._writer is not None
+        self._writer.write(f"{line}\n".encode())
+
+    def _dispatch(self, line: str) -> None:
+        key = _UNFRAMED
+        if line.startswith("@"):
+            rid, _, line = line[1:].partition(":")
+            if not rid.isdigit():
+                return
+            key = int(rid)
+        elif not line.startswith(("OK:", "ERR:")):
+            logger.debug("Board says: %s", line)  # boot banner, debug prints
+            return
+        elif self._owed:
+            self._set_owed(self._owed - 1)
+            logger.debug("Dropping late reply to a timed-out command: %s", line)
+            return
+        fut = self._pending.pop(key, None)
+        if fut is None or fut.done():
+            logger.debug("Dropping unmatched board reply: %s", line)
+            return
+        fut.set_result(line)
+
+    async def _read_loop(self) -> None:
+        reader, writer = self._reader, self._writer
+        assert reader is not None and writer is not None
+        error: Exception = ConnectionError("serial connection closed by the board")
+        try:
+            while raw := await reader.readline():
+                self._dispatch(raw.decode(errors="replace").strip())
+        except OSError as exc:
+            error = ConnectionError(f"serial connection lost: {exc}")
+        finally:
+            if self._writer is writer:  # not already replaced by a reconnect
+                writer.close()
+                self._reader = self._writer = None
+                self._fail_pending(error)
+
+    def _fail_pending(self, error: Exception) -> None:
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(error)
+        self._pending.clear()
+
+    async def send(self, command: str, timeout: float | None = None) -> str:
         if not self._writer or not self._reader:
-            raise RuntimeError("Serial connection not open — call connect() first")
-        self._writer.write(f"{command}\n".encode())
-        await self._writer.drain()
-        raw = await self._reader.readline()
-        return raw.decode().strip()
+            raise ConnectionError("Serial connection not open — call connect() first")
+        if self.framed:
+            rid = next(self._ids) % 65535 + 1
+            return await self._request(rid, f"@{rid}:{command}", timeout or self.timeout)
+        async with self._lock:
+            if self._owed:
+                await self._resync()
+            return await self._request(_UNFRAMED, command, timeout or self.timeout)
+
+    async def _request(self, key: int, line: str, timeout: float) -> str:
+        fut = self._expect(key)
+        try:
+            self._write(line)
+            await self._writer.drain()  # type: ignore[union-attr]
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            if key == _UNFRAMED and self._pending.get(key) is fut:
+                self._set_owed(self._owed + 1)  # its reply may still come
+            raise TimeoutError(f"board did not answer {line!r} within {timeout:g}s") from None
+        finally:
+            if self._pending.get(key) is fut:
+                del self._pending[key]
 
 
 class NetworkConnection:
     """HTTP connection for WiFi-enabled boards (ESP32 etc.)."""
 
-    def __init__(self, base_url: str = "http://192.168.1.100") -> None:
+    def __init__(self, base_url: str = "http://192.168.1.100", *, timeout: float = 4.0) -> None:
         self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
         self._session: aiohttp.ClientSession | None = None
 
     async def connect(self) -> None:
-        self._session = aiohttp.ClientSession()
+        # Shared "hardware" pool: keep-alive to the board, few connections.
+        self._session = get_session("hardware")
 
     async def disconnect(self) -> None:
-        if self._session:
-            await self._session.close()
-            self._session = None
+        self._session = None
 
-    async def send(self, command: str) -> str:
+    async def send(self, command: str, timeout: float | None = None) -> str:
         if not self._session:
-            raise RuntimeError("Network connection not open — call connect() first")
-        async with self._session.post(
-            f"{self.base_url}/cmd",
-            data=command,
-            timeout=aiohttp.ClientTimeout(total=10),
-        ) as resp:
-            return (await resp.text()).strip()
+            raise ConnectionError("Network connection not open — call connect() first")
+        timeout = timeout or self.timeout
+        try:
+            async with self._session.post(
+                f"{self.base_url}/cmd",
+                data=command,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as resp:
+                return (await resp.text()).strip()
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"board did not answer {command!r} within {timeout:g}s") from None
@@ -1,8 +1,16 @@
 """HuxBot tools – plain async functions that ADK auto-wraps as FunctionTool."""
 
-from huxbot.tools.filesystem import read_file, write_file, edit_file, list_dir
-from huxbot.tools.shell import exec_command
-from huxbot.tools.web import web_search, web_fetch
+from huxbot.tools.codesearch import make_search_workspace
+from huxbot.tools.filesystem import (
+    read_file,
+    write_file,
+    edit_file,
+    multi_edit,
+    apply_patch,
+    list_dir,
+)
+from huxbot.tools.shell import make_shell_tools
+from huxbot.tools.web import make_web_search, make_web_fetch
 from huxbot.tools.message import make_send_message
 from huxbot.tools.hardware import make_hardware_tools
 
@@ -10,10 +18,13 @@ __all__ = [
     "read_file",
     "write_file",
     "edit_file",
+    "multi_edit",
+    "apply_patch",
     "list_dir",
-    "exec_command",
-    "web_search",
-    "web_fetch",
+    "make_search_workspace",
+    "make_shell_tools",
+    "make_web_search",
+    "make_web_fetch",
     "make_send_message",
     "make_hardware_tools",
 ]
@@ -0,0 +1,205 @@
+"""Spill oversized tool outputs to artifact files.
+
+A tool result longer than the spill threshold is not put into the
+conversation.  Instead it is saved once under ``<workspace>/artifacts``,
+named by its SHA-256 (so the same output is stored once however often
+it is produced).  The model gets the start and end of the output and the
+artifact id, and can page or grep the rest with ``read_artifact``.  This
+keeps both the prompt and the stored session history small.  The
+directory is pruned oldest-first beyond ``artifacts_max_bytes``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from huxbot.config.schema import ToolsConfig
+from huxbot.tools.middleware import CONTEXT_PARAM, takes_context, wraps_tool
+from huxbot.utils.aio import run_io
+from huxbot.utils.helpers import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token, for turning token budgets into characters.
+CHARS_PER_TOKEN = 4
+_ID = re.compile(r"^[0-9a-f]{16}$")
+
+
+def _cut(text: str, limit: int, *, from_end: bool = False) -> str:
+    """At most *limit* characters from the start (or end) of *text*, on a line boundary."""
+    if len(text) <= limit:
+        return text
+    if from_end:
+        part = text[-limit:]
+        nl = part.find("\n")
+        return part[nl + 1:] if 0 <= nl < len(part) - 1 else part
+    part = text[:limit]
+    nl = part.rfind("\n")
+    return part[:nl + 1] if nl > 0 else part
+
+
+class ArtifactStore:
+    """Content-addressed store of full tool outputs."""
+
+    def __init__(self, root: Path, *, threshold: int, preview: int, max_bytes: int) -> None:
+        self.root = root
+        self.threshold = threshold  # characters
+        self.preview = preview  # characters
+        self.max_bytes = max_bytes
+
+    def path(self, artifact_id: str) -> Path | None:
+        if not _ID.match(artifact_id):
+            return None
+        return self.root / f"{artifact_id}.txt"
+
+    def save(self, text: str) -> str:
+        data = text.encode()
+        artifact_id = hashlib.sha256(data).hexdigest()[:16]
+        path = self.root / f"{artifact_id}.txt"
+        if path.exists():
+            path.touch()  # keep it from being pruned first
+        else:
+            atomic_write(path, data)
+            self._prune()
+        return artifact_id
+
+    def load(self, artifact_id: str) -> str | None:
+        path = self.path(artifact_id)
+        if path is None or not path.is_file():
+            return None
+        return path.read_text(errors="replace")
+
+    def _prune(self) -> None:
+        if self.max_bytes <= 0:
+            return
+        files = []
+        total = 0
+        for p in self.root.glob("*.txt"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        files.sort()
+        for _, size, p in files:
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+    def preview_of(self, tool: str, text: str, artifact_id: str) -> str:
+        head = _cut(text, self.preview * 2 // 3)
+        tail = _cut(text[len(head):], self.preview // 3, from_end=True)
+        lines = text.count("\n") + 1
+        return (
+            f"{head}\n[... {len(text) - len(head) - len(tail)} characters not shown ...]\n{tail}\n"
+            f"[{tool} output was {len(text)} characters ({lines} lines), saved as artifact "
+            f'{artifact_id}. Page through it with read_artifact("{artifact_id}", start_line=...) '
+            "or search it with pattern=...]"
+        )
+
+    async def spill(self, tool: str, text: str) -> str:
+        """*text* itself if short enough, else a preview pointing at its artifact."""
+        if len(text) <= self.threshold:
+            return text
+        try:
+            artifact_id = await run_io(self.save, text)
+        except OSError as exc:
+            logger.warning("Could not save %s output as an artifact: %s", tool, exc)
+            return _cut(text, self.threshold) + f"\n[Output truncated from {len(text)} characters.]"
+        return self.preview_of(tool, text, artifact_id)
+
+    def spilling(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap tool *func* so that oversized string results are spilled."""
+        if self.threshold <= 0:
+            return func
+        name = func.__name__
+        passes_context = takes_context(func)
+
+        @wraps_tool(func)
+        async def wrapper(*args: Any, tool_context: Any = None, **kwargs: Any) -> Any:
+            if passes_context:
+                kwargs[CONTEXT_PARAM] = tool_context
+            result = await func(*args, **kwargs)
+            return await self.spill(name, result) if isinstance(result, str) else result
+
+        return wrapper
+
+
+def make_read_artifact(store: ArtifactStore):
+    """Create the ``read_artifact`` tool for *store*."""
+
+    def _read(artifact_id: str, start_line: int, max_lines: int, pattern: str) -> str:
+        text = store.load(artifact_id.strip())
+        if text is None:
+            return f"Error: no artifact {artifact_id!r} (it may have been pruned)."
+        lines = text.splitlines()
+        budget = store.threshold or len(text)
+        out: list[str] = []
+        used = 0
+
+        if pattern:
+            try:
+                regex = re.compile(pattern, re.IGNORECASE)
+            except re.error as exc:
+                return f"Error: invalid pattern {pattern!r}: {exc}"
+            matches = 0
+            for n, line in enumerate(lines, 1):
+                if n < start_line or not regex.search(line):
+                    continue
+                matches += 1
+                entry = f"{n}: {line}"
+                if used + len(entry) > budget or (max_lines and len(out) >= max_lines):
+                    out.append(f"[More matches after line {n}; continue with start_line={n}]")
+                    break
+                out.append(entry)
+                used += len(entry) + 1
+            return "\n".join(out) if matches else f"No lines match {pattern!r}."
+
+        first = max(start_line, 1)
+        if first > len(lines):
+            return f"Error: artifact {artifact_id} has only {len(lines)} lines."
+        n = first
+        for n in range(first, len(lines) + 1):
+            line = lines[n - 1]
+            if len(line) > budget:
+                line = line[:budget] + f"[... line cut at {budget} characters]"
+            if out and (used + len(line) > budget or (max_lines and len(out) >= max_lines)):
+                n -= 1
+                break
+            out.append(line)
+            used += len(line) + 1
+        footer = f"[Lines {first}-{n} of {len(lines)}"
+        footer += f"; continue with start_line={n + 1}]" if n < len(lines) else "]"
+        return "\n".join(out) + "\n" + footer
+
+    async def read_artifact(
+        artifact_id: str, start_line: int = 1, max_lines: int = 0, pattern: str = ""
+    ) -> str:
+        """Read a saved tool output by its artifact id.
+
+        Returns lines from *start_line* (1-based) on, as many as fit (or
+        *max_lines*).  With *pattern*, returns only the lines matching that
+        regular expression (case-insensitive), with their line numbers.
+        """
+        try:
+            return await run_io(_read, artifact_id, start_line, max_lines, pattern)
+        except Exception as exc:
+            return f"Error reading artifact {artifact_id}: {exc}"
+
+    return read_artifact
+
+
+def make_artifact_store(workspace: Path, config: ToolsConfig) -> ArtifactStore:
+    return ArtifactStore(
+        workspace / config.artifacts_dir,
+        threshold=config.spill_threshold_tokens * CHARS_PER_TOKEN,
+        preview=config.spill_preview_tokens * CHARS_PER_TOKEN,
+        max_bytes=config.artifacts_max_bytes,
+    )
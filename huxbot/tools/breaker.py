@@ -0,0 +1,220 @@
+"""Per-tool deadlines, circuit breakers and call statistics.
+
+Every tool registered by the agent factory runs through
+:class:`ToolExecutor`, which
+
+* enforces the deadline configured for the tool (``tools.tool_timeouts``);
+* turns an exception or an expired deadline into an ``Error: ...`` result
+  instead of failing the whole agent turn;
+* keeps per-tool call counts, errors and latency percentiles; and
+* for tools behind an unreliable dependency (``tools.breakers``: the
+  board, websites) opens a :class:`CircuitBreaker` after repeated
+  failures.  While it is open, calls fail at once.  After
+  ``breaker_reset`` seconds a single trial call is let through
+  (half-open), and its outcome closes or re-opens the breaker.
+
+Tools taking a ``url`` get one breaker per host, so one dead site does not
+block the others.  An exception with ``breaker_failure = False`` (e.g. the
+board refusing a command: it answered, so it is up) is reported without
+counting against the breaker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import inspect
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
+
+from huxbot.config.schema import ToolsConfig
+from huxbot.tools.middleware import CONTEXT_PARAM, takes_context, wraps_tool
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker."""
+
+    def __init__(self, name: str, threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error = ""
+        self._trial = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (claims the half-open trial)."""
+        if self.state == OPEN and self.retry_after() == 0:
+            self.state = HALF_OPEN
+            self._trial = False
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """Give back a half-open trial whose call ended without an outcome."""
+        self._trial = False
+
+    def record(self, ok: bool, error: str = "") -> None:
+        if ok:
+            if self.state != CLOSED:
+                logger.info("Circuit %s closed again", self.name)
+            self.state, self.failures, self._trial = CLOSED, 0, False
+            return
+        self.failures += 1
+        self.last_error = error
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            if self.state != OPEN:
+                logger.warning(
+                    "Circuit %s opened after %d failure(s): %s", self.name, self.failures, error
+                )
+            self.state, self.opened_at, self._trial = OPEN, time.monotonic(), False
+
+
+@dataclass
+class ToolStats:
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    rejected: int = 0  # refused by an open breaker
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def _match(name: str, patterns: dict[str, Any]) -> Any:
+    """Value for *name*: an exact key, else the longest matching glob key."""
+    if name in patterns:
+        return patterns[name]
+    hits = [k for k in patterns if fnmatch.fnmatchcase(name, k)]
+    return patterns[max(hits, key=len)] if hits else None
+
+
+class ToolExecutor:
+    """Runs tools with deadlines and breakers, and collects their stats."""
+
+    def __init__(self, config: ToolsConfig) -> None:
+        self.config = config
+        self.stats: dict[str, ToolStats] = {}
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    def _breaker(self, group: str, arguments: dict[str, Any]) -> CircuitBreaker:
+        key = group
+        url = arguments.get("url")
+        if isinstance(url, str) and urlsplit(url).hostname:
+            key = f"{group}:{urlsplit(url).hostname}"
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = self.breakers[key] = CircuitBreaker(
+                key, self.config.breaker_failures, self.config.breaker_reset
+            )
+        return breaker
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap tool *func*; returns it with the same name, docs and signature."""
+        name = func.__name__
+        timeout = _match(name, self.config.tool_timeouts) or None
+        group = _match(name, self.config.breakers)
+        stats = self.stats.setdefault(name, ToolStats())
+        sig = inspect.signature(func)
+        passes_context = takes_context(func)
+
+        @wraps_tool(func)
+        async def wrapper(*args: Any, tool_context: Any = None, **kwargs: Any) -> Any:
+            breaker = None
+            if group:
+                breaker = self._breaker(group, sig.bind_partial(*args, **kwargs).arguments)
+                if not breaker.allow():
+                    stats.rejected += 1
+                    return (
+                        f"Error: {breaker.name} is failing ({breaker.failures} errors in a row, "
+                        f"last: {breaker.last_error}); not retrying for another "
+                        f"{breaker.retry_after():.1f}s."
+                    )
+            if passes_context:
+                kwargs[CONTEXT_PARAM] = tool_context
+            stats.calls += 1
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(func(*args, **kwargs), timeout)
+            except asyncio.TimeoutError as exc:
+                # Ours has no message; a tool's own timeout explains itself.
+                stats.errors += 1
+                stats.timeouts += 1
+                error = str(exc) or f"timed out after {timeout:g}s"
+                if breaker:
+                    breaker.record(False, error)
+                return f"Error: {name} failed: {error}" if str(exc) else f"Error: {name} {error}."
+            except Exception as exc:
+                stats.errors += 1
+                error = str(exc) or type(exc).__name__
+                logger.warning("Tool %s failed: %s", name, error)
+                if breaker:
+                    breaker.record(not getattr(exc, "breaker_failure", True), error)
+                return f"Error: {name} failed: {error}"
+            except BaseException:
+                if breaker:
+                    breaker.release()  # cancelled: neither outcome
+                raise
+            finally:
+                stats.latencies.append(time.monotonic() - started)
+            if breaker:
+                breaker.record(True)
+            return result
+
+        return wrapper
+
+    def report(self) -> str:
+        lines = ["tool  calls  errors  timeouts  rejected  p50  p95"]
+        for name, s in sorted(self.stats.items()):
+            if not s.calls and not s.rejected:
+                continue
+            lines.append(
+                f"{name}  {s.calls}  {s.errors}  {s.timeouts}  {s.rejected}  "
+                f"{s.percentile(50) * 1000:.0f}ms  {s.percentile(95) * 1000:.0f}ms"
+            )
+        if len(lines) == 1:
+            lines = ["No tool calls yet."]
+        open_ = [b for b in self.breakers.values() if b.state != CLOSED or b.failures]
+        if open_:
+            lines.append("")
+            lines.append("breakers:")
+            for b in sorted(open_, key=lambda b: b.name):
+                extra = f", retry in {b.retry_after():.0f}s" if b.state == OPEN else ""
+                lines.append(f"{b.name}: {b.state}, {b.failures} failure(s){extra}, last: {b.last_error}")
+        return "\n".join(lines)
+
+
+def make_tool_status(executor: ToolExecutor):
+    """Create the ``tool_status`` tool reporting *executor*'s stats."""
+
+    async def tool_status() -> str:
+        """Show per-tool call counts, errors, latency and circuit-breaker state.
+
+        Use it to check whether a failing tool (e.g. the hardware board or a
+        website) is currently being short-circuited.
+        """
+        return executor.report()
+
+    return tool_status
@@ -0,0 +1,543 @@
+"""Indexed search over the agent workspace.
+
+:class:`WorkspaceIndex` keeps a trigram index of the workspace's text
+files: for every three-byte sequence (lower-cased), the ids of the files
+that contain it.  A query is narrowed to the files containing all trigrams
+of its literal parts, and only those are read and matched.  Before each
+search the tree is re-walked with ``os.scandir`` and only files whose size
+or mtime changed are re-indexed, so the index stays current without a
+file watcher.  Ignore files (``.gitignore``, ``.ignore``,
+``.huxbotignore``) are honoured.
+
+Posting lists are append-only arrays of ids.  A re-indexed file gets a new
+id and its old one is simply skipped; once stale ids outnumber live files
+the postings are rebuilt.
+
+Files too large to index are candidates for every query.  They are matched
+in blocks of whole lines, and context is rendered by streaming to the hit
+lines, so a huge log never has to fit in memory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import threading
+import time
+from array import array
+from collections.abc import Collection, Iterable, Iterator
+from typing import BinaryIO
+from dataclasses import dataclass
+from pathlib import Path
+
+from huxbot.config.schema import ToolsConfig
+from huxbot.utils.aio import run_io
+from huxbot.utils.ignore import DEFAULT_IGNORES, IgnoreRules, compile_glob
+
+_SNIFF_BYTES = 8192
+# Matching lines shown per file, and the width a long line is cut to.
+_HITS_PER_FILE = 5
+_LINE_WIDTH = 200
+_MAX_HITS = 200
+# Files are matched this many bytes (rounded to whole lines) at a time.
+_SCAN_BLOCK = 1024 * 1024
+
+
+@dataclass
+class _File:
+    id: int
+    rel: str
+    mtime_ns: int
+    size: int
+    indexed: bool  # False: too large or not reached yet, so always a candidate
+    text: bool = True
+
+
+def _trigrams(data: bytes) -> set[bytes]:
+    data = data.lower()
+    return {data[i:i + 3] for i in range(len(data) - 2)}
+
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]+")
+_META = set(".^$*+?{}[]()|\\")
+_CLASS_ESCAPES = set("dDwWsSbBAZ")
+
+
+def _class_end(pattern: str, start: int) -> int:
+    """Index of the ``]`` closing the character class opened at *start*, or -1.
+
+    A ``]`` straight after ``[`` or ``[^`` is a literal member, as is ``\\]``.
+    """
+    i = start + 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            i += 2
+            continue
+        if pattern[i] == "]":
+            return i
+        i += 1
+    return -1
+
+
+def required_literals(pattern: str) -> list[str] | None:
+    """Literal strings every match of regex *pattern* must contain.
+
+    Conservative: returns ``None`` when the pattern has alternation or is
+    otherwise too hard to analyse, meaning "no filtering possible".
+    """
+    runs: list[str] = []
+    cur: list[str] = []
+    depth = 0
+    i, n = 0, len(pattern)
+
+    def flush() -> None:
+        if depth == 0 and len(cur) >= 3:
+            runs.append("".join(cur))
+        cur.clear()
+
+    while i < n:
+        c = pattern[i]
+        if c == "|":
+            return None
+        if c == "\\" and i + 1 < n:
+            nxt = pattern[i + 1]
+            if nxt in _CLASS_ESCAPES or nxt.isdigit() or nxt.isalpha():
+                flush()
+            else:
+                cur.append(nxt)
+            i += 2
+            continue
+        if c in "*?{":
+            # The previous atom is optional: drop it from the run.
+            if cur:
+                cur.pop()
+            flush()
+            if c == "{":
+                end = pattern.find("}", i)
+                i = end if end > 0 else i
+        elif c == "+":
+            flush()
+        elif c == "[":
+            flush()
+            end = _class_end(pattern, i)
+            if end < 0:
+                return None
+            i = end
+        elif c == "(":
+            flush()
+            depth += 1
+        elif c == ")":
+            flush()
+            depth = max(0, depth - 1)
+        elif c in _META:
+            flush()
+        else:
+            cur.append(c)
+        i += 1
+    flush()
+    return runs
+
+
+class WorkspaceIndex:
+    """Trigram index of the text files under *root*."""
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        max_files: int,
+        max_file_bytes: int,
+        refresh_budget: float = 0.5,
+        ignores: tuple[str, ...] = DEFAULT_IGNORES,
+    ) -> None:
+        self.root = root
+        self.ignores = ignores
+        self.max_files = max_files
+        self.max_file_bytes = max_file_bytes
+        self.refresh_budget = refresh_budget
+        self._files: dict[str, _File] = {}
+        self._by_id: dict[int, _File] = {}
+        self._postings: dict[bytes, array] = {}
+        self._next_id = 0
+        self._stale = 0
+        self.pending: set[str] = set()
+        self.truncated = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    # -- maintenance ------------------------------------------------------
+
+    def refresh(self, budget: float | None = None) -> int:
+        """Bring the index up to date; returns the number of files re-indexed.
+
+        With a *budget* (seconds), indexing stops once it is spent; files
+        not reached yet stay :attr:`pending` and are scanned directly by
+        searches until a later refresh (or :meth:`warm`) indexes them.
+        """
+        deadline = None if budget is None else time.perf_counter() + budget
+        seen: set[str] = set()
+        changed = 0
+        self.truncated = False
+        stack: list[tuple[str, str, IgnoreRules]] = [(str(self.root), "", IgnoreRules.defaults(self.ignores))]
+        while stack:
+            path, rel_dir, rules = stack.pop()
+            try:
+                entries = list(os.scandir(path))
+            except OSError:
+                continue
+            rules = rules.child(path, rel_dir, {e.name for e in entries})
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_dir and not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if rules.ignored(rel, is_dir):
+                    continue
+                if is_dir:
+                    stack.append((entry.path, rel, rules))
+                    continue
+                if len(seen) >= self.max_files:
+                    self.truncated = True
+                    continue
+                seen.add(rel)
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                old = self._files.get(rel)
+                unchanged = old is not None and old.mtime_ns == st.st_mtime_ns and old.size == st.st_size
+                if unchanged and rel not in self.pending:
+                    continue
+                if deadline is not None and time.perf_counter() > deadline:
+                    if not unchanged:
+                        self._add(rel, st.st_mtime_ns, st.st_size, None)
+                        self.pending.add(rel)
+                    continue
+                self._index(rel, entry.path, st.st_mtime_ns, st.st_size)
+                changed += 1
+        for rel in [r for r in self._files if r not in seen]:
+            self._drop(rel)
+            changed += 1
+        if self._stale > max(len(self._files), 1000) and not self.pending:
+            self._compact()
+        return changed
+
+    def warm(self, chunk: float = 0.2) -> None:
+        """Index everything still pending, releasing the lock every *chunk* seconds."""
+        while True:
+            with self._lock:
+                deadline = time.perf_counter() + chunk
+                for rel in list(self.pending):
+                    entry = self._files[rel]
+                    self._index(rel, os.path.join(self.root, rel), entry.mtime_ns, entry.size)
+                    if time.perf_counter() > deadline:
+                        break
+                if not self.pending:
+                    return
+
+    def _compact(self) -> None:
+        """Drop stale ids by re-indexing every file (searches scan them meanwhile)."""
+        self._postings.clear()
+        self._stale = 0
+        for rel, entry in self._files.items():
+            if entry.indexed:
+                entry.indexed = False
+                self.pending.add(rel)
+
+    def _index(self, rel: str, path: str, mtime_ns: int, size: int) -> None:
+        try:
+            with open(path, "rb") as f:
+                data = f.read(self.max_file_bytes + 1 if size <= self.max_file_bytes else _SNIFF_BYTES)
+        except OSError:
+            self._drop(rel)
+            return
+        if b"\0" in data[:_SNIFF_BYTES]:
+            self._add(rel, mtime_ns, size, (), text=False)  # binary: only its path is searchable
+        elif size <= self.max_file_bytes:
+            self._add(rel, mtime_ns, size, _trigrams(data))
+        else:
+            self._add(rel, mtime_ns, size, None)
+
+    def _add(
+        self, rel: str, mtime_ns: int, size: int, trigrams: Iterable[bytes] | None, text: bool = True
+    ) -> None:
+        self._drop(rel)
+        entry = _File(self._next_id, rel, mtime_ns, size, trigrams is not None, text)
+        self._next_id += 1
+        self._files[rel] = entry
+        self._by_id[entry.id] = entry
+        postings = self._postings
+        for t in trigrams or ():
+            ids = postings.get(t)
+            if ids is None:
+                ids = postings[t] = array("I")
+            ids.append(entry.id)
+
+    def _drop(self, rel: str) -> None:
+        self.pending.discard(rel)
+        entry = self._files.pop(rel, None)
+        if entry is not None:
+            del self._by_id[entry.id]
+            self._stale += entry.indexed
+
+    def _candidates(self, needles: list[bytes]) -> list[_File]:
+        unindexed = [f for f in self._files.values() if not f.indexed]
+        grams = {n.lower()[i:i + 3] for n in needles for i in range(len(n) - 2)}
+        if not grams:
+            return list(self._files.values())
+        ids: set[int] = set()
+        for n, g in enumerate(sorted(grams, key=lambda g: len(self._postings.get(g, ())))):
+            posting = self._postings.get(g)
+            if not posting:
+                ids = set()
+                break
+            if n == 0:
+                ids = set(posting)
+            else:
+                ids.intersection_update(posting)
+            if not ids:
+                break
+        by_id = self._by_id
+        return [by_id[i] for i in ids if i in by_id] + unindexed
+
+    # -- search -----------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        *,
+        regex: bool = False,
+        glob: str = "",
+        case_sensitive: bool = False,
+        context: int = 2,
+        max_results: int = 10,
+    ) -> str:
+        started = time.perf_counter()
+        flags = 0 if case_sensitive else re.IGNORECASE
+        pattern = re.compile(query if regex else re.escape(query), flags) if query else None
+        literals = (required_literals(query) if regex else [query]) if query else []
+        if case_sensitive:
+            needles = [lit.encode() for lit in literals or ()]
+        else:
+            # Only ASCII folds the same way for bytes.lower() and the regex,
+            # so case-insensitive needles are the ASCII runs of each literal.
+            needles = [
+                run.encode().lower()
+                for lit in literals or ()
+                for run in _NON_ASCII.split(lit)
+                if len(run) >= 3
+            ]
+        path_filter = compile_glob(glob) if glob else None
+        # Whole-word hits of a plain-text query rank above partial ones.
+        word = re.compile(rf"\b{re.escape(query)}\b", flags) if query and not regex else None
+
+        with self._lock:
+            self.refresh(self.refresh_budget)
+            candidates = self._candidates(needles)
+            total = len(self._files)
+            pending = len(self.pending)
+            truncated = self.truncated
+
+        results: list[tuple[float, str, list[tuple[int, str]]]] = []
+        for entry in candidates:
+            if path_filter and not path_filter.fullmatch(entry.rel):
+                continue
+            if pattern is None:
+                results.append((0.0, entry.rel, []))
+                continue
+            hits = self._match_file(entry.rel, pattern, needles, case_sensitive) if entry.text else []
+            in_path = bool(pattern.search(entry.rel))
+            if not hits and not in_path:
+                continue
+            score = min(len(hits), 20) + (15 if in_path else 0) - entry.rel.count("/") * 0.1
+            if word:
+                score += 0.5 * sum(1 for _, line in hits if word.search(line))
+            results.append((score, entry.rel, hits))
+
+        results.sort(key=lambda r: (-r[0], r[1]))
+        elapsed = (time.perf_counter() - started) * 1000
+        note = f"{total} files{' (limit reached)' if truncated else ''}"
+        if pending:
+            note += f", {pending} still being indexed"
+        note += f", {elapsed:.0f} ms"
+        if not results:
+            return f"No matches for {query or glob!r}. ({note})"
+
+        shown = results[:max_results]
+        header = f"{len(results)} file(s) matched; showing {len(shown)}. ({note})"
+        blocks = [header]
+        for _, rel, hits in shown:
+            if not hits:
+                blocks.append(rel)
+                continue
+            blocks.append(f"{rel} ({len(hits)} match{'es' if len(hits) != 1 else ''})")
+            blocks.append(self._render(rel, [n for n, _ in hits[:_HITS_PER_FILE]], context))
+        return "\n".join(blocks)
+
+    def _match_file(
+        self, rel: str, pattern: re.Pattern[str], needles: list[bytes], case_sensitive: bool
+    ) -> list[tuple[int, str]]:
+        hits: list[tuple[int, str]] = []
+        line_no = 1
+        try:
+            with open(os.path.join(self.root, rel), "rb") as f:
+                for i, block in enumerate(_blocks(f)):
+                    if i == 0 and b"\0" in block[:_SNIFF_BYTES]:
+                        return []
+                    # A plain substring test is far cheaper than the regex;
+                    # most unindexed candidates fail it.
+                    haystack = block if case_sensitive else block.lower()
+                    if all(n in haystack for n in needles):
+                        _match_block(block.decode(errors="replace"), pattern, line_no, hits)
+                        if len(hits) >= _MAX_HITS:
+                            break
+                    line_no += block.count(b"\n")
+        except OSError:
+            return []
+        return hits
+
+    def _read_lines(self, rel: str, numbers: Collection[int]) -> dict[int, str]:
+        """Lines *numbers* of *rel* (cut short), reading no further than the last."""
+        found: dict[int, str] = {}
+        last = max(numbers, default=0)
+        line_no = 1
+        try:
+            with open(os.path.join(self.root, rel), "rb") as f:
+                for block in _blocks(f):
+                    newlines = block.count(b"\n")
+                    if any(line_no <= k <= line_no + newlines for k in numbers):
+                        lines = block.split(b"\n")
+                        if block.endswith(b"\n"):
+                            lines.pop()
+                        for k, line in enumerate(lines, line_no):
+                            # The first piece of a line split across blocks wins.
+                            if k in numbers and k not in found:
+                                found[k] = line[:_LINE_WIDTH * 4].rstrip(b"\r").decode(errors="replace")
+                    line_no += newlines
+                    if line_no > last:
+                        break
+        except OSError:
+            pass
+        return found
+
+    def _render(self, rel: str, line_numbers: list[int], context: int) -> str:
+        wanted: dict[int, bool] = {}
+        for n in line_numbers:
+            for k in range(max(1, n - context), n + context + 1):
+                wanted[k] = wanted.get(k, False) or k == n
+        lines = self._read_lines(rel, wanted)
+        out: list[str] = []
+        prev = 0
+        for k in sorted(wanted):
+            if k not in lines:
+                break  # past the end of the file
+            if prev and k > prev + 1:
+                out.append("  --")
+            line = lines[k]
+            if len(line) > _LINE_WIDTH:
+                line = line[:_LINE_WIDTH] + "…"
+            out.append(f"{'>' if wanted[k] else ' '} {k:>5}: {line}")
+            prev = k
+        return "\n".join(out)
+
+
+def _blocks(f: BinaryIO) -> Iterator[bytes]:
+    """Yield *f* in blocks of about ``_SCAN_BLOCK`` bytes that end after a newline.
+
+    A line longer than a block is split (without changing line numbers).
+    """
+    carry = b""
+    while chunk := f.read(_SCAN_BLOCK):
+        data = carry + chunk
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            carry = b""
+            yield data
+        else:
+            carry = data[cut:]
+            yield data[:cut]
+    if carry:
+        yield carry
+
+
+def _match_block(
+    text: str, pattern: re.Pattern[str], first_line: int, hits: list[tuple[int, str]]
+) -> None:
+    """Append ``(line number, line)`` for each line of *text* matching *pattern*."""
+    line_no, pos, last_line = first_line, 0, 0
+    for m in pattern.finditer(text):
+        line_no += text.count("\n", pos, m.start())
+        pos = m.start()
+        if line_no == last_line:
+            continue
+        last_line = line_no
+        # The matching line, or a window around the match in a very long one.
+        start = max(text.rfind("\n", 0, m.start()) + 1, m.start() - _LINE_WIDTH)
+        end = text.find("\n", m.start())
+        end = min(end if end >= 0 else len(text), m.end() + _LINE_WIDTH)
+        hits.append((line_no, text[start:end]))
+        if len(hits) >= _MAX_HITS:
+            return
+
+
+def make_search_workspace(workspace: Path, config: ToolsConfig):
+    """Create the ``search_workspace`` tool over *workspace*."""
+    index = WorkspaceIndex(
+        workspace,
+        max_files=config.search_max_files,
+        max_file_bytes=config.search_max_file_bytes,
+        # Spilled tool outputs would only echo earlier results.
+        ignores=DEFAULT_IGNORES + (f"/{config.artifacts_dir.strip('/')}/",),
+    )
+    warming: asyncio.Task | None = None
+
+    async def search_workspace(
+        query: str = "",
+        glob: str = "",
+        regex: bool = False,
+        case_sensitive: bool = False,
+        context: int = 2,
+        max_results: int = 10,
+    ) -> str:
+        """Search the files in the workspace.
+
+        *query* is matched against file contents and paths (as plain text,
+        or as a Python regular expression when *regex* is true).  *glob*
+        limits the search to matching paths, e.g. ``"*.py"`` or
+        ``"src/**/*.ts"``; with no *query* it just lists matching files.
+        Results are ranked and show matching lines with *context* lines
+        around them.  Files excluded by .gitignore are skipped.
+        """
+        nonlocal warming
+        if not query and not glob:
+            return "Error: give a query, a glob, or both."
+        try:
+            result = await run_io(
+                index.search,
+                query,
+                regex=regex,
+                glob=glob,
+                case_sensitive=case_sensitive,
+                context=max(0, min(context, 10)),
+                max_results=max(1, min(max_results, 50)),
+            )
+        except re.error as exc:
+            return f"Error: invalid regex {query!r}: {exc}"
+        except Exception as exc:
+            return f"Error searching workspace: {exc}"
+        if index.pending and (warming is None or warming.done()):
+            # Finish a large first index off the request path.
+            warming = asyncio.create_task(run_io(index.warm), name="workspace-index")
+        return result
+
+    return search_workspace
@@ -0,0 +1,18 @@
+"""Helpers for tools that take ADK's injected ``tool_context``."""
+
+from __future__ import annotations
+
+from typing import Any
+
+DEFAULT_SESSION = "default"
+
+
+def session_id_of(tool_context: Any) -> str:
+    """Return the id of the session a tool call belongs to.
+
+    This is the bus ``session_key`` (``"<channel>:<chat_id>"``) set by the
+    message processor.  Falls back to :data:`DEFAULT_SESSION` when the tool
+    is called outside an agent run.
+    """
+    session = getattr(tool_context, "session", None)
+    return getattr(session, "id", None) or DEFAULT_SESSION
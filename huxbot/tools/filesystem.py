@@ -2,59 +2,324 @@
 
 from __future__ import annotations
 
+import mmap
 import os
+import re
 from pathlib import Path
 
+from huxbot.tools.patch import (
+    FileEdit,
+    commit,
+    parse_unified_diff,
+    plan_edits,
+    plan_patch,
+    read_source,
+)
+from huxbot.utils.aio import run_io
+from huxbot.utils.helpers import atomic_write
+from huxbot.utils.ignore import IgnoreRules, compile_glob
 
-async def read_file(path: str) -> str:
-    """Read and return the contents of a file at *path*."""
+# Default amount returned when no range is given, and the cap on any range.
+MAX_READ_BYTES = 32 * 1024
+# Files at least this large are scanned through mmap instead of read().
+MMAP_THRESHOLD = 1024 * 1024
+_SNIFF_BYTES = 8192
+_SCAN_CHUNK = 1024 * 1024
+
+
+def _is_binary(head: bytes) -> bool:
+    return b"\0" in head
+
+
+def _line_offset(buf, line: int, size: int) -> int:
+    """Byte offset where 1-based *line* starts (``size`` if past the end)."""
+    pos = 0
+    remaining = line - 1
+    # Count newlines a chunk at a time, then walk the last chunk.
+    while remaining and pos < size:
+        chunk = buf[pos:pos + _SCAN_CHUNK]
+        n = chunk.count(b"\n")
+        if n < remaining:
+            remaining -= n
+            pos += len(chunk)
+            continue
+        for _ in range(remaining):
+            nl = buf.find(b"\n", pos, size)
+            if nl < 0:
+                return size
+            pos = nl + 1
+        remaining = 0
+    return min(pos, size)
+
+
+def _tail_offset(buf, lines: int, size: int) -> int:
+    """Byte offset of the start of the last *lines* lines."""
+    end = size - 1 if size and buf[size - 1:size] == b"\n" else size
+    pos = end
+    for _ in range(lines):
+        pos = buf.rfind(b"\n", 0, pos)
+        if pos < 0:
+            return 0
+    return pos + 1
+
+
+def _read(path: str, offset: int, limit: int, start_line: int, end_line: int) -> str:
     p = Path(path).expanduser()
     if not p.is_file():
         return f"Error: {path} is not a file or does not exist."
+    size = p.stat().st_size
+    limit = min(limit or MAX_READ_BYTES, MAX_READ_BYTES)
+
+    with p.open("rb") as f:
+        head = f.read(_SNIFF_BYTES)
+        if _is_binary(head):
+            return f"{path}: binary file, {size} bytes."
+        if size <= len(head):
+            buf = head
+        elif size < MMAP_THRESHOLD:
+            buf = head + f.read()
+        else:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return _slice(path, buf, len(buf), offset, limit, start_line, end_line)
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+
+
+def _slice(path, buf, size: int, offset: int, limit: int, start_line: int, end_line: int) -> str:
+    if start_line:
+        # Line range; a negative start_line means the last -start_line lines.
+        if start_line < 0:
+            begin, want = _tail_offset(buf, -start_line, size), size
+        else:
+            begin = _line_offset(buf, start_line, size)
+            want = _line_offset(buf, end_line + 1, size) if end_line >= start_line else size
+        if begin >= size and size:
+            return f"Error: {path} has fewer than {start_line} lines."
+        stop = want
+        if stop - begin > limit:
+            # Cut at the last full line that fits.
+            stop = begin + limit
+            nl = buf.rfind(b"\n", begin, stop)
+            if nl > begin:
+                stop = nl + 1
+        text = bytes(buf[begin:stop]).decode(errors="replace")
+        if stop < want:
+            text += f"\n[Truncated at {limit} bytes; continue with offset={stop}]"
+        return text
+
+    if offset or size > limit:
+        if offset < 0:
+            offset = max(size + offset, 0)
+        if offset >= size and size:
+            return f"Error: offset {offset} is past the end of {path} ({size} bytes)."
+        stop = min(offset + limit, size)
+        if offset == 0 and stop < size:
+            nl = buf.rfind(b"\n", 0, stop)
+            stop = nl + 1 if nl > 0 else stop
+            text = bytes(buf[:stop]).decode(errors="replace")
+            return (
+                f"{text}\n[Showing bytes 0-{stop} of {size}. Read more with offset/limit, "
+                "start_line/end_line, or a negative start_line for the last lines.]"
+            )
+        text = bytes(buf[offset:stop]).decode(errors="replace")
+        return f"[Bytes {offset}-{stop} of {size}]\n{text}"
+
+    return bytes(buf[:size]).decode(errors="replace")
+
+
+async def read_file(
+    path: str, offset: int = 0, limit: int = 0, start_line: int = 0, end_line: int = 0
+) -> str:
+    """Read a text file at *path*.
+
+    Small files are returned whole; for large ones the beginning is shown
+    with the file size.  To read a part, give a byte *offset* (negative
+    counts from the end) and *limit*, or a 1-based *start_line* and
+    inclusive *end_line* (a negative *start_line* returns that many lines
+    from the end).  At most 32 KB is returned per call.
+    """
     try:
-        return p.read_text(errors="replace")
+        return await run_io(_read, path, offset, limit, start_line, end_line)
     except Exception as exc:
         return f"Error reading {path}: {exc}"
 
 
+def _write(path: str, content: str) -> str:
+    atomic_write(Path(path).expanduser().resolve(), content)
+    return f"Wrote {len(content)} characters to {path}."
+
+
 async def write_file(path: str, content: str) -> str:
     """Write *content* to a file at *path*, creating parent directories as needed."""
-    p = Path(path).expanduser()
     try:
-        p.parent.mkdir(parents=True, exist_ok=True)
-        p.write_text(content)
-        return f"Wrote {len(content)} characters to {path}."
+        return await run_io(_write, path, content)
     except Exception as exc:
         return f"Error writing {path}: {exc}"
 
 
-async def edit_file(path: str, old_string: str, new_string: str) -> str:
-    """Replace the first occurrence of *old_string* with *new_string* in a file."""
-    p = Path(path).expanduser()
+def _edit(path: str, old_string: str, new_string: str) -> str:
+    p = Path(path).expanduser().resolve()
     if not p.is_file():
         return f"Error: {path} does not exist."
+    text, eol = read_source(p)
+    old_string, new_string = old_string.replace("\r\n", "\n"), new_string.replace("\r\n", "\n")
+    if old_string not in text:
+        return f"Error: old_string not found in {path}."
+    atomic_write(p, text.replace(old_string, new_string, 1).replace("\n", eol))
+    return f"Edited {path} successfully."
+
+
+async def edit_file(path: str, old_string: str, new_string: str) -> str:
+    """Replace the first occurrence of *old_string* with *new_string* in a file."""
     try:
-        text = p.read_text()
-        if old_string not in text:
-            return f"Error: old_string not found in {path}."
-        p.write_text(text.replace(old_string, new_string, 1))
-        return f"Edited {path} successfully."
+        return await run_io(_edit, path, old_string, new_string)
     except Exception as exc:
         return f"Error editing {path}: {exc}"
 
 
-async def list_dir(path: str = ".") -> str:
-    """List directory contents at *path*."""
+def _apply(plan) -> str:
+    contents, failures = plan()
+    if failures:
+        return "Error: nothing was changed.\n" + "\n".join(failures)
+    if not contents:
+        return "Error: nothing to change."
+    return "Applied:\n" + "\n".join(commit(contents))
+
+
+async def multi_edit(edits: list[FileEdit]) -> str:
+    """Apply several replacements, in one or more files, all-or-nothing.
+
+    Each edit replaces *old_string* with *new_string* in *path*; edits to
+    the same file apply in order.  *old_string* must occur exactly once
+    unless *replace_all* is set.  If any edit fails, no file is changed
+    and every failure is listed.
+    """
+    try:
+        edits = [FileEdit.model_validate(e) for e in edits]
+        return await run_io(_apply, lambda: plan_edits(edits))
+    except Exception as exc:
+        return f"Error applying edits: {exc}"
+
+
+async def apply_patch(patch: str) -> str:
+    """Apply a unified diff (as produced by ``diff -u`` or ``git diff``).
+
+    Paths in the ``---``/``+++`` headers are relative to the working
+    directory (``a/`` and ``b/`` prefixes are stripped); ``/dev/null``
+    creates or deletes a file.  Hunks are located by their context lines,
+    so line numbers may be approximate.  All files change or none do; the
+    hunks that did not apply are reported.
+    """
+    try:
+        patches = parse_unified_diff(patch)
+    except ValueError as exc:
+        return f"Error: {exc}"
+    if not patches:
+        return "Error: no '--- a/file' / '+++ b/file' headers found in patch."
+    try:
+        return await run_io(_apply, lambda: plan_patch(patches))
+    except Exception as exc:
+        return f"Error applying patch: {exc}"
+
+
+def _human_size(size: float) -> str:
+    if size < 1024:
+        return f"{int(size)}B"
+    for unit in ("K", "M", "G"):
+        size /= 1024
+        if size < 1024 or unit == "G":
+            break
+    return f"{size:.1f}{unit}"
+
+
+class _Listing:
+    """State of one recursive listing: limits and counters."""
+
+    def __init__(self, depth: int, pattern: re.Pattern[str] | None) -> None:
+        self.depth = depth
+        self.pattern = pattern
+        self.dirs = self.files = self.scanned = 0
+
+    def walk(self, path: str, rel: str, level: int, rules: IgnoreRules | None) -> list[str]:
+        """Lines for the directory at *path*; with a glob, empty if nothing below matches."""
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as exc:
+            return [f"{'  ' * level}[unreadable: {exc.strerror}]"]
+        if rules is not None:
+            rules = rules.child(path, rel, {e.name for e in entries})
+        out: list[str] = []
+        indent = "  " * level
+        for entry in entries:
+            self.scanned += 1
+            if self.scanned > _LIST_SCAN_LIMIT:
+                break
+            child = f"{rel}/{entry.name}" if rel else entry.name
+            try:
+                is_dir = entry.is_dir()  # d_type from scandir; no stat
+                is_link = entry.is_symlink()
+            except OSError:
+                continue
+            if rules is not None and rules.ignored(child, is_dir):
+                continue
+            if is_dir:
+                sub: list[str] = []
+                if level + 1 < self.depth and not is_link:
+                    sub = self.walk(entry.path, child, level + 1, rules)
+                if self.pattern is not None and not sub:
+                    continue
+                self.dirs += 1
+                out.append(f"{indent}{entry.name}/{' -> symlink' if is_link else ''}")
+                out.extend(sub)
+            else:
+                if self.pattern is not None and not self.pattern.fullmatch(child):
+                    continue
+                self.files += 1
+                try:
+                    size = _human_size(entry.stat().st_size)
+                except OSError:
+                    size = "?"
+                out.append(f"{indent}{entry.name}  {size}")
+        return out
+
+
+# Entries looked at per call, whatever depth is asked for.
+_LIST_SCAN_LIMIT = 50_000
+
+
+def _list(path: str, depth: int, glob: str, max_entries: int, include_ignored: bool) -> str:
     p = Path(path).expanduser()
     if not p.is_dir():
         return f"Error: {path} is not a directory."
+    listing = _Listing(max(depth, 1), compile_glob(glob) if glob else None)
+    rules = None if include_ignored else IgnoreRules.defaults()
+    lines = listing.walk(str(p), "", 0, rules)
+    if not lines:
+        return f"(no entries matching {glob!r})" if glob else "(empty directory)"
+    summary = f"[{listing.dirs} directories, {listing.files} files"
+    if len(lines) > max_entries:
+        summary += f"; showing the first {max_entries} of {len(lines)} entries. List a subdirectory or use glob to narrow it down"
+    if listing.scanned > _LIST_SCAN_LIMIT:
+        summary += f"; stopped after scanning {_LIST_SCAN_LIMIT} entries"
+    return "\n".join(lines[:max_entries]) + "\n" + summary + "]"
+
+
+async def list_dir(
+    path: str = ".", depth: int = 1, glob: str = "", max_entries: int = 200, include_ignored: bool = False
+) -> str:
+    """List the contents of directory *path* as an indented tree.
+
+    *depth* is how many levels to descend (1 = just *path*).  *glob*
+    keeps only matching files (e.g. ``"*.py"``, ``"src/**/test_*.py"``)
+    and the directories leading to them.  Entries excluded by .gitignore
+    and similar files are hidden unless *include_ignored* is set.  At most
+    *max_entries* lines are returned, followed by a count of everything
+    found.
+    """
     try:
-        entries = sorted(p.iterdir())
-        lines: list[str] = []
-        for e in entries:
-            suffix = "/" if e.is_dir() else ""
-            size = e.stat().st_size if e.is_file() else 0
-            lines.append(f"{'d' if e.is_dir() else 'f'}  {size:>8}  {e.name}{suffix}")
-        return "\n".join(lines) if lines else "(empty directory)"
+        return await run_io(_list, path, depth, glob, max(1, max_entries), include_ignored)
     except Exception as exc:
         return f"Error listing {path}: {exc}"
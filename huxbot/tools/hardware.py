@@ -6,6 +6,8 @@ import base64
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+from huxbot.utils.aio import run_io
+
 if TYPE_CHECKING:
     from huxbot.hardware.board import Board
 
@@ -47,9 +49,24 @@ def make_hardware_tools(board: "Board") -> list:
         """Capture an image from the board camera and save it to *save_path*."""
         b64_data = await board.capture_image()
         out = Path(save_path)
-        out.write_bytes(base64.b64decode(b64_data))
+        await run_io(out.write_bytes, base64.b64decode(b64_data))
         return f"Image saved to {out.resolve()}"
 
+    async def hardware_batch(commands: list[str]) -> str:
+        """Run several board commands in order, in one round-trip.
+
+        Each command uses the board protocol, e.g. ``PIN_MODE:13:OUTPUT``,
+        ``DIGITAL_WRITE:13:1``, ``DIGITAL_READ:2``, ``ANALOG_READ:0``,
+        ``SERVO_WRITE:9:90``, ``SENSOR_READ:dht11_temp``, ``LIST_DEVICES``.
+        Use it for multi-pin operations instead of one tool call per pin.
+        A failing command does not stop the ones after it.
+        """
+        results = await board.batch(commands)
+        return "\n".join(
+            f"{n}. {r.command} → {r.value if r.ok else 'ERR: ' + r.value}"
+            for n, r in enumerate(results, 1)
+        )
+
     return [
         hardware_pin_mode,
         hardware_digital_read,
@@ -58,4 +75,5 @@ def make_hardware_tools(board: "Board") -> list:
         hardware_servo_write,
         hardware_read_sensor,
         hardware_capture_image,
+        hardware_batch,
     ]
@@ -0,0 +1,132 @@
+"""Background jobs started by ``exec_command(background=True)``.
+
+A job runs like a one-off command (own process group, bounded head/tail
+output buffers) but in a task owned by the :class:`JobTable`, so it
+outlives the agent turn that started it.  When it ends, a notice is
+published on the bus to the chat it was started from.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+
+from huxbot.bus.events import OutboundMessage
+from huxbot.bus.queue import MessageBus
+from huxbot.tools.shell import OutputBuffer, collect, format_output, output_buffers, spawn
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for job_status/job_output before the oldest are dropped.
+KEEP_FINISHED = 50
+
+
+@dataclass
+class Job:
+    id: str
+    command: str
+    session_id: str
+    stdout: OutputBuffer
+    stderr: OutputBuffer
+    started_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    status: str = "running"  # running | exited | timed out | cancelled | failed
+    exit_code: int | None = None
+    task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+    def summary(self) -> str:
+        end = self.finished_at or time.time()
+        state = self.status
+        if self.exit_code is not None:
+            state += f" ({self.exit_code})"
+        cmd = self.command if len(self.command) <= 60 else self.command[:57] + "..."
+        return f"{self.id}  {state}  {end - self.started_at:.0f}s  {cmd}"
+
+    def output(self) -> str:
+        return format_output(self.stdout, self.stderr, self.summary())
+
+
+class JobTable:
+    """Tracks background jobs for every session."""
+
+    def __init__(
+        self, bus: MessageBus | None, *, max_running: int, timeout: float, output_limit: int
+    ) -> None:
+        self.bus = bus
+        self.max_running = max_running
+        self.timeout = timeout
+        self.output_limit = output_limit
+        self._jobs: dict[str, Job] = {}
+        self._ids = itertools.count(1)
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id.strip())
+
+    def jobs(self, session_id: str | None = None) -> list[Job]:
+        return [j for j in self._jobs.values() if session_id is None or j.session_id == session_id]
+
+    async def start(self, command: str, session_id: str) -> Job:
+        running = sum(1 for j in self._jobs.values() if j.running)
+        if running >= self.max_running:
+            raise RuntimeError(f"{running} background jobs already running")
+        stdout, stderr = output_buffers(self.output_limit)
+        job = Job(f"job{next(self._ids)}", command, session_id, stdout, stderr)
+        proc = await spawn(command)
+        job.task = asyncio.create_task(self._run(job, proc), name=f"job-{job.id}")
+        self._jobs[job.id] = job
+        self._prune()
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or not job.running or job.task is None:
+            return False
+        job.task.cancel()
+        return True
+
+    async def cancel_all(self) -> None:
+        """Cancel every running job and wait for its process group to be killed."""
+        tasks = [j.task for j in self._jobs.values() if j.running and j.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: Job, proc: asyncio.subprocess.Process) -> None:
+        try:
+            finished = await collect(proc, job.stdout, job.stderr, self.timeout or None)
+            job.status = "exited" if finished else "timed out"
+            job.exit_code = proc.returncode if finished else None
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as exc:
+            logger.exception("Background job %s failed", job.id)
+            job.status = "failed"
+            job.stderr.write(str(exc).encode())
+        finally:
+            job.finished_at = time.time()
+        await self._notify(job)
+
+    async def _notify(self, job: Job) -> None:
+        """Tell the chat that started *job* that it has ended."""
+        channel, sep, chat_id = job.session_id.partition(":")
+        if self.bus is None or not sep or channel == "cli" or job.status == "cancelled":
+            return
+        tail = job.stdout.tail or job.stdout.head
+        text = f"Background job finished: {job.summary()}"
+        if tail:
+            text += "\n" + bytes(tail[-500:]).decode(errors="replace").strip()
+        await self.bus.publish_outbound(
+            OutboundMessage(channel=channel, recipient=chat_id, text=text)
+        )
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if not j.running]
+        for job in finished[: max(0, len(finished) - KEEP_FINISHED)]:
+            del self._jobs[job.id]
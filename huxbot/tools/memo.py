@@ -0,0 +1,165 @@
+"""Per-session memoization of idempotent tool results.
+
+Within a turn the model often reads the same file, lists the same
+directory or fetches the same URL more than once.  :class:`ToolMemo`
+wraps such tools and answers repeats from memory:
+
+* entries are keyed on the calling session, the tool and its arguments,
+  and expire after a TTL;
+* for file tools the entry also records the target's ``(mtime, size)``,
+  so a file changed behind the agent's back is read again;
+* tools that change files (``write_file``, ``edit_file``, patches, and
+  the shell and background-job tools) are wrapped with :meth:`ToolMemo.invalidating`, which
+  drops the affected entries once they have run.
+
+``web_fetch`` entries are TTL-only; HTTP validators are already handled by
+the on-disk web cache underneath it.
+"""
+
+from __future__ import annotations
+
+import inspect
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from huxbot.tools.context import session_id_of
+from huxbot.tools.middleware import CONTEXT_PARAM, takes_context, wraps_tool
+
+# A file modified this recently may change again within the same mtime
+# tick without its stat changing, so its content is not cached.
+_RACY_SECONDS = 1.0
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires: float
+    validator: tuple[int, int] | None
+    path: str | None
+
+
+def _resolve(path: Any) -> str:
+    return str(Path(str(path)).expanduser().resolve())
+
+
+def _stat(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ToolMemo:
+    """Result cache shared by the wrapped tools of one agent."""
+
+    def __init__(self, ttl: float, maxsize: int = 512) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cached(
+        self,
+        func: Callable[..., Any],
+        *,
+        path_arg: str | None = None,
+        cacheable: Callable[[Mapping[str, Any]], bool] | None = None,
+    ) -> Callable[..., Any]:
+        """Wrap idempotent tool *func*; *path_arg* names its file/directory argument.
+
+        Only the stat of *path_arg* is checked, so a call whose result also
+        depends on other files (e.g. a recursive listing) must be excluded
+        by *cacheable*, which gets the bound arguments.
+        """
+        if self.ttl <= 0:
+            return func
+        sig = inspect.signature(func)
+        name = func.__name__
+        passes_context = takes_context(func)
+
+        @wraps_tool(func)
+        async def wrapper(*args: Any, tool_context: Any = None, **kwargs: Any) -> Any:
+            bound = sig.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            if cacheable is not None and not cacheable(bound.arguments):
+                if passes_context:
+                    kwargs[CONTEXT_PARAM] = tool_context
+                return await func(*args, **kwargs)
+            arguments = tuple((k, v) for k, v in bound.arguments.items() if k != CONTEXT_PARAM)
+            key = (session_id_of(tool_context), name, arguments)
+            path = _resolve(bound.arguments[path_arg]) if path_arg else None
+            validator = _stat(path) if path else None
+
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > now and entry.validator == validator:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+
+            if passes_context:
+                kwargs[CONTEXT_PARAM] = tool_context
+            value = await func(*args, **kwargs)
+            if isinstance(value, str) and value.startswith("Error"):
+                return value
+            if validator is not None and time.time() - validator[0] / 1e9 < _RACY_SECONDS:
+                return value
+            self._entries[key] = _Entry(value, now + self.ttl, validator, path)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return value
+
+        return wrapper
+
+    def invalidating(self, func: Callable[..., Any], *, path_arg: str | None = None) -> Callable[..., Any]:
+        """Wrap tool *func*, which may change files, to drop affected entries after each call.
+
+        With *path_arg*, entries for that path and for directories containing
+        it are dropped; without, every file entry is.
+        """
+        if self.ttl <= 0:
+            return func
+        sig = inspect.signature(func)
+        passes_context = takes_context(func)
+
+        @wraps_tool(func)
+        async def wrapper(*args: Any, tool_context: Any = None, **kwargs: Any) -> Any:
+            path = None
+            if path_arg:
+                bound = sig.bind_partial(*args, **kwargs)
+                path = _resolve(bound.arguments.get(path_arg, "."))
+            if passes_context:
+                kwargs[CONTEXT_PARAM] = tool_context
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.invalidate(path)
+
+        return wrapper
+
+    def invalidate(self, path: str | None = None) -> None:
+        """Drop file entries touching *path* (all file entries when ``None``)."""
+        for key in [k for k, e in self._entries.items() if e.path is not None]:
+            entry_path = self._entries[key].path
+            if (
+                path is None
+                or entry_path == path
+                or path.startswith(entry_path + os.sep)
+                or entry_path.startswith(path + os.sep)
+            ):
+                del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
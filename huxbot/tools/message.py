@@ -17,9 +17,15 @@ def make_send_message(bus: "MessageBus"):
 
     async def send_message(channel: str, recipient: str, text: str) -> str:
         """Send a message to *recipient* on *channel* (e.g. 'telegram', 'discord')."""
+        from pydantic import ValidationError
+
         from huxbot.bus.events import OutboundMessage
 
-        msg = OutboundMessage(channel=channel, recipient=recipient, text=text)
+        # Arguments come from the model, so they go through validation.
+        try:
+            msg = OutboundMessage(channel=channel, recipient=recipient, text=text)
+        except ValidationError as exc:
+            return f"Error: invalid message: {exc}"
         await bus.publish_outbound(msg)
         return f"Message queued for {recipient} on {channel}."
 
@@ -0,0 +1,44 @@
+"""Helpers for wrapping tool functions without changing what the model sees.
+
+ADK builds a tool's declaration from the function's name, docstring and
+signature, and passes ``tool_context`` only to functions that declare it.
+:func:`wraps_tool` copies all of that onto a wrapper, with annotations
+resolved (so string annotations from ``from __future__ import annotations``
+still resolve in the wrapper's module), and always gives the wrapper a
+``tool_context`` parameter so it knows which session is calling.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+from collections.abc import Callable
+from typing import Any
+
+CONTEXT_PARAM = "tool_context"
+
+
+def takes_context(func: Callable[..., Any]) -> bool:
+    return CONTEXT_PARAM in inspect.signature(func).parameters
+
+
+def wraps_tool(func: Callable[..., Any]) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator: make *wrapper* look like *func* to ADK, plus a ``tool_context``."""
+    sig = inspect.signature(func, eval_str=True)
+    params = list(sig.parameters.values())
+    if CONTEXT_PARAM not in sig.parameters:
+        params.append(inspect.Parameter(CONTEXT_PARAM, inspect.Parameter.KEYWORD_ONLY, default=None))
+    annotations = {
+        p.name: p.annotation for p in params if p.annotation is not inspect.Parameter.empty
+    }
+    if sig.return_annotation is not inspect.Signature.empty:
+        annotations["return"] = sig.return_annotation
+
+    def decorate(wrapper: Callable[..., Any]) -> Callable[..., Any]:
+        functools.update_wrapper(wrapper, func)
+        wrapper.__signature__ = sig.replace(parameters=params)  # type: ignore[attr-defined]
+        wrapper.__annotations__ = annotations
+        return wrapper
+
+    return decorate
+
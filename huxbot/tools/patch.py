@@ -0,0 +1,303 @@
+"""Batched edits and unified diffs for the filesystem tools.
+
+Both entry points work in two phases.  First the new content of every
+touched file is computed in memory.  If any edit or hunk fails, nothing
+is written and every failure is reported.  Then :func:`commit` stages each
+file as a temp file next to the target and renames them all into place,
+restoring already-replaced files if a later rename fails.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from huxbot.utils.helpers import atomic_write, stage_file
+
+
+class FileEdit(BaseModel):
+    """Replace *old_string* with *new_string* in the file at *path*."""
+
+    path: str
+    old_string: str
+    new_string: str
+    replace_all: bool = False
+
+
+@dataclass
+class Hunk:
+    header: str
+    old_start: int | None  # None for "@@ @@" hunks without line numbers
+    lines: list[str] = field(default_factory=list)  # each prefixed with " ", "-" or "+"
+    no_newline_at_end: bool = False
+
+    @property
+    def old(self) -> list[str]:
+        return [line[1:] for line in self.lines if line[0] in " -"]
+
+    @property
+    def new(self) -> list[str]:
+        return [line[1:] for line in self.lines if line[0] in " +"]
+
+
+@dataclass
+class FilePatch:
+    old_path: str | None  # None: file is created
+    new_path: str | None  # None: file is deleted
+    hunks: list[Hunk] = field(default_factory=list)
+
+    @property
+    def path(self) -> str:
+        return self.new_path or self.old_path or "?"
+
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def _diff_path(raw: str) -> str | None:
+    path = raw.split("\t", 1)[0].strip()
+    if path == "/dev/null":
+        return None
+    if path.startswith(("a/", "b/")):
+        path = path[2:]
+    return path
+
+
+def parse_unified_diff(text: str) -> list[FilePatch]:
+    """Parse ``diff -u`` / ``git diff`` output into per-file patches.
+
+    Line counts in ``@@`` headers are not trusted (hand-written diffs often
+    get them wrong); a hunk runs until a line that is not context, removal
+    or addition.
+    """
+    patches: list[FilePatch] = []
+    lines = text.splitlines()
+    hunk: Hunk | None = None
+    blanks = 0  # empty lines seen in a hunk; context unless the hunk ends here
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            patches.append(FilePatch(_diff_path(line[4:]), _diff_path(lines[i + 1][4:])))
+            hunk, blanks = None, 0
+            i += 2
+            continue
+        if line.startswith("@@"):
+            if not patches:
+                raise ValueError("hunk before any '--- a/file' / '+++ b/file' header")
+            m = _HUNK_HEADER.match(line)
+            hunk, blanks = Hunk(line, int(m.group(1)) if m else None), 0
+            patches[-1].hunks.append(hunk)
+        elif hunk is not None:
+            if line == "":
+                blanks += 1  # editors often strip the space of blank context lines
+            elif line[0] in " -+":
+                hunk.lines.extend([" "] * blanks)
+                blanks = 0
+                hunk.lines.append(line)
+            elif line.startswith("\\"):
+                if hunk.lines and hunk.lines[-1][0] in " +":
+                    hunk.no_newline_at_end = True
+            else:
+                hunk = None
+        i += 1
+    return patches
+
+
+def _find(lines: list[str], block: list[str], start: int, expected: int, loose: bool) -> int:
+    """Index of *block* in *lines* at or after *start*, closest to *expected*; -1 if absent."""
+    norm = (lambda s: " ".join(s.split())) if loose else (lambda s: s)
+    want = [norm(b) for b in block]
+    best = -1
+    for i in range(start, len(lines) - len(block) + 1):
+        if norm(lines[i]) == want[0] and [norm(x) for x in lines[i:i + len(block)]] == want:
+            if best < 0 or abs(i - expected) < abs(best - expected):
+                best = i
+            elif i > expected:
+                break
+    return best
+
+
+def apply_hunks(text: str, hunks: list[Hunk]) -> tuple[str, list[str]]:
+    """Apply *hunks* to *text*; returns the new text and a message per failed hunk.
+
+    Hunks are located by their context, preferring the position nearest
+    the line number in the header, so a diff against a slightly different
+    version still applies.  Whitespace differences and out-of-order hunks
+    are tolerated as a last resort.
+    """
+    eol = "\r\n" if "\r\n" in text else "\n"
+    ends_with_eol = text.endswith(eol) or not text
+    lines = text.split(eol)
+    if ends_with_eol:
+        lines.pop()
+    failures: list[str] = []
+    delta = 0  # lines added minus removed by earlier hunks
+    floor = 0  # hunks apply in order, after the previous one
+    for n, hunk in enumerate(hunks, 1):
+        old, new = hunk.old, hunk.new
+        expected = max((hunk.old_start or 1) - 1 + delta, 0)
+        if not old:
+            # "@@ -N,0 ..." inserts after line N; without a number, append.
+            pos = len(lines) if hunk.old_start is None else hunk.old_start + delta
+            pos = min(max(pos, floor), len(lines))
+        else:
+            # Exact match after the previous hunk first; then tolerate
+            # whitespace changes, then hunks given out of order.
+            pos = -1
+            for start, loose in ((floor, False), (floor, True), (0, False), (0, True)):
+                pos = _find(lines, old, start, expected, loose)
+                if pos >= 0:
+                    break
+        if pos < 0:
+            where = f" near line {hunk.old_start}" if hunk.old_start else ""
+            failures.append(f"hunk {n} ({hunk.header}): context not found{where}; expected {old[0]!r}")
+            continue
+        lines[pos:pos + len(old)] = new
+        delta += len(new) - len(old)
+        floor = pos + len(new)
+        if pos + len(new) == len(lines):
+            if hunk.no_newline_at_end:
+                ends_with_eol = False
+            elif new:
+                ends_with_eol = True
+    out = eol.join(lines)
+    if ends_with_eol and lines:
+        out += eol
+    return out, failures
+
+
+def resolve(path: str) -> Path:
+    return Path(path).expanduser().resolve()
+
+
+def read_source(path: Path) -> tuple[str, str]:
+    """*path*'s text with ``\n`` line ends, and the line end to write it back with.
+
+    A file using ``\r\n`` throughout keeps it; one mixing both is written
+    back with ``\n``.
+    """
+    with open(path, newline="") as f:
+        raw = f.read()
+    crlf = raw.count("\r\n")
+    if not crlf:
+        return raw, "\n"
+    return raw.replace("\r\n", "\n"), "\r\n" if crlf == raw.count("\n") else "\n"
+
+
+def with_eol(contents: dict[Path, str | None], eols: dict[Path, str]) -> dict[Path, str | None]:
+    """*contents* with ``\n`` turned back into each file's own line end."""
+    return {
+        p: text.replace("\n", "\r\n") if text is not None and eols.get(p) == "\r\n" else text
+        for p, text in contents.items()
+    }
+
+
+def plan_edits(edits: list[FileEdit]) -> tuple[dict[Path, str | None], list[str]]:
+    """New content per file for *edits*, applied in order; plus failure messages."""
+    contents: dict[Path, str | None] = {}
+    eols: dict[Path, str] = {}
+    failures: list[str] = []
+    for n, edit in enumerate(edits, 1):
+        p = resolve(edit.path)
+        if p not in contents:
+            if not p.is_file():
+                failures.append(f"edit {n}: {edit.path} does not exist")
+                continue
+            contents[p], eols[p] = read_source(p)
+        text = contents[p] or ""
+        # Files are matched with "\n" line ends (see read_source).
+        old_string = edit.old_string.replace("\r\n", "\n")
+        new_string = edit.new_string.replace("\r\n", "\n")
+        count = text.count(old_string) if old_string else 0
+        if count == 0:
+            failures.append(f"edit {n}: old_string not found in {edit.path}")
+        elif count > 1 and not edit.replace_all:
+            failures.append(
+                f"edit {n}: old_string occurs {count} times in {edit.path}; "
+                "add surrounding context or set replace_all"
+            )
+        else:
+            contents[p] = text.replace(old_string, new_string, -1 if edit.replace_all else 1)
+    return with_eol(contents, eols), failures
+
+
+def plan_patch(patches: list[FilePatch]) -> tuple[dict[Path, str | None], list[str]]:
+    """New content per file for a parsed diff (``None`` deletes); plus failure messages."""
+    contents: dict[Path, str | None] = {}
+    eols: dict[Path, str] = {}
+    failures: list[str] = []
+    for fp in patches:
+        if fp.old_path is None:
+            if fp.new_path is None:
+                continue
+            p = resolve(fp.new_path)
+            if p.exists():
+                failures.append(f"{fp.new_path}: patch creates it but it already exists")
+                continue
+            contents[p], _ = apply_hunks("", fp.hunks)
+            continue
+        src = resolve(fp.old_path)
+        if src in contents:
+            text = contents[src]
+        elif src.is_file():
+            text, eols[src] = read_source(src)
+        else:
+            text = None
+        if text is None:
+            failures.append(f"{fp.old_path}: does not exist")
+            continue
+        new_text, errors = apply_hunks(text, fp.hunks)
+        failures.extend(f"{fp.path}: {e}" for e in errors)
+        if errors:
+            continue
+        if fp.new_path is None:
+            contents[src] = None
+            continue
+        dest = resolve(fp.new_path)
+        contents[dest] = new_text
+        if dest != src:
+            contents[src] = None  # rename
+            eols[dest] = eols.get(src, "\n")
+    return with_eol(contents, eols), failures
+
+
+def commit(contents: dict[Path, str | None]) -> list[str]:
+    """Write every file in *contents* (``None`` deletes it) all-or-nothing.
+
+    Returns one "created/modified/deleted <path>" line per file.
+    """
+    originals: dict[Path, bytes | None] = {
+        p: (p.read_bytes() if p.is_file() else None) for p in contents
+    }
+    staged: dict[Path, Path] = {}
+    done: list[Path] = []
+    try:
+        for p, text in contents.items():
+            if text is not None:
+                staged[p] = stage_file(p, text)
+        for p, text in contents.items():
+            if text is None:
+                p.unlink(missing_ok=True)
+            else:
+                os.replace(staged.pop(p), p)
+            done.append(p)
+    except BaseException:
+        for p in done:
+            before = originals[p]
+            if before is None:
+                p.unlink(missing_ok=True)
+            else:
+                atomic_write(p, before)
+        raise
+    finally:
+        for tmp in staged.values():
+            tmp.unlink(missing_ok=True)
+    return [
+        f"{'deleted' if text is None else 'created' if originals[p] is None else 'modified'} {p}"
+        for p, text in contents.items()
+    ]
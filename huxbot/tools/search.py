@@ -0,0 +1,142 @@
+"""Web search backends.
+
+Each backend turns one query into a list of :class:`SearchResult`; the
+``web_search`` tool (see :mod:`huxbot.tools.web`) picks one with
+:func:`make_search_backend` from ``tools.web_search_engine``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Protocol, runtime_checkable
+
+import aiohttp
+
+from huxbot.config.schema import ToolsConfig
+from huxbot.utils.http import get_session
+
+_TIMEOUT = aiohttp.ClientTimeout(total=15)
+
+
+class SearchError(Exception):
+    """Raised when a backend cannot be used or its API call fails."""
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    title: str
+    url: str
+    snippet: str = ""
+
+
+@runtime_checkable
+class SearchBackend(Protocol):
+    """Protocol for search providers."""
+
+    name: str
+
+    async def search(self, query: str, num_results: int) -> list[SearchResult]: ...
+
+
+async def _get_json(url: str, params: dict[str, Any], headers: dict[str, str] | None = None) -> Any:
+    async with get_session().get(url, params=params, headers=headers, timeout=_TIMEOUT) as resp:
+        if resp.status != 200:
+            raise SearchError(f"HTTP {resp.status} from {url}")
+        return await resp.json(content_type=None)
+
+
+class GoogleSearch:
+    """Google Programmable Search (Custom Search JSON API)."""
+
+    name = "google"
+    URL = "https://www.googleapis.com/customsearch/v1"
+
+    def __init__(self, api_key: str, cx: str) -> None:
+        if not api_key or not cx:
+            raise SearchError("Google search needs tools.web_search_api_key and tools.web_search_cx")
+        self.api_key = api_key
+        self.cx = cx
+
+    async def search(self, query: str, num_results: int) -> list[SearchResult]:
+        params = {"key": self.api_key, "cx": self.cx, "q": query, "num": min(num_results, 10)}
+        data = await _get_json(self.URL, params)
+        return [
+            SearchResult(item.get("title", ""), item["link"], item.get("snippet", ""))
+            for item in data.get("items") or []
+            if item.get("link")
+        ]
+
+
+class BraveSearch:
+    """Brave Search API."""
+
+    name = "brave"
+    URL = "https://api.search.brave.com/res/v1/web/search"
+
+    def __init__(self, api_key: str) -> None:
+        if not api_key:
+            raise SearchError("Brave search needs tools.web_search_api_key")
+        self.api_key = api_key
+
+    async def search(self, query: str, num_results: int) -> list[SearchResult]:
+        headers = {"X-Subscription-Token": self.api_key, "Accept": "application/json"}
+        params = {"q": query, "count": min(num_results, 20)}
+        data = await _get_json(self.URL, params, headers)
+        return [
+            SearchResult(item.get("title", ""), item["url"], item.get("description", ""))
+            for item in (data.get("web") or {}).get("results") or []
+            if item.get("url")
+        ]
+
+
+class SearxngSearch:
+    """Self-hosted SearXNG instance (JSON output must be enabled)."""
+
+    name = "searxng"
+
+    def __init__(self, base_url: str) -> None:
+        if not base_url:
+            raise SearchError("SearXNG search needs tools.web_search_url")
+        self.url = base_url.rstrip("/") + "/search"
+
+    async def search(self, query: str, num_results: int) -> list[SearchResult]:
+        data = await _get_json(self.url, {"q": query, "format": "json"})
+        return [
+            SearchResult(item.get("title", ""), item["url"], item.get("content", ""))
+            for item in (data.get("results") or [])[:num_results]
+            if item.get("url")
+        ]
+
+
+class FakeSearch:
+    """Offline backend returning deterministic results, for tests."""
+
+    name = "fake"
+
+    async def search(self, query: str, num_results: int) -> list[SearchResult]:
+        slug = "-".join(query.lower().split()) or "empty"
+        return [
+            SearchResult(
+                f"Result {i} for {query}",
+                f"https://example.com/{slug}/{i}",
+                f"Snippet {i} about {query}.",
+            )
+            for i in range(1, num_results + 1)
+        ]
+
+
+def make_search_backend(config: ToolsConfig) -> SearchBackend:
+    """Create the backend named by ``config.web_search_engine``.
+
+    Raises :class:`SearchError` for an unknown engine or missing settings.
+    """
+    engine = config.web_search_engine.lower()
+    if engine == "google":
+        return GoogleSearch(config.web_search_api_key, config.web_search_cx)
+    if engine == "brave":
+        return BraveSearch(config.web_search_api_key)
+    if engine == "searxng":
+        return SearxngSearch(config.web_search_url)
+    if engine == "fake":
+        return FakeSearch()
+    raise SearchError(f"Unknown search engine {config.web_search_engine!r}")
@@ -3,35 +3,237 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import os
+import signal
 
-from huxbot.utils.helpers import truncate
+from google.adk.tools.tool_context import ToolContext
 
-DEFAULT_TIMEOUT = 30
+from huxbot.bus.queue import MessageBus
+from huxbot.config.schema import ToolsConfig
+from huxbot.tools.context import session_id_of
 
+READ_SIZE = 64 * 1024
+# Time a timed-out process group gets to exit after SIGTERM before SIGKILL.
+KILL_GRACE = 2.0
 
-async def exec_command(command: str, timeout: int = DEFAULT_TIMEOUT) -> str:
-    """Execute a shell command and return its combined stdout/stderr.
+# Shell pools and job tables created by make_shell_tools, closed by shutdown().
+_pools: list = []
+_job_tables: list = []
 
-    *timeout* is in seconds.
+
+class OutputBuffer:
+    """Keep the first and last bytes of a stream, counting what is dropped.
+
+    Memory stays bounded by ``head + tail`` however much the command prints.
+    """
+
+    def __init__(self, head: int, tail: int) -> None:
+        self.head_limit = head
+        self.tail_limit = tail
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data and self.tail_limit > 0:
+            self.tail += data
+            if len(self.tail) > self.tail_limit:
+                del self.tail[: len(self.tail) - self.tail_limit]
+
+    @property
+    def omitted(self) -> int:
+        return self.total - len(self.head) - len(self.tail)
+
+    def text(self) -> str:
+        out = self.head.decode(errors="replace")
+        if self.omitted:
+            out += f"\n[... {self.omitted} bytes omitted ...]\n"
+        return out + self.tail.decode(errors="replace")
+
+
+async def _pump(stream: asyncio.StreamReader, buf: OutputBuffer) -> None:
+    while chunk := await stream.read(READ_SIZE):
+        buf.write(chunk)
+
+
+async def kill_group(proc: asyncio.subprocess.Process) -> None:
+    """Terminate *proc* and everything it spawned (its process group).
+
+    The group gets SIGTERM and a short grace period, then SIGKILL so that
+    children ignoring SIGTERM do not outlive the shell.
+    """
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(proc.pid, signal.SIGTERM)
+    with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(proc.wait(), KILL_GRACE)
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(proc.pid, signal.SIGKILL)
+    await proc.wait()
+
+
+def format_output(stdout: OutputBuffer, stderr: OutputBuffer | None, footer: str) -> str:
+    result = stdout.text()
+    if stderr and stderr.total:
+        result += f"\n[stderr]\n{stderr.text()}"
+    return f"{result}\n[{footer}]"
+
+
+def output_buffers(output_limit: int) -> tuple[OutputBuffer, OutputBuffer]:
+    """Buffers for stdout and stderr: *output_limit* and half that, head + tail."""
+    return (
+        OutputBuffer(output_limit // 2, output_limit // 2),
+        OutputBuffer(output_limit // 4, output_limit // 4),
+    )
+
+
+async def spawn(command: str) -> asyncio.subprocess.Process:
+    """Start *command* through the shell in a new process group."""
+    return await asyncio.create_subprocess_shell(
+        command,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+
+
+async def collect(
+    proc: asyncio.subprocess.Process,
+    stdout: OutputBuffer,
+    stderr: OutputBuffer,
+    timeout: float | None,
+) -> bool:
+    """Stream *proc*'s output into the buffers until it exits.
+
+    Returns False if it was killed (with its whole process group) after
+    *timeout* seconds.  Cancelling the call kills the group too.
     """
+    tasks = [
+        asyncio.create_task(_pump(proc.stdout, stdout)),  # type: ignore[arg-type]
+        asyncio.create_task(_pump(proc.stderr, stderr)),  # type: ignore[arg-type]
+        asyncio.create_task(proc.wait()),
+    ]
     try:
-        proc = await asyncio.create_subprocess_shell(
-            command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
-        out = stdout.decode(errors="replace")
-        err = stderr.decode(errors="replace")
-        result = ""
-        if out:
-            result += out
-        if err:
-            result += f"\n[stderr]\n{err}"
-        result += f"\n[exit code: {proc.returncode}]"
-        return truncate(result)
-    except asyncio.TimeoutError:
-        proc.kill()  # type: ignore[union-attr]
-        return f"Error: command timed out after {timeout}s."
-    except Exception as exc:
-        return f"Error executing command: {exc}"
+        _done, pending = await asyncio.wait(tasks, timeout=timeout)
+        if not pending:
+            return True
+        await kill_group(proc)
+        # Let the readers drain what was written before the kill; a detached
+        # grandchild may still hold the pipes open, so don't wait forever.
+        await asyncio.wait(tasks, timeout=KILL_GRACE)
+        return False
+    except asyncio.CancelledError:
+        await kill_group(proc)
+        raise
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def run_command(command: str, timeout: float, output_limit: int) -> str:
+    """Run *command* in its own process group with bounded output capture.
+
+    At most *output_limit* bytes of stdout and half that of stderr are
+    kept, split between the beginning and the end of each stream.  On
+    timeout the whole group is killed and the output captured so far is
+    returned.
+    """
+    stdout, stderr = output_buffers(output_limit)
+    proc = await spawn(command)
+    if await collect(proc, stdout, stderr, timeout):
+        return format_output(stdout, stderr, f"exit code: {proc.returncode}")
+    return format_output(stdout, stderr, f"killed: timed out after {timeout}s")
+
+
+async def shutdown() -> None:
+    """Cancel background jobs and close persistent shells (call once, on shutdown)."""
+    pools, job_tables = list(_pools), list(_job_tables)
+    _pools.clear()
+    _job_tables.clear()
+    for jobs in job_tables:
+        await jobs.cancel_all()
+    for pool in pools:
+        await pool.close_all()
+
+
+def make_shell_tools(config: ToolsConfig, bus: MessageBus | None = None) -> list:
+    """Return the shell and job tools, sharing one shell pool and job table.
+
+    *bus* receives the completion notices of background jobs.
+    """
+    from huxbot.tools.jobs import JobTable
+    from huxbot.tools.shellpool import ShellPool
+
+    pool = ShellPool(config.shell_max_sessions, config.shell_idle_timeout, config.exec_output_limit)
+    _pools.append(pool)
+    jobs = JobTable(
+        bus,
+        max_running=config.jobs_max_running,
+        timeout=config.jobs_timeout,
+        output_limit=config.exec_output_limit,
+    )
+    _job_tables.append(jobs)
+
+    def _own_job(job_id: str, tool_context: ToolContext | None):
+        job = jobs.get(job_id)
+        if job is None or job.session_id != session_id_of(tool_context):
+            return None
+        return job
+
+    async def exec_command(
+        command: str,
+        timeout: int = 0,
+        persistent: bool = False,
+        background: bool = False,
+        tool_context: ToolContext | None = None,
+    ) -> str:
+        """Execute a shell command and return its combined stdout/stderr.
+
+        *timeout* is in seconds (0 uses the configured default).  With
+        *persistent* the command runs in this conversation's long-lived
+        shell, so the working directory and exported variables carry over
+        to later persistent calls.  With *background* the command is
+        started as a job and its id returned at once; use job_status,
+        job_output and job_cancel to follow it.  The chat is notified
+        when it finishes.  Long output is trimmed to its beginning and end.
+        """
+        timeout = timeout or config.exec_timeout
+        try:
+            if background:
+                job = await jobs.start(command, session_id_of(tool_context))
+                return f"Started background job {job.id}."
+            if persistent:
+                return await pool.run(session_id_of(tool_context), command, timeout)
+            return await run_command(command, timeout, config.exec_output_limit)
+        except Exception as exc:
+            return f"Error executing command: {exc}"
+
+    async def job_status(job_id: str = "", tool_context: ToolContext | None = None) -> str:
+        """Show the state of background job *job_id*, or of all jobs in this chat."""
+        if job_id:
+            job = _own_job(job_id, tool_context)
+            return job.summary() if job else f"Error: no job {job_id!r}"
+        listed = jobs.jobs(session_id_of(tool_context))
+        return "\n".join(j.summary() for j in listed) or "No background jobs."
+
+    async def job_output(job_id: str, tool_context: ToolContext | None = None) -> str:
+        """Return the output of background job *job_id* so far (beginning and end)."""
+        job = _own_job(job_id, tool_context)
+        return job.output() if job else f"Error: no job {job_id!r}"
+
+    async def job_cancel(job_id: str, tool_context: ToolContext | None = None) -> str:
+        """Stop background job *job_id* and everything it started."""
+        job = _own_job(job_id, tool_context)
+        if job is None:
+            return f"Error: no job {job_id!r}"
+        if not jobs.cancel(job.id):
+            return f"Job {job.id} is not running ({job.status})."
+        return f"Cancelling job {job.id}."
+
+    return [exec_command, job_status, job_output, job_cancel]
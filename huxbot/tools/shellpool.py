@@ -0,0 +1,214 @@
+"""Persistent per-session shells for ``exec_command``.
+
+A :class:`PersistentShell` is a long-lived ``bash`` (or ``sh``) reading
+commands on stdin, so ``cd``, exported variables and activated virtualenvs
+carry over between calls and no process is spawned per command.  Each
+command is followed by a ``printf`` of a random sentinel and the exit
+status; output is read until that sentinel appears.  Output goes through
+the same bounded :class:`~huxbot.tools.shell.OutputBuffer` as one-off
+commands.
+
+:class:`ShellPool` keeps one shell per agent session, closes shells idle
+for longer than ``idle_timeout`` and never runs more than ``max_shells``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import shlex
+import shutil
+import time
+import uuid
+
+from huxbot.tools.shell import KILL_GRACE, READ_SIZE, OutputBuffer, format_output, kill_group
+
+logger = logging.getLogger(__name__)
+
+
+class ShellDied(Exception):
+    """The shell exited (``exit`` was run, or it was killed)."""
+
+
+class PersistentShell:
+    """One long-lived shell process in its own process group."""
+
+    def __init__(self, output_limit: int) -> None:
+        self.output_limit = output_limit
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self.users = 0  # callers handed this shell by the pool and not done yet
+        self._proc: asyncio.subprocess.Process | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    @property
+    def busy(self) -> bool:
+        return self.users > 0 or self.lock.locked()
+
+    async def start(self) -> None:
+        shell = shutil.which("bash") or "/bin/sh"
+        self._proc = await asyncio.create_subprocess_exec(
+            shell,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+    async def run(self, command: str, timeout: float) -> str:
+        """Run *command* and return its output; kills the shell on timeout."""
+        async with self.lock:
+            self.last_used = time.monotonic()
+            try:
+                return await self._run(command, timeout)
+            finally:
+                self.last_used = time.monotonic()
+
+    async def _run(self, command: str, timeout: float) -> str:
+        proc = self._proc
+        if proc is None or proc.stdin is None or proc.stdout is None:
+            raise ShellDied("shell not started")
+        sentinel = f"__huxbot_{uuid.uuid4().hex}__"
+        # eval keeps a syntax error in *command* from ending the shell (in
+        # bash), and stdin is detached so commands cannot eat the protocol.
+        script = (
+            f"eval {shlex.quote(command)} </dev/null 2>&1\n"
+            f"printf '\\n{sentinel} %d\\n' \"$?\"\n"
+        )
+        out = OutputBuffer(self.output_limit // 2, self.output_limit // 2)
+        try:
+            proc.stdin.write(script.encode())
+            await proc.stdin.drain()
+            code = await asyncio.wait_for(self._read_until(proc.stdout, sentinel, out), timeout)
+        except asyncio.TimeoutError:
+            await self.kill()
+            return format_output(
+                out, None, f"killed: timed out after {timeout}s; the persistent shell was reset"
+            )
+        except (BrokenPipeError, ConnectionResetError) as exc:
+            raise ShellDied(str(exc)) from exc
+        return format_output(out, None, f"exit code: {code}")
+
+    @staticmethod
+    async def _read_until(stream: asyncio.StreamReader, sentinel: str, out: OutputBuffer) -> int:
+        marker = f"\n{sentinel} ".encode()
+        pending = bytearray()
+        while True:
+            chunk = await stream.read(READ_SIZE)
+            if not chunk:
+                out.write(bytes(pending))
+                raise ShellDied("shell exited")
+            pending += chunk
+            idx = pending.find(marker)
+            if idx >= 0:
+                out.write(bytes(pending[:idx]))
+                rest = bytes(pending[idx + len(marker):])
+                while b"\n" not in rest:
+                    more = await stream.read(64)
+                    if not more:
+                        raise ShellDied("shell exited")
+                    rest += more
+                return int(rest.split(b"\n", 1)[0] or 0)
+            # Keep enough bytes to spot a marker split across reads.
+            keep = len(marker) - 1
+            if len(pending) > keep:
+                out.write(bytes(pending[:-keep]))
+                del pending[:-keep]
+
+    async def kill(self) -> None:
+        """Kill the shell and anything still running in it."""
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.returncode is None:
+            await kill_group(proc)
+
+    async def close(self) -> None:
+        """Let the shell exit by closing its stdin, killing it if it lingers."""
+        proc = self._proc
+        if proc is None or proc.returncode is not None:
+            self._proc = None
+            return
+        if proc.stdin:
+            proc.stdin.close()
+        try:
+            await asyncio.wait_for(proc.wait(), KILL_GRACE / 2)
+            self._proc = None
+        except asyncio.TimeoutError:
+            await self.kill()
+
+
+class ShellPool:
+    """Per-session :class:`PersistentShell` instances with reaping and a cap."""
+
+    def __init__(self, max_shells: int, idle_timeout: float, output_limit: int) -> None:
+        self.max_shells = max_shells
+        self.idle_timeout = idle_timeout
+        self.output_limit = output_limit
+        self._shells: dict[str, PersistentShell] = {}
+        self._reaper: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    async def run(self, session_id: str, command: str, timeout: float) -> str:
+        """Run *command* in *session_id*'s shell, starting one if needed."""
+        shell = await self._get(session_id)
+        try:
+            return await shell.run(command, timeout)
+        except ShellDied as exc:
+            if self._shells.get(session_id) is shell:
+                del self._shells[session_id]
+            await shell.close()
+            return f"Error: persistent shell exited ({exc}); the next call starts a new one."
+        finally:
+            shell.users -= 1
+
+    async def _get(self, session_id: str) -> PersistentShell:
+        """Return *session_id*'s shell, marked in use so it is not reaped or evicted."""
+        async with self._lock:  # parallel calls must not start two shells
+            shell = await self._find_or_start(session_id)
+            shell.users += 1
+            shell.last_used = time.monotonic()
+            return shell
+
+    async def _find_or_start(self, session_id: str) -> PersistentShell:
+        shell = self._shells.get(session_id)
+        if shell is not None and shell.alive:
+            return shell
+        self._shells.pop(session_id, None)
+        if len(self._shells) >= self.max_shells:
+            await self._evict()
+        shell = PersistentShell(self.output_limit)
+        await shell.start()
+        self._shells[session_id] = shell
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_loop(), name="shell-reaper")
+        return shell
+
+    async def _evict(self) -> None:
+        """Close the least recently used idle shell to make room."""
+        idle = [(s.last_used, k) for k, s in self._shells.items() if not s.busy]
+        if not idle:
+            raise RuntimeError(f"all {self.max_shells} persistent shells are busy")
+        _, key = min(idle)
+        await self._shells.pop(key).close()
+
+    async def _reap_loop(self) -> None:
+        interval = max(1.0, min(self.idle_timeout / 2, 60.0))
+        while self._shells:
+            await asyncio.sleep(interval)
+            cutoff = time.monotonic() - self.idle_timeout
+            for key, shell in list(self._shells.items()):
+                if not shell.busy and (shell.last_used < cutoff or not shell.alive):
+                    logger.debug("Closing idle shell for %s", key)
+                    self._shells.pop(key, None)
+                    await shell.close()
+
+    async def close_all(self) -> None:
+        """Close every shell (on shutdown)."""
+        if self._reaper:
+            self._reaper.cancel()
+        shells = list(self._shells.values())
+        self._shells.clear()
+        for shell in shells:
+            await shell.close()
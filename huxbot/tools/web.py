@@ -2,29 +2,212 @@
 
 from __future__ import annotations
 
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
 import aiohttp
 
+from huxbot.config.schema import ToolsConfig
+from huxbot.tools.search import SearchBackend, SearchError, SearchResult, make_search_backend
+from huxbot.tools.webcache import WebCache
+from huxbot.utils.aio import run_io
+from huxbot.utils.cache import TTLCache
 from huxbot.utils.helpers import truncate
+from huxbot.utils.htmltext import html_to_text
+from huxbot.utils.http import get_session
+
+CHUNK_SIZE = 64 * 1024
+_TEXT_TYPES = ("text/", "application/json", "application/xml", "application/xhtml+xml")
 
 
-async def web_search(query: str, num_results: int = 5) -> str:
-    """Search the web for *query* and return the top results.
+def _sniff(body: bytes) -> str:
+    """Guess the type of a response that came without ``Content-Type``."""
+    head = body[:1024].lstrip().lower()
+    if head.startswith((b"<!doctype html", b"<html", b"<head", b"<body")):
+        return "text/html"
+    if head.startswith(b"<?xml"):
+        return "application/xml"
+    if b"\0" in head:
+        return "application/octet-stream"
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        if exc.start < len(head) - 3:  # not just a character cut at the end
+            return "application/octet-stream"
+    return "text/plain"
+
 
-    Uses a simple Google Custom Search JSON API call when configured,
-    otherwise returns a stub.
-    """
-    # Minimal implementation – override with real API key via config
-    return f"[web_search] No search API key configured. Query was: {query}"
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
 
 
-async def web_fetch(url: str) -> str:
-    """Fetch the content of *url* and return it as text."""
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def make_web_search(config: ToolsConfig):
+    """Return a *web_search* tool backed by ``config.web_search_engine``."""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
-                if resp.status != 200:
-                    return f"Error: HTTP {resp.status} for {url}"
-                text = await resp.text()
-                return truncate(text, max_len=8000)
-    except Exception as exc:
-        return f"Error fetching {url}: {exc}"
+        backend: SearchBackend | None = make_search_backend(config)
+        setup_error = ""
+    except SearchError as exc:
+        backend, setup_error = None, str(exc)
+    cache: TTLCache[tuple[str, int], list[SearchResult]] = TTLCache(config.web_search_cache_ttl)
+
+    async def _search(query: str, num_results: int) -> list[SearchResult]:
+        key = (_normalize_query(query), num_results)
+        results = cache.get(key)
+        if results is None:
+            results = await backend.search(query, num_results)
+            cache.set(key, results)
+        return results
+
+    async def web_search(queries: list[str], num_results: int = 5) -> str:
+        """Search the web and return titles, URLs and snippets.
+
+        Pass several phrasings or sub-questions in *queries*; they are
+        searched concurrently and the results merged without duplicates.
+        *num_results* is per query.
+        """
+        if backend is None:
+            return f"Error: web search unavailable: {setup_error}"
+        if isinstance(queries, str):
+            queries = [queries]
+        # Drop repeated queries, keeping the first spelling of each.
+        by_key: dict[str, str] = {}
+        for q in queries:
+            if q.strip():
+                by_key.setdefault(_normalize_query(q), q)
+        unique = list(by_key.values())
+        if not unique:
+            return "Error: no query given"
+        num_results = max(1, min(int(num_results), 10))
+
+        outcomes = await asyncio.gather(
+            *(_search(q, num_results) for q in unique), return_exceptions=True
+        )
+        errors = [
+            f"Error searching {q!r}: {o}" for q, o in zip(unique, outcomes)
+            if isinstance(o, BaseException)
+        ]
+        ranked = [o for o in outcomes if not isinstance(o, BaseException)]
+        if not ranked:
+            # The backend is down: let the executor's breaker see it.
+            raise next(o for o in outcomes if isinstance(o, BaseException))
+
+        # Interleave the per-query rankings so every query's top hits come first.
+        seen: set[str] = set()
+        merged: list[SearchResult] = []
+        for rank in range(num_results):
+            for results in ranked:
+                if rank < len(results):
+                    key = _normalize_url(results[rank].url)
+                    if key not in seen:
+                        seen.add(key)
+                        merged.append(results[rank])
+
+        lines = [
+            f"{i}. {r.title}\n   {r.url}" + (f"\n   {r.snippet}" if r.snippet else "")
+            for i, r in enumerate(merged, 1)
+        ]
+        if not lines and not errors:
+            lines = ["No results."]
+        return "\n".join(lines + errors)
+
+    return web_search
+
+
+@dataclass
+class _Page:
+    body: bytes
+    content_type: str
+    charset: str | None
+    truncated: bool
+
+    def text(self) -> str:
+        try:
+            return self.body.decode(self.charset or "utf-8", errors="replace")
+        except LookupError:  # unknown charset name
+            return self.body.decode("utf-8", errors="replace")
+
+
+def make_web_fetch(config: ToolsConfig):
+    """Return a *web_fetch* tool using the limits and cache from *config*."""
+    cache = (
+        WebCache(Path(config.web_cache_dir), config.web_cache_max_bytes)
+        if config.web_cache_max_bytes > 0
+        else None
+    )
+    max_bytes = config.web_fetch_max_bytes
+
+    async def _fetch(url: str) -> _Page | str:
+        """Return the page for *url* from the cache or the network, or an error."""
+        cached = await run_io(cache.get, url) if cache else None
+        if cached:
+            entry, body = cached
+            if entry.fresh:
+                return _Page(body, entry.content_type, entry.charset, entry.truncated)
+
+        headers = cached[0].validators() if cached else {}
+        timeout = aiohttp.ClientTimeout(total=30, sock_read=15)
+        async with get_session().get(url, headers=headers, timeout=timeout) as resp:
+            if resp.status == 304 and cached:
+                entry = await run_io(cache.refresh, cached[0], resp.headers)
+                return _Page(cached[1], entry.content_type, entry.charset, entry.truncated)
+            if resp.status >= 500:
+                resp.raise_for_status()  # the site is failing: let the breaker see it
+            if resp.status != 200:
+                return f"Error: HTTP {resp.status} for {url}"
+            # Stream the body and stop at the cap rather than buffering it all.
+            buf = bytearray()
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                buf += chunk
+                if len(buf) >= max_bytes:
+                    break
+            truncated = len(buf) >= max_bytes
+            body = bytes(buf[:max_bytes])
+            # aiohttp reports a missing Content-Type as application/octet-stream.
+            ctype = resp.content_type if "Content-Type" in resp.headers else _sniff(body)
+            page = _Page(body, ctype, resp.charset, truncated)
+            resp_headers = resp.headers
+
+        if cache:
+            await run_io(
+                cache.put, url, resp_headers, page.body,
+                content_type=page.content_type, charset=page.charset, truncated=page.truncated,
+            )
+        return page
+
+    async def web_fetch(url: str, output: str = "markdown") -> str:
+        """Fetch *url* and return its readable content.
+
+        HTML pages are reduced to their main text; *output* selects
+        ``"markdown"`` (keeps headings, lists, links and code), ``"text"``
+        or ``"html"`` (raw markup).  Responses are cached on disk.
+        """
+        # Network errors and 5xx responses raise, for the tool executor's
+        # circuit breaker to count.
+        page = await _fetch(url)
+        if isinstance(page, str):
+            return page
+
+        ctype = page.content_type
+        if ctype and not ctype.startswith(_TEXT_TYPES):
+            return f"Error: {url} is {ctype}, not a text document"
+        text = page.text()
+        if "html" in ctype and output != "html":
+            title, text = await run_io(
+                html_to_text, text, url, markdown=output != "text"
+            )
+            if title:
+                text = f"{title}\n\n{text}"
+        if page.truncated:
+            note = f"\n\n[Download stopped at {max_bytes} bytes]"
+            return truncate(text, max_len=config.web_fetch_max_chars - len(note)) + note
+        return truncate(text, max_len=config.web_fetch_max_chars)
+
+    return web_fetch
@@ -0,0 +1,195 @@
+"""On-disk HTTP cache for ``web_fetch``.
+
+Each URL is stored as two files named after the SHA-256 of the URL: the
+response body and a small JSON record of its validators and freshness.
+Freshness follows ``Cache-Control`` (``max-age``, ``no-cache``,
+``no-store``) and ``Expires``, falling back to the usual heuristic of 10%
+of the time since ``Last-Modified``.  Stale entries with an ``ETag`` or
+``Last-Modified`` are revalidated with a conditional request, so an
+unchanged page costs a 304 instead of a download.  The cache is kept under
+a byte budget by evicting the least recently used entries; file mtimes
+record last use.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from huxbot.utils.helpers import atomic_write, ensure_dir
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for the Last-Modified heuristic.
+_MAX_HEURISTIC_TTL = 24 * 3600
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    content_type: str
+    charset: str | None
+    etag: str | None
+    last_modified: str | None
+    stored_at: float
+    expires_at: float
+    truncated: bool = False
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> dict[str, str]:
+        """Headers for a conditional request revalidating this entry."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _cache_control(headers: Mapping[str, str]) -> dict[str, str]:
+    directives: dict[str, str] = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def _http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Mapping[str, str], now: float) -> float | None:
+    """Seconds the response may be served without revalidation.
+
+    Returns None when the response must not be stored at all.
+    """
+    cc = _cache_control(headers)
+    if "no-store" in cc:
+        return None
+    if "no-cache" in cc:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        if cc.get(name, "").isdigit():
+            return float(cc[name])
+    expires = _http_date(headers.get("Expires"))
+    if expires is not None:
+        return max(0.0, expires - now)
+    last_modified = _http_date(headers.get("Last-Modified"))
+    if last_modified is not None:
+        return min(max(0.0, (now - last_modified) / 10), _MAX_HEURISTIC_TTL)
+    return 0.0
+
+
+class WebCache:
+    """URL → body cache under *root*, limited to *max_bytes* of bodies."""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root.expanduser()
+        self.max_bytes = max_bytes
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.root / f"{key}.json", self.root / f"{key}.body"
+
+    def get(self, url: str) -> tuple[CacheEntry, bytes] | None:
+        """Return the stored entry and body for *url*, marking it as used."""
+        meta_path, body_path = self._paths(url)
+        try:
+            entry = CacheEntry(**json.loads(meta_path.read_text()))
+            body = body_path.read_bytes()
+        except (OSError, ValueError, TypeError):
+            return None
+        if entry.url != url:
+            return None
+        os.utime(body_path)
+        return entry, body
+
+    def put(
+        self,
+        url: str,
+        headers: Mapping[str, str],
+        body: bytes,
+        *,
+        content_type: str,
+        charset: str | None,
+        truncated: bool = False,
+    ) -> CacheEntry | None:
+        """Store a 200 response; returns None when it is not cacheable."""
+        now = time.time()
+        lifetime = freshness_lifetime(headers, now)
+        if lifetime is None:
+            return None
+        entry = CacheEntry(
+            url=url,
+            content_type=content_type,
+            charset=charset,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            stored_at=now,
+            expires_at=now + lifetime,
+            truncated=truncated,
+        )
+        if not entry.fresh and not entry.validators():
+            return None  # could never be reused
+        if len(body) > self.max_bytes:
+            return None
+        self._write(entry, body)
+        self._evict()
+        return entry
+
+    def refresh(self, entry: CacheEntry, headers: Mapping[str, str]) -> CacheEntry:
+        """Update *entry* after a 304 Not Modified response."""
+        now = time.time()
+        lifetime = freshness_lifetime(headers, now) or 0.0
+        entry.stored_at = now
+        entry.expires_at = now + lifetime
+        entry.etag = headers.get("ETag") or entry.etag
+        entry.last_modified = headers.get("Last-Modified") or entry.last_modified
+        meta_path, _ = self._paths(entry.url)
+        try:
+            atomic_write(meta_path, json.dumps(asdict(entry)))
+        except OSError as exc:
+            logger.warning("Could not update web cache entry: %s", exc)
+        return entry
+
+    def _write(self, entry: CacheEntry, body: bytes) -> None:
+        ensure_dir(self.root)
+        meta_path, body_path = self._paths(entry.url)
+        try:
+            # Unique temp files: concurrent fetches of one URL may write at once.
+            atomic_write(body_path, body)
+            atomic_write(meta_path, json.dumps(asdict(entry)))
+        except OSError as exc:
+            logger.warning("Could not write web cache entry: %s", exc)
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under the byte budget."""
+        try:
+            bodies = [(p, p.stat()) for p in self.root.glob("*.body")]
+        except OSError:
+            return
+        total = sum(st.st_size for _, st in bodies)
+        if total <= self.max_bytes:
+            return
+        for path, st in sorted(bodies, key=lambda item: item[1].st_mtime):
+            path.unlink(missing_ok=True)
+            path.with_suffix(".json").unlink(missing_ok=True)
+            total -= st.st_size
+            if total <= self.max_bytes:
+                break
@@ -0,0 +1,105 @@
+"""Blocking-I/O offloading and event-loop lag monitoring.
+
+Disk access (tools, memory, prompt building, media, caches) goes through
+:func:`run_io`, which runs the call on a small shared thread pool so a
+slow SD card never stalls the event loop – and with it the Discord
+heartbeats.  The pool is bounded so a burst of tool calls cannot spawn
+dozens of threads on a small board.
+
+:class:`LoopLagMonitor` measures how late the loop wakes up from a fixed
+sleep, which is exactly the stall any coroutine would see.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar
+
+from huxbot.config.schema import IoConfig
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_config = IoConfig()
+_executor: ThreadPoolExecutor | None = None
+
+
+def configure(config: IoConfig) -> None:
+    """Set the pool size for the executor created from now on."""
+    global _config
+    _config = config
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=_config.workers, thread_name_prefix="huxbot-io"
+        )
+    return _executor
+
+
+async def run_io(func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    """Run blocking *func* on the shared I/O thread pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown() -> None:
+    """Stop the I/O pool (call once, on exit)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+class LoopLagMonitor:
+    """Sample event-loop lag every *interval* seconds.
+
+    Lag above *warn_after* seconds is logged as a warning; :attr:`max_lag`
+    and :meth:`summary` report what was seen since :meth:`start`.
+    """
+
+    def __init__(self, interval: float = 0.5, warn_after: float = 0.1) -> None:
+        self.interval = interval
+        self.warn_after = warn_after
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.warn_after:
+                self.stalls += 1
+                logger.warning("Event loop stalled for %.0f ms", lag * 1000)
+
+    def summary(self) -> str:
+        mean = self.total_lag / self.samples if self.samples else 0.0
+        return (
+            f"mean {mean * 1000:.1f} ms, max {self.max_lag * 1000:.1f} ms, "
+            f"{self.stalls} stall(s) over {self.warn_after * 1000:.0f} ms"
+        )
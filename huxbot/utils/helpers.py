@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import os
+import random
 import re
+import uuid
 from pathlib import Path
 
 
@@ -12,6 +15,34 @@ def ensure_dir(path: Path) -> Path:
     return path
 
 
+def stage_file(path: Path, data: str | bytes) -> Path:
+    """Write *data* to a fresh temp file next to *path* and return the temp path.
+
+    The data is fsynced and the file gets *path*'s permissions, so a
+    following ``os.replace(tmp, path)`` swaps in complete content even
+    across a power cut.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    raw = data.encode() if isinstance(data, str) else data
+    try:
+        with open(tmp, "xb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return tmp
+
+
+def atomic_write(path: Path, data: str | bytes) -> None:
+    """Replace *path* with *data* so readers see the old or new file, never half of one."""
+    os.replace(stage_file(path, data), path)
+
+
 def safe_filename(name: str) -> str:
     """Convert an arbitrary string into a filesystem-safe filename."""
     return re.sub(r"[^\w\-.]", "_", name).strip("_")[:255]
@@ -22,3 +53,12 @@ def truncate(text: str, max_len: int = 4000) -> str:
     if len(text) <= max_len:
         return text
     return text[: max_len - 1] + "…"
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Return a jittered exponential backoff delay for retry *attempt* (0-based).
+
+    Uses "full jitter": a uniform draw between 0 and ``base * 2**attempt``,
+    capped at *cap*, so reconnecting clients don't retry in lockstep.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
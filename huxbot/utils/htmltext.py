@@ -0,0 +1,178 @@
+"""Convert HTML to compact, readable markdown or plain text.
+
+Built on the standard library's :class:`html.parser.HTMLParser`: scripts,
+styles and page chrome (navigation, footers, forms) are dropped, block
+elements become paragraphs and headings/lists/links/code keep a light
+markdown form, so a page costs a fraction of the tokens of its markup.
+"""
+
+from __future__ import annotations
+
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+# Content of these elements is never shown.
+_SKIP = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe",
+    "nav", "footer", "form", "button", "select", "textarea",
+}
+_VOID = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "source", "track", "wbr",
+}
+_BLOCK = {
+    "p", "div", "section", "article", "main", "header", "aside", "blockquote",
+    "table", "tr", "ul", "ol", "dl", "dt", "dd", "figure", "figcaption",
+    "details", "summary", "address",
+}
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_WS = re.compile(r"\s+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+# Line markers delimiting <pre> content, whose whitespace is kept verbatim.
+_PRE_START = "\x02"
+_PRE_END = "\x03"
+
+
+class _Extractor(HTMLParser):
+    def __init__(self, base_url: str, markdown: bool) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.markdown = markdown
+        self.title = ""
+        self._out: list[str] = []
+        self._skip = 0
+        self._pre = 0
+        self._in_title = False
+        self._links: list[str | None] = []
+        self._list_depth = 0
+
+    # -- output helpers --
+
+    def _emit(self, text: str) -> None:
+        self._out.append(text)
+
+    def _block(self) -> None:
+        self._out.append("\n\n")
+
+    # -- parser callbacks --
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in _SKIP:
+            if tag not in _VOID:
+                self._skip += 1
+            return
+        if self._skip:
+            return
+        md = self.markdown
+        if tag == "title":
+            self._in_title = True
+        elif tag in _HEADINGS:
+            self._block()
+            if md:
+                self._emit("#" * _HEADINGS[tag] + " ")
+        elif tag == "li":
+            self._emit("\n" + "  " * max(self._list_depth - 1, 0) + ("- " if md else "• "))
+        elif tag in ("ul", "ol"):
+            self._list_depth += 1
+            if self._list_depth == 1:
+                self._block()
+        elif tag == "br":
+            self._emit("\n")
+        elif tag == "hr":
+            self._emit("\n\n---\n\n" if md else "\n\n")
+        elif tag == "pre":
+            self._pre += 1
+            self._emit(f"\n\n{_PRE_START}\n")
+        elif tag == "code" and not self._pre and md:
+            self._emit("`")
+        elif tag in ("td", "th"):
+            self._emit(" | " if md else "  ")
+        elif tag == "a":
+            href = dict(attrs).get("href")
+            if md and href and not href.startswith(("#", "javascript:")):
+                self._links.append(urljoin(self.base_url, href))
+                self._emit("[")
+            else:
+                self._links.append(None)
+        elif tag == "img" and md:
+            alt = (dict(attrs).get("alt") or "").strip()
+            if alt:
+                self._emit(f"[image: {alt}]")
+        elif tag in _BLOCK:
+            self._block()
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIP:
+            if tag not in _VOID:
+                self._skip = max(self._skip - 1, 0)
+            return
+        if self._skip:
+            return
+        if tag == "title":
+            self._in_title = False
+        elif tag in _HEADINGS:
+            self._block()
+        elif tag in ("ul", "ol"):
+            self._list_depth = max(self._list_depth - 1, 0)
+            if not self._list_depth:
+                self._block()
+        elif tag == "pre":
+            self._pre = max(self._pre - 1, 0)
+            self._emit(f"\n{_PRE_END}\n\n")
+        elif tag == "tr":
+            self._emit(" |\n" if self.markdown else "\n")
+        elif tag == "code" and not self._pre and self.markdown:
+            self._emit("`")
+        elif tag == "a" and self._links:
+            href = self._links.pop()
+            if href:
+                self._emit(f"]({href})")
+        elif tag in _BLOCK:
+            self._block()
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip:
+            return
+        if self._pre:
+            self._emit(data)
+        else:
+            self._emit(_WS.sub(" ", data))
+
+    def result(self) -> str:
+        lines: list[str] = []
+        in_pre = False
+        for line in "".join(self._out).split("\n"):
+            marker = line.strip()
+            if marker in (_PRE_START, _PRE_END):
+                in_pre = marker == _PRE_START
+                if self.markdown:
+                    lines.append("```")
+                continue
+            if not in_pre:
+                # Drop the stray spaces left by collapsed whitespace, but keep
+                # the indentation of nested list items.
+                stripped = line.strip()
+                if stripped.startswith(("- ", "• ")):
+                    indent = len(line) - len(line.lstrip(" "))
+                    line = " " * (indent - indent % 2) + stripped
+                else:
+                    line = stripped
+            lines.append(line.rstrip())
+        return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def html_to_text(html: str, base_url: str = "", *, markdown: bool = True) -> tuple[str, str]:
+    """Return ``(title, body)`` extracted from *html*.
+
+    With *markdown* (the default) headings, lists, links and code keep a
+    markdown form; otherwise plain text is produced.  Relative links are
+    resolved against *base_url*.
+    """
+    parser = _Extractor(base_url, markdown)
+    parser.feed(html)
+    parser.close()
+    return _WS.sub(" ", parser.title).strip(), parser.result()
@@ -0,0 +1,46 @@
+"""Process-wide pooled aiohttp sessions.
+
+Channels, tools and the hardware transport share a small number of named
+``ClientSession`` objects instead of opening their own, so TCP/TLS
+connections and DNS lookups are reused across calls.  Sessions are created
+lazily inside the running event loop and closed by the CLI on shutdown via
+:func:`close_sessions`.
+"""
+
+from __future__ import annotations
+
+import aiohttp
+
+from huxbot.config.schema import HttpConfig
+
+_config = HttpConfig()
+_sessions: dict[str, aiohttp.ClientSession] = {}
+
+
+def configure(config: HttpConfig) -> None:
+    """Set pool limits for sessions created from now on."""
+    global _config
+    _config = config
+
+
+def get_session(name: str = "default") -> aiohttp.ClientSession:
+    """Return the shared session for pool *name*, creating it if needed."""
+    session = _sessions.get(name)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=_config.limit,
+            limit_per_host=_config.pool_limit_per_host.get(name, _config.limit_per_host),
+            ttl_dns_cache=_config.dns_cache_ttl,
+            keepalive_timeout=_config.keepalive_timeout,
+        )
+        session = aiohttp.ClientSession(connector=connector)
+        _sessions[name] = session
+    return session
+
+
+async def close_sessions() -> None:
+    """Close every shared session (call once, on shutdown)."""
+    sessions = list(_sessions.values())
+    _sessions.clear()
+    for session in sessions:
+        await session.close()
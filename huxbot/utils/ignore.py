@@ -0,0 +1,148 @@
+"""Gitignore-style path filtering.
+
+Supports the common subset of ``.gitignore`` syntax: ``*``, ``?``,
+``[...]``, ``**``, leading ``/`` anchoring, trailing ``/`` for directories
+and ``!`` negation.  Rules from nested ignore files apply below their own
+directory, and later rules win, as in git.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Collection
+from dataclasses import dataclass
+from pathlib import Path
+
+IGNORE_FILES = (".gitignore", ".ignore", ".huxbotignore")
+
+# Skipped everywhere, whatever the ignore files say.
+DEFAULT_IGNORES = (".git/", ".hg/", ".svn/", "__pycache__/", "node_modules/", ".venv/", "venv/")
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a glob into a regex body; ``*`` and ``?`` stop at ``/``, ``**`` does not."""
+    out: list[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "]") else i + 1)
+            if end < 0:
+                out.append(r"\[")
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def compile_glob(pattern: str) -> re.Pattern[str]:
+    """Compile a path glob; one without ``/`` matches the file name at any depth."""
+    pattern = pattern.strip().lstrip("/")
+    prefix = "" if "/" in pattern else "(?:.*/)?"
+    return re.compile(prefix + glob_to_regex(pattern))
+
+
+@dataclass(frozen=True)
+class _Rule:
+    regex: re.Pattern[str]
+    negate: bool
+    dir_only: bool
+
+
+def parse_rules(lines: list[str] | tuple[str, ...]) -> list[_Rule]:
+    rules: list[_Rule] = []
+    for raw in lines:
+        line = raw.rstrip("\n").rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        body = glob_to_regex(line.lstrip("/"))
+        regex = re.compile(body if anchored else "(?:.*/)?" + body)
+        rules.append(_Rule(regex, negate, dir_only))
+    return rules
+
+
+class IgnoreRules:
+    """Ignore rules in effect for one directory of a tree walk.
+
+    Start with :meth:`for_root`, then call :meth:`child` for each directory
+    entered so that nested ignore files are picked up.  Paths given to
+    :meth:`ignored` are relative to the walk root, with ``/`` separators.
+    """
+
+    def __init__(self, layers: tuple[tuple[str, tuple[_Rule, ...]], ...] = ()) -> None:
+        self._layers = layers
+
+    @classmethod
+    def defaults(cls, extra: list[str] | tuple[str, ...] = DEFAULT_IGNORES) -> IgnoreRules:
+        """Rules before any ignore file is read: just *extra*."""
+        return cls((("", tuple(parse_rules(extra))),) if extra else ())
+
+    @classmethod
+    def for_root(cls, root: Path, extra: list[str] | tuple[str, ...] = DEFAULT_IGNORES) -> IgnoreRules:
+        return cls.defaults(extra).child(root, "")
+
+    def child(self, directory: Path | str, rel: str, names: Collection[str] | None = None) -> IgnoreRules:
+        """Rules for *directory* (at *rel*), adding any ignore files it contains.
+
+        Pass the directory's entry *names* when already listed, to skip
+        looking for ignore files that are not there.
+        """
+        lines: list[str] = []
+        for name in IGNORE_FILES:
+            if names is not None and name not in names:
+                continue
+            try:
+                lines.extend(Path(directory, name).read_text(errors="replace").splitlines())
+            except OSError:
+                continue
+        rules = parse_rules(lines)
+        if not rules:
+            return self
+        return IgnoreRules(self._layers + ((rel, tuple(rules)),))
+
+    def ignored(self, rel: str, is_dir: bool = False) -> bool:
+        result = False
+        for base, rules in self._layers:
+            if base:
+                if not rel.startswith(base + "/"):
+                    continue
+                sub = rel[len(base) + 1:]
+            else:
+                sub = rel
+            for rule in rules:
+                if rule.dir_only and not is_dir:
+                    continue
+                if rule.regex.fullmatch(sub):
+                    result = not rule.negate
+        return result
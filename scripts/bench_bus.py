@@ -0,0 +1,86 @@
+"""Micro-benchmark for event construction and MessageBus throughput.
+
+Usage::
+
+    python scripts/bench_bus.py [-n 100000]
+
+Reports messages per second and bytes allocated per message for event
+construction, and messages per second for a publish/consume round-trip
+through the bus.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from huxbot.bus.events import InboundMessage, OutboundMessage
+from huxbot.bus.queue import MessageBus
+
+
+def _measure(label: str, n: int, fn: Callable[[int], object]) -> None:
+    # Rate without tracemalloc overhead, allocations in a second pass.
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    keep = [fn(i) for i in range(min(n, 10_000))]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_msg = (after - before) / len(keep)
+
+    print(f"{label:<34} {n / elapsed:>12,.0f} msg/s  {per_msg:>8,.0f} B/msg")
+
+
+def _inbound(i: int) -> InboundMessage:
+    return InboundMessage(channel="bench", sender_id="u", chat_id=str(i), content="hello")
+
+
+def _outbound(i: int) -> OutboundMessage:
+    return OutboundMessage(channel="bench", recipient=str(i), text="hello")
+
+
+def _session_key(msg: InboundMessage) -> Callable[[int], object]:
+    return lambda _i: msg.session_key
+
+
+async def _bus_roundtrip(n: int, factory: Callable[[int], OutboundMessage]) -> float:
+    bus = MessageBus()
+
+    async def producer() -> None:
+        for i in range(n):
+            await bus.publish_outbound(factory(i))
+
+    async def consumer() -> None:
+        for _ in range(n):
+            await bus.consume_outbound()
+
+    start = time.perf_counter()
+    await asyncio.gather(producer(), consumer())
+    return n / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=100_000, help="messages per case")
+    args = parser.parse_args()
+    n = args.n
+
+    print(f"Event construction ({n:,} messages)")
+    _measure("InboundMessage", n, _inbound)
+    _measure("OutboundMessage", n, _outbound)
+    _measure("session_key", n, _session_key(_inbound(0)))
+
+    print(f"\nBus publish/consume ({n:,} messages)")
+    rate = asyncio.run(_bus_roundtrip(n, _outbound))
+    print(f"{'OutboundMessage':<34} {rate:>12,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
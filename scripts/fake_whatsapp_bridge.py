@@ -0,0 +1,105 @@
+"""Stand-in for the Node.js WhatsApp bridge, for local testing.
+
+Usage::
+
+    python scripts/fake_whatsapp_bridge.py [--port 3001] [--drop-every 10]
+
+Speaks the same WebSocket protocol as the real bridge: ``send`` requests
+from HuxBot are printed, and every line typed on stdin is delivered to
+connected clients as an inbound ``message`` event.  ``--drop-every N``
+closes client connections every N seconds to exercise reconnects and the
+outbound buffer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+
+from aiohttp import WSMsgType, web
+
+_ids = itertools.count(1)
+
+
+class FakeBridge:
+    def __init__(self, sender: str) -> None:
+        self.sender = sender
+        self.clients: set[web.WebSocketResponse] = set()
+
+    async def handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.clients.add(ws)
+        print(f"* client connected ({len(self.clients)} total)")
+        await ws.send_json({"type": "status", "status": "connected"})
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                if data.get("type") == "send":
+                    print(f"-> {data.get('to')}: {data.get('text')}")
+        finally:
+            self.clients.discard(ws)
+            print("* client disconnected")
+        return ws
+
+    async def broadcast(self, text: str) -> None:
+        event = {
+            "type": "message",
+            "id": f"FAKE{next(_ids)}",
+            "sender": self.sender,
+            "content": text,
+            "isGroup": False,
+        }
+        for ws in list(self.clients):
+            await ws.send_json(event)
+
+    async def read_stdin(self) -> None:
+        while True:
+            line = await asyncio.to_thread(sys.stdin.readline)
+            if not line:
+                return
+            if line.strip():
+                await self.broadcast(line.rstrip("\n"))
+
+    async def drop_clients(self, every: float) -> None:
+        while True:
+            await asyncio.sleep(every)
+            for ws in list(self.clients):
+                await ws.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--sender", default="15550001111@s.whatsapp.net")
+    parser.add_argument("--drop-every", type=float, default=0.0, metavar="SECONDS")
+    args = parser.parse_args()
+
+    bridge = FakeBridge(args.sender)
+    app = web.Application()
+    app.router.add_get("/", bridge.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.port).start()
+    print(f"Fake WhatsApp bridge on ws://{args.host}:{args.port}")
+
+    tasks = [asyncio.create_task(bridge.read_stdin())]
+    if args.drop_every > 0:
+        tasks.append(asyncio.create_task(bridge.drop_clients(args.drop_every)))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,113 @@
+"""Tests for tool deadlines and circuit breakers."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from huxbot.config.schema import ToolsConfig
+from huxbot.hardware.board import BoardError
+from huxbot.tools import breaker
+from huxbot.tools.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ToolExecutor
+
+
+def test_breaker_opens_after_threshold_and_half_opens(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(breaker.time, "monotonic", lambda: now[0])
+    b = CircuitBreaker("x", threshold=2, reset_timeout=10)
+    b.record(False, "boom")
+    assert b.state == CLOSED and b.allow()
+    b.record(False, "boom")
+    assert b.state == OPEN and not b.allow()
+
+    now[0] += 10
+    assert b.allow()  # the single half-open trial
+    assert b.state == HALF_OPEN
+    assert not b.allow()
+    b.record(False, "still down")
+    assert b.state == OPEN
+
+    now[0] += 10
+    assert b.allow()
+    b.record(True)
+    assert b.state == CLOSED and b.failures == 0
+
+
+def test_released_trial_can_be_claimed_again(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(breaker.time, "monotonic", lambda: now[0])
+    b = CircuitBreaker("x", threshold=1, reset_timeout=1)
+    b.record(False)
+    now[0] += 1
+    assert b.allow()
+    b.release()
+    assert b.allow()
+
+
+def _executor(**overrides) -> ToolExecutor:
+    config = ToolsConfig(breaker_failures=2, breaker_reset=60, **overrides)
+    return ToolExecutor(config)
+
+
+@pytest.mark.asyncio
+async def test_errors_become_results_and_open_the_breaker():
+    executor = _executor(breakers={"flaky": "flaky"})
+    calls = 0
+
+    async def flaky() -> str:
+        """Always fails."""
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("down")
+
+    tool = executor.wrap(flaky)
+    assert await tool() == "Error: flaky failed: down"
+    assert await tool() == "Error: flaky failed: down"
+    assert (await tool()).startswith("Error: flaky is failing")
+    assert calls == 2
+    assert executor.stats["flaky"].rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline():
+    executor = _executor(tool_timeouts={"slow": 0.05})
+
+    async def slow() -> str:
+        """Too slow."""
+        await asyncio.sleep(1)
+        return "done"
+
+    assert await executor.wrap(slow)() == "Error: slow timed out after 0.05s."
+    assert executor.stats["slow"].timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_board_errors_do_not_count_against_the_breaker():
+    executor = _executor(breakers={"hw": "hardware"})
+
+    async def hw() -> str:
+        """The board answers ERR."""
+        raise BoardError("Board error: bad pin")
+
+    tool = executor.wrap(hw)
+    for _ in range(3):
+        assert await tool() == "Error: hw failed: Board error: bad pin"
+    assert executor.breakers["hardware"].state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_one_breaker_per_host():
+    executor = _executor(breakers={"fetch": "fetch"})
+
+    async def fetch(url: str) -> str:
+        """Fetch *url*."""
+        if "bad" in url:
+            raise ConnectionError("refused")
+        return "ok"
+
+    tool = executor.wrap(fetch)
+    for _ in range(3):
+        await tool("http://bad.example/")
+    assert await tool("http://good.example/") == "ok"
+    assert executor.breakers["fetch:bad.example"].state == OPEN
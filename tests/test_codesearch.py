@@ -0,0 +1,75 @@
+"""Tests for the workspace search index."""
+
+from __future__ import annotations
+
+import pytest
+
+from huxbot.tools import codesearch
+from huxbot.tools.codesearch import WorkspaceIndex, required_literals
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected"),
+    [
+        ("foobar", ["foobar"]),
+        (r"def\s+main", ["def", "main"]),
+        ("abc[x]def", ["abc", "def"]),
+        ("colou?r", ["colo"]),
+        ("(inner)outer", ["outer"]),
+        ("[^]]foobar", ["foobar"]),
+        ("[]a]xyzabc", ["xyzabc"]),
+        (r"[a\]b]hello", ["hello"]),
+        ("foo[^]bar]baz", ["foo", "baz"]),
+        ("cat|dog", None),
+        ("[abc", None),
+    ],
+)
+def test_required_literals(pattern, expected):
+    assert required_literals(pattern) == expected
+
+
+def _index(root, max_file_bytes: int = 1 << 20) -> WorkspaceIndex:
+    return WorkspaceIndex(root, max_files=100, max_file_bytes=max_file_bytes)
+
+
+def test_search_finds_indexed_and_unindexed_files(tmp_path):
+    (tmp_path / "app.py").write_text("def handler():\n    return 42\n")
+    (tmp_path / "big.log").write_text("noise\n" * 100 + "handler crashed\n")
+    index = _index(tmp_path, max_file_bytes=64)
+    out = index.search("handler")
+    assert "app.py (1 match)" in out
+    assert "big.log (1 match)" in out
+    assert ">   101: handler crashed" in out
+
+
+def test_large_file_is_scanned_in_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(codesearch, "_SCAN_BLOCK", 16)
+    lines = [f"line {i}" for i in range(1, 50)]
+    lines[29] = "line 30 needle"
+    (tmp_path / "big.log").write_text("\n".join(lines) + "\n")
+    out = _index(tmp_path, max_file_bytes=8).search("needle", context=1)
+    assert "    29: line 29" in out
+    assert ">    30: line 30 needle" in out
+    assert "    31: line 31" in out
+    assert "line 28" not in out
+
+
+def test_ignored_files_are_skipped(tmp_path):
+    (tmp_path / ".gitignore").write_text("build/\n")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "out.txt").write_text("marker\n")
+    (tmp_path / "src.txt").write_text("marker\n")
+    out = _index(tmp_path).search("marker")
+    assert "src.txt" in out
+    assert "build/out.txt" not in out
+
+
+def test_refresh_compacts_stale_postings(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("alpha\n")
+    index = _index(tmp_path)
+    index.refresh()
+    index._stale = 10_000
+    index.refresh()
+    assert index._stale == 0
+    assert "a.txt" in index.search("alpha")
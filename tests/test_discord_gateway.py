@@ -0,0 +1,40 @@
+"""Tests for decoding Discord gateway frames."""
+
+from __future__ import annotations
+
+import json
+import zlib
+
+import aiohttp
+import pytest
+
+from huxbot.bus.queue import MessageBus
+from huxbot.channels.discord import _MAX_PAYLOAD, DiscordChannel
+from huxbot.config.schema import ChannelConfig
+
+
+def _channel() -> DiscordChannel:
+    channel = DiscordChannel(ChannelConfig(token="t", extra={"compress": True}), MessageBus())
+    channel._inflator = zlib.decompressobj()
+    return channel
+
+
+def _binary(data: bytes) -> aiohttp.WSMessage:
+    return aiohttp.WSMessage(aiohttp.WSMsgType.BINARY, data, None)
+
+
+def test_zlib_stream_payload_split_across_frames():
+    channel = _channel()
+    deflate = zlib.compressobj()
+    data = deflate.compress(json.dumps({"op": 11}).encode()) + deflate.flush(zlib.Z_SYNC_FLUSH)
+    assert channel._decode(_binary(data[:3])) is None
+    assert channel._decode(_binary(data[3:])) == {"op": 11}
+
+
+def test_oversized_inflated_payload_is_rejected():
+    channel = _channel()
+    deflate = zlib.compressobj()
+    bomb = json.dumps({"d": "a" * (_MAX_PAYLOAD + 1)}).encode()
+    data = deflate.compress(bomb) + deflate.flush(zlib.Z_SYNC_FLUSH)
+    with pytest.raises(ValueError):
+        channel._decode(_binary(data))
@@ -0,0 +1,197 @@
+"""Tests for the serial board connection and batched commands."""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import sys
+import time
+import types
+
+import pytest
+
+from huxbot.hardware.board import Board, BatchResult, BoardError, _batch_result
+from huxbot.hardware.connection import SerialConnection
+
+_READINGS = {"DIGITAL_READ:2": "1", "ANALOG_READ:0": "512", "PING": "pong"}
+
+
+class FakeFirmware:
+    """A board on the far end of a socket pair, answering one line at a time.
+
+    *framed* firmware echoes ``@<id>:`` prefixes; plain firmware rejects them.
+    *boot* seconds of input are ignored, like a bootloader after a reset.
+    Commands in *delays* answer late; commands in *silent* never answer.
+    """
+
+    def __init__(self, *, framed: bool = False, boot: float = 0.0, batch: str = "no") -> None:
+        self.framed = framed
+        self.boot = boot
+        self.batch = batch  # "no", "yes", "partial" (runs one, then ERR), or "short" (drops a reply)
+        self.delays: dict[str, float] = {}
+        self.silent: set[str] = set()
+        self.executed: list[str] = []
+        self._tasks: list[asyncio.Task] = []
+
+    async def open_serial_connection(self, url: str, baudrate: int):
+        host, board = socket.socketpair()
+        reader, writer = await asyncio.open_connection(sock=host)
+        board_reader, board_writer = await asyncio.open_connection(sock=board)
+        self._tasks.append(asyncio.create_task(self._run(board_reader, board_writer)))
+        return reader, writer
+
+    async def _run(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        booted_at = time.monotonic() + self.boot
+        while line := await reader.readline():
+            if time.monotonic() < booted_at:
+                continue
+            reply = await self._handle(line.decode().strip())
+            if reply is not None:
+                writer.write(f"{reply}\n".encode())
+
+    async def _handle(self, line: str) -> str | None:
+        prefix = ""
+        if line.startswith("@"):
+            if not self.framed:
+                return "ERR:unknown command"
+            rid, _, line = line[1:].partition(":")
+            prefix = f"@{rid}:"
+        if line in self.silent:
+            return None
+        await asyncio.sleep(self.delays.get(line, 0))
+        if line.startswith("BATCH:"):
+            return prefix + self._batch(line[6:].split("|"))
+        self.executed.append(line)
+        return prefix + self._reply(line)
+
+    def _batch(self, commands: list[str]) -> str:
+        if self.batch == "no":
+            return "ERR:unknown command"
+        if self.batch == "partial":
+            self.executed.append(commands[0])
+            return "ERR:bad pin"
+        self.executed.extend(commands)
+        replies = [self._reply(c) for c in commands]
+        if self.batch == "short":
+            replies.pop()
+        return "OK:" + "|".join(replies)
+
+    @staticmethod
+    def _reply(command: str) -> str:
+        if command.endswith(":99"):
+            return "ERR:bad pin"
+        return "OK:" + _READINGS.get(command, command.split(":", 1)[-1])
+
+
+@pytest.fixture
+def firmware(monkeypatch):
+    def install(**kwargs) -> FakeFirmware:
+        fw = FakeFirmware(**kwargs)
+        module = types.SimpleNamespace(open_serial_connection=fw.open_serial_connection)
+        monkeypatch.setitem(sys.modules, "serial_asyncio", module)
+        return fw
+
+    return install
+
+
+@pytest.mark.asyncio
+async def test_legacy_late_reply_is_not_handed_to_the_next_command(firmware):
+    fw = firmware(framed=False)
+    fw.delays["DIGITAL_READ:2"] = 0.3
+    conn = SerialConnection("fake", timeout=0.15, framing="legacy")
+    await conn.connect()
+    try:
+        with pytest.raises(TimeoutError):
+            await conn.send("DIGITAL_READ:2")
+        assert await conn.send("ANALOG_READ:0") == "OK:512"
+        assert await conn.send("DIGITAL_READ:2", timeout=1) == "OK:1"
+    finally:
+        await conn.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_legacy_lost_reply_does_not_block_the_link(firmware):
+    fw = firmware(framed=False)
+    fw.silent.add("DIGITAL_READ:2")
+    conn = SerialConnection("fake", timeout=0.1, framing="legacy")
+    await conn.connect()
+    try:
+        with pytest.raises(TimeoutError):
+            await conn.send("DIGITAL_READ:2")
+        assert await conn.send("ANALOG_READ:0") == "OK:512"
+    finally:
+        await conn.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_probe_retries_while_the_board_boots(firmware):
+    firmware(framed=True, boot=0.15)
+    conn = SerialConnection("fake", timeout=0.1, framing="auto")
+    await conn.connect()
+    try:
+        assert conn.framed
+        assert await conn.send("ANALOG_READ:0") == "OK:512"
+    finally:
+        await conn.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_probe_detects_plain_firmware(firmware):
+    firmware(framed=False)
+    conn = SerialConnection("fake", timeout=0.2, framing="auto")
+    await conn.connect()
+    try:
+        assert not conn.framed
+        assert await conn.send("ANALOG_READ:0") == "OK:512"
+    finally:
+        await conn.disconnect()
+
+
+def test_batch_result_parsing():
+    assert _batch_result("PING", "OK:pong") == BatchResult("PING", True, "pong")
+    assert _batch_result("X:99", "ERR:bad pin") == BatchResult("X:99", False, "bad pin")
+    assert not _batch_result("PING", "garbage").ok
+
+
+_COMMANDS = ["DIGITAL_READ:2", "DIGITAL_READ:99", "ANALOG_READ:0"]
+
+
+async def _run_batch(commands: list[str]) -> list[BatchResult]:
+    board = Board(SerialConnection("fake", timeout=0.5, framing="legacy"))
+    try:
+        return await board.batch(commands)
+    finally:
+        await board._conn.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_batch_frame_results(firmware):
+    fw = firmware(batch="yes")
+    results = await _run_batch(_COMMANDS)
+    assert [(r.ok, r.value) for r in results] == [(True, "1"), (False, "bad pin"), (True, "512")]
+    assert fw.executed == _COMMANDS
+
+
+@pytest.mark.asyncio
+async def test_batch_falls_back_on_unknown_command(firmware):
+    fw = firmware(batch="no")
+    results = await _run_batch(_COMMANDS)
+    assert [r.ok for r in results] == [True, False, True]
+    assert fw.executed == _COMMANDS
+
+
+@pytest.mark.asyncio
+async def test_batch_error_is_not_resent(firmware):
+    fw = firmware(batch="partial")
+    with pytest.raises(BoardError, match="bad pin"):
+        await _run_batch(_COMMANDS)
+    assert fw.executed == _COMMANDS[:1]
+
+
+@pytest.mark.asyncio
+async def test_short_batch_reply_reports_unknown_outcomes(firmware):
+    fw = firmware(batch="short")
+    results = await _run_batch(_COMMANDS)
+    assert [r.command for r in results] == _COMMANDS
+    assert all(not r.ok and r.value.startswith("unknown outcome") for r in results)
+    assert fw.executed == _COMMANDS
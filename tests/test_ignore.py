@@ -0,0 +1,59 @@
+"""Tests for gitignore-style path filtering."""
+
+from __future__ import annotations
+
+from huxbot.utils.ignore import IgnoreRules, compile_glob, parse_rules
+
+
+def _rules(*lines: str) -> IgnoreRules:
+    return IgnoreRules((("", tuple(parse_rules(list(lines)))),))
+
+
+def test_unanchored_pattern_matches_at_any_depth():
+    rules = _rules("*.log")
+    assert rules.ignored("app.log")
+    assert rules.ignored("logs/deep/app.log")
+    assert not rules.ignored("app.py")
+
+
+def test_anchored_pattern_matches_from_root_only():
+    rules = _rules("/build")
+    assert rules.ignored("build", is_dir=True)
+    assert not rules.ignored("src/build", is_dir=True)
+
+
+def test_directory_only_pattern():
+    rules = _rules("cache/")
+    assert rules.ignored("cache", is_dir=True)
+    assert not rules.ignored("cache", is_dir=False)
+
+
+def test_later_negation_wins():
+    rules = _rules("*.txt", "!keep.txt")
+    assert rules.ignored("notes.txt")
+    assert not rules.ignored("keep.txt")
+
+
+def test_double_star():
+    rules = _rules("docs/**/*.md")
+    assert rules.ignored("docs/a.md")
+    assert rules.ignored("docs/x/y/a.md")
+    assert not rules.ignored("src/a.md")
+
+
+def test_nested_ignore_file_applies_below_its_directory(tmp_path):
+    sub = tmp_path / "pkg"
+    sub.mkdir()
+    (sub / ".gitignore").write_text("*.tmp\n")
+    root = IgnoreRules.for_root(tmp_path, extra=())
+    assert not root.ignored("a.tmp")
+    nested = root.child(sub, "pkg")
+    assert nested.ignored("pkg/a.tmp")
+    assert not nested.ignored("a.tmp")
+
+
+def test_compile_glob():
+    assert compile_glob("*.py").fullmatch("src/app.py")
+    assert compile_glob("src/*.py").fullmatch("src/app.py")
+    assert not compile_glob("src/*.py").fullmatch("src/sub/app.py")
+    assert compile_glob("src/**/test_*.py").fullmatch("src/a/b/test_x.py")
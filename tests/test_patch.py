@@ -0,0 +1,83 @@
+"""Tests for batched edits and unified-diff application."""
+
+from __future__ import annotations
+
+import pytest
+
+from huxbot.tools.filesystem import apply_patch, edit_file, multi_edit
+from huxbot.tools.patch import FileEdit, apply_hunks, parse_unified_diff
+
+
+def _hunks(diff: str):
+    (patch,) = parse_unified_diff(diff)
+    return patch.hunks
+
+
+def test_hunk_applies_at_shifted_position():
+    text = "x\ny\na\nb\nc\n"
+    hunks = _hunks("--- a/f\n+++ b/f\n@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n")
+    assert apply_hunks(text, hunks) == ("x\ny\na\nB\nc\n", [])
+
+
+def test_hunk_tolerates_whitespace_changes():
+    hunks = _hunks("--- a/f\n+++ b/f\n@@ -1,2 +1,2 @@\n def f():\n-    return 1\n+    return 2\n")
+    new, failures = apply_hunks("def  f():\n    return 1\n", hunks)
+    assert failures == []
+    assert new.endswith("return 2\n")
+
+
+def test_missing_context_is_reported():
+    hunks = _hunks("--- a/f\n+++ b/f\n@@ -1,1 +1,1 @@\n-nope\n+yes\n")
+    new, failures = apply_hunks("a\n", hunks)
+    assert new == "a\n"
+    assert len(failures) == 1 and "context not found" in failures[0]
+
+
+def test_no_newline_at_end_of_file():
+    hunks = _hunks("--- a/f\n+++ b/f\n@@ -1 +1 @@\n-a\n+b\n\\ No newline at end of file\n")
+    assert apply_hunks("a\n", hunks) == ("b", [])
+
+
+def test_crlf_text_keeps_crlf():
+    hunks = _hunks("--- a/f\n+++ b/f\n@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n")
+    assert apply_hunks("a\r\nb\r\nc\r\n", hunks) == ("a\r\nB\r\nc\r\n", [])
+
+
+@pytest.mark.asyncio
+async def test_multi_edit_preserves_crlf(tmp_path):
+    path = tmp_path / "f.txt"
+    path.write_bytes(b"a\r\nb\r\nc\r\n")
+    result = await multi_edit([FileEdit(path=str(path), old_string="a\nb", new_string="a\nB")])
+    assert result.startswith("Applied")
+    assert path.read_bytes() == b"a\r\nB\r\nc\r\n"
+
+
+@pytest.mark.asyncio
+async def test_apply_patch_preserves_crlf(tmp_path):
+    path = tmp_path / "f.txt"
+    path.write_bytes(b"a\r\nb\r\nc\r\n")
+    diff = f"--- {path}\n+++ {path}\n@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n"
+    result = await apply_patch(diff)
+    assert result.startswith("Applied"), result
+    assert path.read_bytes() == b"a\r\nB\r\nc\r\n"
+
+
+@pytest.mark.asyncio
+async def test_edit_file_preserves_crlf(tmp_path):
+    path = tmp_path / "f.txt"
+    path.write_bytes(b"a\r\nb\r\n")
+    assert "successfully" in await edit_file(str(path), "b", "B\nextra")
+    assert path.read_bytes() == b"a\r\nB\r\nextra\r\n"
+
+
+@pytest.mark.asyncio
+async def test_multi_edit_is_all_or_nothing(tmp_path):
+    one, two = tmp_path / "one.txt", tmp_path / "two.txt"
+    one.write_text("alpha\n")
+    two.write_text("beta\n")
+    result = await multi_edit([
+        FileEdit(path=str(one), old_string="alpha", new_string="ALPHA"),
+        FileEdit(path=str(two), old_string="missing", new_string="x"),
+    ])
+    assert result.startswith("Error: nothing was changed")
+    assert one.read_text() == "alpha\n"
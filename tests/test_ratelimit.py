@@ -0,0 +1,112 @@
+"""Tests for the Discord REST rate limiter and 429 handling."""
+
+from __future__ import annotations
+
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from huxbot.bus.events import OutboundMessage
+from huxbot.bus.queue import MessageBus
+from huxbot.channels import discord, ratelimit
+from huxbot.channels.discord import DiscordChannel
+from huxbot.channels.ratelimit import DiscordRateLimiter
+from huxbot.config.schema import ChannelConfig
+
+ROUTE = ("POST", "/channels/{channel_id}/messages")
+
+
+@pytest.mark.asyncio
+async def test_exhausted_bucket_waits_for_reset():
+    limiter = DiscordRateLimiter()
+    async with limiter.acquire(ROUTE, major="1") as ticket:
+        headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.2"}
+        assert not await ticket.update(200, headers)
+    started = time.monotonic()
+    async with limiter.acquire(ROUTE, major="1"):
+        pass
+    assert time.monotonic() - started >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_other_major_parameter_does_not_wait():
+    limiter = DiscordRateLimiter()
+    async with limiter.acquire(ROUTE, major="1") as ticket:
+        await ticket.update(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "5"})
+    started = time.monotonic()
+    async with limiter.acquire(ROUTE, major="2"):
+        pass
+    assert time.monotonic() - started < 0.1
+
+
+@pytest.mark.asyncio
+async def test_429_without_json_body_uses_retry_after_header():
+    limiter = DiscordRateLimiter()
+    async with limiter.acquire(ROUTE, major="1") as ticket:
+        assert await ticket.update(429, {"Retry-After": "0.2"}, None)
+    started = time.monotonic()
+    async with limiter.acquire(ROUTE, major="1"):
+        pass
+    assert time.monotonic() - started >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_routes_learned_into_one_bucket_share_state():
+    limiter = DiscordRateLimiter()
+    other = ("PATCH", "/channels/{channel_id}/messages/{message_id}")
+    headers = {
+        "X-RateLimit-Bucket": "abc",
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset-After": "0.2",
+    }
+    async with limiter.acquire(ROUTE, major="1") as ticket:
+        await ticket.update(200, headers)
+    async with limiter.acquire(other, major="1") as ticket:
+        await ticket.update(200, {"X-RateLimit-Bucket": "abc"})
+    assert limiter._key(ROUTE, "1") == limiter._key(other, "1") == "abc:1"
+
+
+@pytest.mark.asyncio
+async def test_idle_buckets_are_swept(monkeypatch):
+    limiter = DiscordRateLimiter()
+    async with limiter.acquire(ROUTE, major="1"):
+        pass
+    assert len(limiter._buckets) == 1
+    monkeypatch.setattr(ratelimit, "_IDLE_SECONDS", 0.0)
+    limiter._sweep(time.monotonic() + 1)
+    assert not limiter._buckets
+
+
+@pytest.mark.asyncio
+async def test_send_backs_off_on_html_429(monkeypatch):
+    calls = []
+
+    async def create_message(request: web.Request) -> web.Response:
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return web.Response(
+                status=429, text="<html>slow down</html>", content_type="text/html",
+                headers={"Retry-After": "0.2"},
+            )
+        return web.json_response({"id": "1"})
+
+    app = web.Application()
+    app.router.add_post("/channels/{channel_id}/messages", create_message)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    monkeypatch.setattr(discord, "DISCORD_API", f"http://127.0.0.1:{port}")
+
+    channel = DiscordChannel(ChannelConfig(token="t"), MessageBus())
+    async with aiohttp.ClientSession() as session:
+        channel._session = session
+        try:
+            await channel.send(OutboundMessage(channel="discord", recipient="9", text="hi"))
+        finally:
+            await runner.cleanup()
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.15